@@ -2,6 +2,9 @@ from flask import Flask, jsonify, request
 from config import Config, TestingConfig
 from flask_cors import CORS
 from app.extensions import db, migrate, jwt
+from app.log import configure_logging
+from app.pagination import register_pagination_errors
+from app.fields import register_field_errors
 from flask_jwt_extended import JWTManager
 from datetime import timedelta
 
@@ -22,6 +25,9 @@ def create_app(config_name='default'):
     app.config['TESTING'] = True
     app.config['PROPAGATE_EXCEPTIONS'] = True
     
+    # Configure logging before anything else logs
+    configure_logging(app)
+
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
@@ -57,10 +63,34 @@ def create_app(config_name='default'):
     from app.routes.auth import auth_bp
     from app.routes.user import user_bp
     from app.routes.tracking import tracking_bp
+    from app.routes.finance import finance_bp
+    from app.routes.gamification import gamification_bp
 
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(user_bp, url_prefix='/api/user')
     app.register_blueprint(tracking_bp, url_prefix='/api/tracking')
+    app.register_blueprint(finance_bp, url_prefix='/api/finance')
+    app.register_blueprint(gamification_bp, url_prefix='/api/gamification')
+    register_pagination_errors(app)
+    register_field_errors(app)
+
+    # Register CLI commands and the optional in-process daily rollover
+    from app.rollover import rollover_cli, start_scheduler
+    app.cli.add_command(rollover_cli)
+    from app.search import search_cli
+    app.cli.add_command(search_cli)
+    from app.weight_import import weight_logs_cli
+    app.cli.add_command(weight_logs_cli)
+    from app.rollups import rollups_cli
+    app.cli.add_command(rollups_cli)
+    from app.ledger import ledger_cli
+    app.cli.add_command(ledger_cli)
+    from app.forecast import finance_cli
+    app.cli.add_command(finance_cli)
+    from app.thumbnails import photos_cli
+    app.cli.add_command(photos_cli)
+    if app.config.get('ROLLOVER_SCHEDULER_ENABLED'):
+        start_scheduler(app)
 
     @app.route('/')
     def test_route():
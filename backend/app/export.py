@@ -0,0 +1,85 @@
+"""Streaming export of everything a user has recorded.
+
+The export is newline-delimited JSON: a profile record, then one record per
+row of each per-user table, e.g. {"type": "journal", "data": {...}}. Rows
+are read as plain column tuples with yield_per, which streams them from a
+server-side cursor on PostgreSQL, and the response is produced by a
+generator, so memory stays flat however long the history is. Output can be
+gzip-compressed incrementally as it is written.
+"""
+import json
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from app.extensions import db
+from app.models import (
+    User, Journal, WeightLog, ProgressPhoto, Activity, UserActivity, UserActivityLog,
+    DailyCheckIn, Asset, MonthlyExpense, Income, FinancialGoal
+)
+
+EXPORT_BATCH_SIZE = 1000
+FLUSH_SIZE = 64 * 1024
+
+# Record type -> model, in export order
+EXPORT_TABLES = [
+    ('journal', Journal),
+    ('weight_log', WeightLog),
+    ('progress_photo', ProgressPhoto),
+    ('custom_activity', Activity),
+    ('activity_selection', UserActivity),
+    ('check_in', DailyCheckIn),
+    ('xp_log', UserActivityLog),
+    ('asset', Asset),
+    ('monthly_expense', MonthlyExpense),
+    ('income', Income),
+    ('financial_goal', FinancialGoal)
+]
+
+PROFILE_COLUMNS = ['id', 'username', 'email', 'level', 'current_xp', 'streak_days', 'multiplier', 'created_at']
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+def export_records(user_id):
+    """Yield the user's export records as (type, data) pairs."""
+    profile = db.session.execute(
+        db.select(*(getattr(User, column) for column in PROFILE_COLUMNS)).where(User.id == user_id)
+    ).mappings().first()
+    if profile is not None:
+        yield 'profile', dict(profile)
+
+    for record_type, model in EXPORT_TABLES:
+        table = model.__table__
+        result = db.session.execute(
+            db.select(*table.columns).where(table.c.user_id == user_id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        for row in result.mappings():
+            yield record_type, dict(row)
+
+def iter_ndjson(records, compress=False):
+    """Encode records as NDJSON in chunks of about FLUSH_SIZE bytes, gzip-compressed if asked."""
+    compressor = zlib.compressobj(wbits=31) if compress else None  # 31: gzip container
+    buffer = []
+    size = 0
+    for record_type, data in records:
+        line = json.dumps({'type': record_type, 'data': data}, default=_json_default,
+                          separators=(',', ':')).encode() + b'\n'
+        buffer.append(line)
+        size += len(line)
+        if size >= FLUSH_SIZE:
+            chunk = b''.join(buffer)
+            buffer, size = [], 0
+            chunk = compressor.compress(chunk) if compressor else chunk
+            if chunk:
+                yield chunk
+
+    chunk = b''.join(buffer)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
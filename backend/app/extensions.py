@@ -2,8 +2,16 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 db = SQLAlchemy()
 migrate = Migrate()
 cors = CORS(resources={r"/*": {"origins": "*"}})
-jwt = JWTManager()
\ No newline at end of file
+jwt = JWTManager()
+
+# Dialects with INSERT ... ON CONFLICT, mapped to their insert construct
+UPSERT_DIALECTS = {
+    'postgresql': postgresql_insert,
+    'sqlite': sqlite_insert
+}
@@ -0,0 +1,46 @@
+"""Sparse fieldsets for the list endpoints.
+
+Each list route describes its response fields as a map of field name to
+accessor. ?fields=a,b picks a subset; the columns behind the other fields
+are deferred in the SQL with load_only(), so they are neither read nor
+serialized.
+"""
+from flask import request, jsonify
+from sqlalchemy.orm import load_only
+
+class InvalidFields(ValueError):
+    """Raised when ?fields= names a field the endpoint does not have."""
+
+def get_fields(field_map, default=None):
+    """
+    Parse ?fields= against field_map; id is always included.
+    Returns the selected field names in field_map order, or default (all fields) when absent.
+    """
+    raw = request.args.get('fields')
+    if not raw:
+        return list(default or field_map)
+
+    requested = {field.strip() for field in raw.split(',') if field.strip()}
+    unknown = requested - set(field_map)
+    if unknown:
+        raise InvalidFields(f'Unknown fields: {", ".join(sorted(unknown))}')
+    requested.add('id')
+    return [field for field in field_map if field in requested]
+
+def load_fields(query, model, fields, *extra_columns):
+    """Load only the columns named by fields and extra_columns (e.g. the sort key)."""
+    needed = [
+        column.key for column in model.__table__.columns
+        if column.key in fields or column.key in extra_columns
+    ]
+    return query.options(load_only(*(getattr(model, name) for name in needed)))
+
+def serialize(obj, field_map, fields):
+    """Build the response dict of obj for the selected fields."""
+    return {field: field_map[field](obj) for field in fields}
+
+def register_field_errors(app):
+    """Answer unknown fields with a 400 in the usual error shape."""
+    @app.errorhandler(InvalidFields)
+    def handle_invalid_fields(error):
+        return jsonify({'error': str(error)}), 400
@@ -0,0 +1,129 @@
+"""Per-user financial summary, computed in one statement and cached.
+
+The four totals are scalar subqueries of a one-row CTE that is outer joined
+to the user's in-progress goals, so the whole summary is a single round
+trip. Results are kept per app, keyed by the user's data version and the
+current month: the finance write routes drop the local entry when they
+commit, and any write made through another worker bumps the version, so a
+stale entry is never served.
+"""
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, and_
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models import Asset, MonthlyExpense, Income, FinancialGoal
+from app.versioning import current_data_version
+
+class FinancialSummaryCache:
+    """Least recently used summaries, one entry per user."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # user_id -> (key, summary)
+        self._lock = threading.Lock()
+
+    def get(self, user_id, key):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] != key:
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[1]
+
+    def set(self, user_id, key, summary):
+        with self._lock:
+            self._entries[user_id] = (key, summary)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+def _get_cache(app=None):
+    app = app or current_app._get_current_object()
+    cache = app.extensions.get('financial_summary_cache')
+    if cache is None:
+        cache = app.extensions.setdefault(
+            'financial_summary_cache',
+            FinancialSummaryCache(app.config.get('FINANCIAL_SUMMARY_CACHE_SIZE', 10000))
+        )
+    return cache
+
+def _month_start(now=None):
+    now = now or datetime.now(timezone.utc)
+    return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+def _total(column, *criteria):
+    return db.select(func.coalesce(func.sum(column), 0)).where(*criteria).scalar_subquery()
+
+def load_financial_summary(user_id, month_start=None):
+    """Compute the summary with one statement, bypassing the cache."""
+    month_start = month_start or _month_start()
+    totals = db.select(
+        _total(Asset.value, Asset.user_id == user_id).label('total_assets'),
+        _total(MonthlyExpense.amount, MonthlyExpense.user_id == user_id).label('total_monthly_expenses'),
+        _total(Income.amount, Income.user_id == user_id, Income.date >= month_start).label('total_monthly_income'),
+        _total(Income.amount, Income.user_id == user_id, Income.is_recurring == True).label('recurring_income')
+    ).cte('totals')
+
+    # One row per in-progress goal, or a single row of NULL goal columns when there are none
+    rows = db.session.execute(
+        db.select(
+            totals,
+            FinancialGoal.name, FinancialGoal.target_amount, FinancialGoal.current_amount, FinancialGoal.deadline
+        ).select_from(
+            totals.outerjoin(FinancialGoal, and_(
+                FinancialGoal.user_id == user_id, FinancialGoal.status == 'In Progress'
+            ))
+        ).order_by(FinancialGoal.created_at, FinancialGoal.id)
+    ).all()
+
+    first = rows[0]
+    goals_summary = [{
+        'name': row.name,
+        'target_amount': row.target_amount,
+        'current_amount': row.current_amount,
+        'progress_percentage': (row.current_amount / row.target_amount) * 100 if row.target_amount > 0 else 0,
+        'deadline': row.deadline.isoformat() if row.deadline else None
+    } for row in rows if row.name is not None]
+
+    return {
+        'total_assets': first.total_assets,
+        'total_monthly_expenses': first.total_monthly_expenses,
+        'total_monthly_income': first.total_monthly_income,
+        'recurring_income': first.recurring_income,
+        'monthly_savings': first.total_monthly_income - first.total_monthly_expenses,
+        'active_goals': goals_summary
+    }
+
+def cached_financial_summary(user_id):
+    """The user's summary from the cache, computing it on a miss. Treat it as read-only."""
+    month_start = _month_start()
+    key = (current_data_version(user_id), month_start)
+    cache = _get_cache()
+    summary = cache.get(user_id, key)
+    if summary is None:
+        summary = load_financial_summary(user_id, month_start)
+        cache.set(user_id, key, summary)
+    return summary
+
+def invalidate_financial_summary(user_id):
+    """Drop the user's cached summary once the current transaction commits."""
+    db.session.info.setdefault('financial_summary_changed', set()).add(user_id)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    user_ids = session.info.pop('financial_summary_changed', None)
+    if user_ids and has_app_context():
+        cache = _get_cache()
+        for user_id in user_ids:
+            cache.invalidate(user_id)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_on_rollback(session):
+    session.info.pop('financial_summary_changed', None)
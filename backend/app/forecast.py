@@ -0,0 +1,317 @@
+"""Monte Carlo forecast of whether financial goals will be reached.
+
+A path's net saving in each future month is the net of the user's
+recurring income and expenses due that month, expanded from their schedules
+like the cash-flow projection (app/projection.py), plus a one-off net drawn
+with replacement from the user's own history: the net of the non-recurring
+entries of every complete month over the last HISTORY_MONTHS since the
+first month in the ledger (app/ledger.py), months without any counting as
+zero. Recurring items are never resampled, since the ledger books a
+recurring expense only in the month it was added. A path's savings are
+split evenly over the user's in-progress goals and added to each goal's
+current amount; the probability of a goal is the share of paths that reach
+its target in a month before its deadline. All paths are one (paths x months) NumPy array,
+so thousands of them take milliseconds; the RNG is seedable for
+reproducible results.
+
+Results are stored per goal in goal_forecasts and served until they are a
+day old or a write to the user's income, expenses or goals deletes them
+(a Session after_flush listener, like the rollups). `flask finance
+forecast` recomputes every user's goals across a process pool.
+"""
+import logging
+import multiprocessing
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone, timedelta
+import click
+import numpy as np
+from flask.cli import AppGroup
+from sqlalchemy import delete, event, func, insert, type_coerce, Date
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.extensions import db, UPSERT_DIALECTS
+from app.ledger import add_months, month_of
+from app.models import Income, MonthlyExpense, FinancialGoal, GoalForecast, MonthlyLedgerRollup
+from app.projection import expand_items, recurring_items
+from app.rollups import bucket_of
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATHS = 5000
+MIN_PATHS = 100
+MAX_PATHS = 50000
+HISTORY_MONTHS = 24
+DEFAULT_HORIZON_MONTHS = 60  # For goals without a deadline
+AVERAGE_MONTH_DAYS = 365.25 / 12
+FORECAST_MAX_AGE = timedelta(days=1)
+
+finance_cli = AppGroup('finance', help='Financial forecasts.')
+
+GoalInput = namedtuple('GoalInput', ['id', 'target_amount', 'current_amount', 'months'])
+
+def months_until(deadline, today):
+    """Whole months from today to deadline; None without a deadline."""
+    if deadline is None:
+        return None
+    return max(int((deadline.date() - today).days / AVERAGE_MONTH_DAYS), 0)
+
+def forecast_horizon(goals):
+    """Months simulated for a user's goals (GoalInput list)."""
+    horizon = max([goal.months for goal in goals if goal.months is not None] + [1])
+    if any(goal.months is None for goal in goals):
+        horizon = max(horizon, DEFAULT_HORIZON_MONTHS)
+    return horizon
+
+def recurring_baseline(incomes, expenses, today, months):
+    """Net of the recurring items (RecurringItem lists) in each of the next months, as a list."""
+    days = int(np.ceil(months * AVERAGE_MONTH_DAYS))
+    flows = expand_items(incomes, today, days) - expand_items(expenses, today, days)
+    # Months of AVERAGE_MONTH_DAYS from today, like the goal deadlines
+    month_index = (np.arange(days) / AVERAGE_MONTH_DAYS).astype(int)
+    return np.bincount(month_index, weights=flows, minlength=months)[:months].tolist()
+
+def simulate_goals(goals, history, paths, seed=None, baseline=None):
+    """
+    Simulate savings paths for a user's goals (GoalInput list) from their
+    history of one-off monthly nets, added to the recurring net of each
+    future month in baseline (at least forecast_horizon(goals) long) when
+    given. Runs in worker processes, so it only takes and returns plain
+    values. Returns goal id -> forecast dict, with completion as a number of
+    months from now.
+    """
+    rng = np.random.default_rng(seed)
+    horizon = forecast_horizon(goals)
+    draws = rng.choice(np.asarray(history, dtype=float), size=(paths, horizon))
+    if baseline is not None:
+        draws += np.asarray(baseline, dtype=float)[:horizon]
+    # Cumulative savings per path and month, shared evenly by the goals
+    savings = np.cumsum(draws, axis=1) / len(goals)
+
+    forecasts = {}
+    for goal in goals:
+        months = goal.months if goal.months is not None else DEFAULT_HORIZON_MONTHS
+        amounts = goal.current_amount + savings[:, :months]
+        if months == 0:
+            amounts = np.full((paths, 1), goal.current_amount)
+        reached = amounts >= goal.target_amount
+        hit = reached.any(axis=1) | (goal.current_amount >= goal.target_amount)
+        # Months until the target is first reached, on the paths that reach it
+        completion = np.where(goal.current_amount >= goal.target_amount, 0, reached.argmax(axis=1) + 1)[hit]
+        final = amounts[:, -1]
+        p10, p50, p90 = np.percentile(final, [10, 50, 90])
+        forecasts[goal.id] = {
+            'probability': float(hit.mean()) if goal.months is not None else None,
+            'expected_amount': float(final.mean()),
+            'p10_amount': float(p10),
+            'p50_amount': float(p50),
+            'p90_amount': float(p90),
+            # Only meaningful when at least half of the paths get there
+            'completion_months': float(np.median(completion)) if hit.mean() >= 0.5 else None
+        }
+    return forecasts
+
+def _one_off_nets(user_id, start):
+    """Month -> net of the user's non-recurring income and expenses from start on."""
+    dialect_name = db.session.get_bind().dialect.name
+    nets = {}
+    for source, timestamp, sign in ((Income, 'date', 1.0), (MonthlyExpense, 'created_at', -1.0)):
+        column = getattr(source, timestamp)
+        month = type_coerce(bucket_of(column, 'month', dialect_name), Date)
+        for month_value, total in db.session.execute(
+            db.select(month, func.sum(source.amount))
+            .where(source.user_id == user_id, func.coalesce(source.is_recurring, False) == False,
+                   column >= datetime.combine(start, datetime.min.time()))
+            .group_by(month)
+        ):
+            nets[month_value] = nets.get(month_value, 0.0) + sign * total
+    return nets
+
+def monthly_history(user_id, today):
+    """
+    One-off net savings of each complete month of the last HISTORY_MONTHS,
+    oldest first; [0.0] when there is no complete month yet.
+    """
+    current = month_of(today)
+    start = add_months(current, -HISTORY_MONTHS)
+    # History starts with the first month the user recorded anything in, recurring or not
+    first = db.session.scalar(
+        db.select(func.min(MonthlyLedgerRollup.month))
+        .where(MonthlyLedgerRollup.user_id == user_id, MonthlyLedgerRollup.month >= start)
+    )
+    nets = _one_off_nets(user_id, start)
+    if first is None or first >= current:
+        # No complete month to go on; the current one's entries say nothing of a whole month
+        return [0.0]
+    # Months without one-off entries from the first recorded one on only saved their recurring net
+    months = (current.year - first.year) * 12 + current.month - first.month
+    return [nets.get(add_months(first, i), 0.0) for i in range(months)]
+
+def simulation_inputs(user_id, goals, today):
+    """(history, baseline) of a user for simulate_goals, for their goals (GoalInput list)."""
+    incomes, expenses = recurring_items(user_id)
+    baseline = recurring_baseline(incomes, expenses, today, forecast_horizon(goals))
+    return monthly_history(user_id, today), baseline
+
+def _goal_inputs(goals, today):
+    return [GoalInput(goal.id, goal.target_amount, goal.current_amount or 0.0, months_until(goal.deadline, today))
+            for goal in goals]
+
+def _active_goals(user_id):
+    return FinancialGoal.query.filter_by(user_id=user_id, status='In Progress').order_by(
+        FinancialGoal.created_at, FinancialGoal.id
+    ).all()
+
+def _store_forecasts(user_id, forecasts, paths, seed, now):
+    # Forecasts of goals no longer in progress go; the others are overwritten in place,
+    # so concurrent requests that both found them stale do not collide on goal_id
+    db.session.execute(delete(GoalForecast).where(
+        GoalForecast.user_id == user_id, GoalForecast.goal_id.notin_(list(forecasts))
+    ))
+    rows = []
+    for goal_id, forecast in forecasts.items():
+        completion = forecast['completion_months']
+        rows.append({
+            'goal_id': goal_id,
+            'user_id': user_id,
+            'probability': forecast['probability'],
+            'expected_amount': forecast['expected_amount'],
+            'p10_amount': forecast['p10_amount'],
+            'p50_amount': forecast['p50_amount'],
+            'p90_amount': forecast['p90_amount'],
+            'median_completion_date': (
+                now.date() + timedelta(days=round(completion * AVERAGE_MONTH_DAYS))
+                if completion is not None else None
+            ),
+            'paths': paths,
+            'seed': seed,
+            'computed_at': now
+        })
+    if not rows:
+        return
+    dialect_insert = UPSERT_DIALECTS.get(db.session.get_bind().dialect.name)
+    if dialect_insert is None:
+        db.session.execute(delete(GoalForecast).where(GoalForecast.goal_id.in_(list(forecasts))))
+        db.session.execute(insert(GoalForecast), rows)
+        return
+    stmt = dialect_insert(GoalForecast).values(rows)
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=['goal_id'],
+        set_={name: stmt.excluded[name] for name in rows[0] if name != 'goal_id'}
+    ))
+
+def _goal_to_dict(goal):
+    return {
+        'goal_id': goal.id,
+        'name': goal.name,
+        'target_amount': goal.target_amount,
+        'current_amount': goal.current_amount,
+        'deadline': goal.deadline.isoformat() if goal.deadline else None
+    }
+
+def _forecast_to_dict(goal, forecast):
+    return {
+        **goal,
+        'probability': forecast.probability,
+        'expected_amount': round(forecast.expected_amount, 2),
+        'percentiles': {
+            'p10': round(forecast.p10_amount, 2),
+            'p50': round(forecast.p50_amount, 2),
+            'p90': round(forecast.p90_amount, 2)
+        },
+        'median_completion_date': (
+            forecast.median_completion_date.isoformat() if forecast.median_completion_date else None
+        ),
+        'computed_at': forecast.computed_at.isoformat()
+    }
+
+def goal_forecasts(user_id, paths=DEFAULT_PATHS, seed=None):
+    """
+    Forecasts of the user's in-progress goals, simulating again only when a
+    goal has no fresh stored forecast for these paths and seed.
+    """
+    goals = _active_goals(user_id)
+    if not goals:
+        return []
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    stored = {
+        forecast.goal_id: forecast
+        for forecast in GoalForecast.query.filter_by(user_id=user_id)
+        if forecast.paths == paths and forecast.seed == seed and now - forecast.computed_at < FORECAST_MAX_AGE
+    }
+    results = [_goal_to_dict(goal) for goal in goals]  # Before the commit expires the goals
+    if any(goal.id not in stored for goal in goals):
+        inputs = _goal_inputs(goals, now.date())
+        history, baseline = simulation_inputs(user_id, inputs, now.date())
+        forecasts = simulate_goals(inputs, history, paths, seed, baseline=baseline)
+        try:
+            _store_forecasts(user_id, forecasts, paths, seed, now)
+            db.session.commit()
+        except IntegrityError:
+            # Another request stored them first (or a goal went meanwhile); theirs are as fresh
+            db.session.rollback()
+            logger.info("Forecasts of user %s were stored concurrently", user_id)
+        stored = {forecast.goal_id: forecast for forecast in GoalForecast.query.filter_by(user_id=user_id)}
+    return [_forecast_to_dict(goal, stored[goal['goal_id']]) for goal in results if goal['goal_id'] in stored]
+
+def recompute_all_forecasts(workers, paths=DEFAULT_PATHS, seed=None):
+    """
+    Recompute the forecasts of every user with in-progress goals across a
+    pool of worker processes, storing each user's as it completes.
+    Inputs are read here, so at most two users per worker are in flight.
+    Returns (users, failed) counts.
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    user_ids = db.session.scalars(
+        db.select(FinancialGoal.user_id).where(FinancialGoal.status == 'In Progress')
+        .distinct().order_by(FinancialGoal.user_id)
+    ).all()
+    done = failed = 0
+    pending = deque()
+
+    def collect(user_id, future):
+        nonlocal done, failed
+        try:
+            _store_forecasts(user_id, future.result(), paths, seed, now)
+            db.session.commit()
+            done += 1
+        except Exception:
+            db.session.rollback()
+            logger.exception("Could not forecast the goals of user %s", user_id)
+            failed += 1
+
+    # spawn, so workers never inherit the locks of the server's threads
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        for user_id in user_ids:
+            if len(pending) >= 2 * workers:
+                collect(*pending.popleft())
+            goals = _goal_inputs(_active_goals(user_id), now.date())
+            history, baseline = simulation_inputs(user_id, goals, now.date())
+            pending.append((user_id, pool.submit(simulate_goals, goals, history, paths, seed, baseline)))
+        while pending:
+            collect(*pending.popleft())
+    return done, failed
+
+# Changes to these make a user's stored forecasts stale
+FORECAST_SOURCES = (Income, MonthlyExpense, FinancialGoal)
+
+@event.listens_for(Session, 'after_flush')
+def _discard_stale_forecasts(session, flush_context):
+    user_ids = {
+        obj.user_id for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+        if isinstance(obj, FORECAST_SOURCES) and obj.user_id is not None
+    }
+    if user_ids:
+        session.connection().execute(delete(GoalForecast.__table__).where(GoalForecast.user_id.in_(user_ids)))
+
+@finance_cli.command('forecast')
+@click.option('--workers', default=None, type=int,
+              help='Worker processes; defaults to one per CPU core.')
+@click.option('--paths', default=DEFAULT_PATHS, show_default=True, type=click.IntRange(MIN_PATHS, MAX_PATHS),
+              help='Simulated paths per user.')
+@click.option('--seed', default=None, type=int, help='Seed of the random generator.')
+def forecast_command(workers, paths, seed):
+    """Recompute the goal forecasts of every user with in-progress goals."""
+    workers = workers or multiprocessing.cpu_count()
+    done, failed = recompute_all_forecasts(workers, paths=paths, seed=seed)
+    click.echo(f"Forecast goals for {done} users, {failed} failed")
@@ -0,0 +1,79 @@
+"""Background jobs run off the request thread.
+
+Jobs execute in a small in-process thread pool inside an app context. Their
+status lives in the background_jobs table, so any worker can answer a status
+request for a job started by another one.
+"""
+import json
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from flask import current_app
+from app.extensions import db
+from app.models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+def _get_executor(app):
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=app.config.get('BACKGROUND_JOB_WORKERS', 2),
+            thread_name_prefix='background-job'
+        )
+    return _executor
+
+def submit_job(kind, user_id, func, *args, **kwargs):
+    """
+    Record a pending job and schedule func(*args, **kwargs) to run in the background.
+    Returns the BackgroundJob row; its id is handed back to the client.
+    """
+    job = BackgroundJob(id=str(uuid.uuid4()), user_id=user_id, kind=kind, status='pending')
+    db.session.add(job)
+    db.session.commit()
+
+    app = current_app._get_current_object()
+    if app.config.get('BACKGROUND_JOBS_EAGER'):
+        # Run inline, e.g. under tests
+        _run_job(app, job.id, func, args, kwargs)
+        db.session.refresh(job)
+    else:
+        _get_executor(app).submit(_run_job, app, job.id, func, args, kwargs)
+    return job
+
+def _run_job(app, job_id, func, args, kwargs):
+    with app.app_context():
+        job = db.session.get(BackgroundJob, job_id)
+        job.status = 'running'
+        job.started_at = datetime.now(timezone.utc)
+        db.session.commit()
+
+        try:
+            result = func(*args, **kwargs)
+            job = db.session.get(BackgroundJob, job_id)
+            job.status = 'completed'
+            job.result = json.dumps(result) if result is not None else None
+        except Exception as e:
+            db.session.rollback()
+            logger.exception("Background job %s (%s) failed", job_id, job.kind)
+            job = db.session.get(BackgroundJob, job_id)
+            job.status = 'failed'
+            job.error = str(e)
+
+        job.finished_at = datetime.now(timezone.utc)
+        db.session.commit()
+
+def job_to_dict(job):
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'result': json.loads(job.result) if job.result else None,
+        'error': job.error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None
+    }
@@ -0,0 +1,159 @@
+"""Per-user monthly ledger of income and expenses.
+
+Income (by its date) and monthly expenses (by the month they were added)
+are summarised into one row per user, month and category with the income,
+expense and net totals, which is all the income-expense trend reads. Like
+the daily tracking rollups, a Session after_flush listener recomputes the
+months touched by every flush in the same transaction as the write, and
+`flask ledger rebuild` backfills from scratch on any database.
+"""
+from datetime import date, datetime, time, timezone
+import click
+from flask.cli import AppGroup
+from sqlalchemy import delete, event, func, insert, inspect, literal, select, type_coerce, union_all, Date
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models import User, Income, MonthlyExpense, MonthlyLedgerRollup
+from app.rollups import bucket_of, upsert_from_select
+
+DEFAULT_BATCH_SIZE = 100
+MAX_TREND_MONTHS = 120  # Far below the months that would take add_months before year 1
+
+ledger_cli = AppGroup('ledger', help='Monthly income and expense ledger.')
+
+# Source model -> timestamp attribute that places an entry in a month
+LEDGER_SOURCES = {Income: 'date', MonthlyExpense: 'created_at'}
+LEDGER_ATTRIBUTES = ('user_id', 'amount', 'category')
+
+LEDGER_COLUMNS = ['user_id', 'month', 'category', 'income', 'expenses', 'net']
+
+def month_of(value):
+    return date(value.year, value.month, 1)
+
+def add_months(month, count):
+    """First day of the month count months after (or before) month."""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+def _ledger_rows(dialect_name, user_ids, start=None, end=None):
+    """Ledger rows of the given users grouped from both source tables, optionally in [start, end)."""
+    entries = []
+    for source, timestamp in LEDGER_SOURCES.items():
+        column = getattr(source, timestamp)
+        is_income = source is Income
+        criteria = [source.user_id.in_(user_ids)]
+        if start is not None:
+            # The range lets the (user_id, date) index narrow the income scan
+            criteria += [column >= start, column < end]
+        entries.append(select(
+            source.user_id.label('user_id'),
+            type_coerce(bucket_of(column, 'month', dialect_name), Date).label('month'),
+            func.coalesce(source.category, '').label('category'),
+            (source.amount if is_income else literal(0.0)).label('income'),
+            (literal(0.0) if is_income else source.amount).label('expenses')
+        ).where(*criteria))
+    entries = union_all(*entries).subquery()
+
+    income = func.sum(entries.c.income)
+    expenses = func.sum(entries.c.expenses)
+    return select(
+        entries.c.user_id, entries.c.month, entries.c.category, income, expenses, income - expenses
+    ).group_by(entries.c.user_id, entries.c.month, entries.c.category)
+
+def refresh_ledger(user_id, months, connection=None):
+    """Recompute a user's ledger rows for the given months from the source tables."""
+    months = sorted(set(months))
+    if not months:
+        return
+    connection = connection or db.session.connection()
+    start = datetime.combine(months[0], time.min)
+    end = datetime.combine(add_months(months[-1], 1), time.min)
+
+    rows = _ledger_rows(connection.dialect.name, [user_id], start, end)
+    # Months between the refreshed ones keep their rows
+    rows = rows.having(rows.selected_columns.month.in_(months))
+    target = MonthlyLedgerRollup
+    connection.execute(delete(target.__table__).where(target.user_id == user_id, target.month.in_(months)))
+    # An upsert, so a concurrent refresh of the same month cannot hit the primary key
+    connection.execute(upsert_from_select(connection.dialect.name, target.__table__, LEDGER_COLUMNS, rows))
+
+def _history_values(state, key):
+    # Old and new values without loading anything that is not already loaded
+    return [value for value in state.attrs[key].history.sum() if value is not None]
+
+def _changed_months(session):
+    """user_id -> months whose ledger rows the pending flush affects."""
+    changed = {}
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        timestamp = LEDGER_SOURCES.get(type(obj))
+        if timestamp is None:
+            continue
+        state = inspect(obj)
+        if obj in session.dirty and not any(
+            state.attrs[key].history.has_changes() for key in LEDGER_ATTRIBUTES + (timestamp,)
+        ):
+            continue  # e.g. only the name or notes changed
+        for user_id in _history_values(state, 'user_id'):
+            changed.setdefault(user_id, set()).update(
+                month_of(value) for value in _history_values(state, timestamp)
+            )
+    return changed
+
+@event.listens_for(Session, 'after_flush')
+def _refresh_after_flush(session, flush_context):
+    changed = _changed_months(session)
+    if not changed:
+        return
+    connection = session.connection()
+    for user_id, months in changed.items():
+        refresh_ledger(user_id, months, connection=connection)
+
+def rebuild_ledger(user_id=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Recompute the ledger from the source tables, batch_size users per transaction.
+    Returns the number of users processed.
+    """
+    processed = 0
+    last_id = ''
+    while True:
+        query = select(User.id).where(User.id > last_id).order_by(User.id).limit(batch_size)
+        if user_id is not None:
+            query = query.where(User.id == user_id)
+        user_ids = db.session.scalars(query).all()
+        if not user_ids:
+            return processed
+
+        connection = db.session.connection()
+        target = MonthlyLedgerRollup
+        connection.execute(delete(target.__table__).where(target.user_id.in_(user_ids)))
+        connection.execute(insert(target.__table__).from_select(LEDGER_COLUMNS, _ledger_rows(
+            connection.dialect.name, user_ids
+        )))
+        db.session.commit()
+        processed += len(user_ids)
+        last_id = user_ids[-1]
+
+def monthly_ledger(user_id, months, today=None):
+    """
+    Income, expense and net totals of the last `months` months, including the
+    current one, oldest first. Reads one grouped row per month with entries.
+    """
+    end = month_of(today or datetime.now(timezone.utc).date())
+    start = add_months(end, 1 - months)
+    target = MonthlyLedgerRollup
+    return db.session.execute(
+        select(target.month, func.sum(target.income).label('income'),
+               func.sum(target.expenses).label('expenses'), func.sum(target.net).label('net'))
+        .where(target.user_id == user_id, target.month >= start, target.month <= end)
+        .group_by(target.month)
+        .order_by(target.month)
+    ).all()
+
+@ledger_cli.command('rebuild')
+@click.option('--user', 'user_id', default=None, help='Only rebuild this user id.')
+@click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True, type=int,
+              help='Users rebuilt per transaction.')
+def rebuild_ledger_command(user_id, batch_size):
+    """Recompute the monthly ledger from the income and expense tables."""
+    processed = rebuild_ledger(user_id=user_id, batch_size=batch_size)
+    click.echo(f"Rebuilt the ledger for {processed} users")
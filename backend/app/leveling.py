@@ -0,0 +1,64 @@
+"""XP-to-level math shared by the routes and the User model.
+
+Completing level N costs calculate_xp_for_level(N) XP, so reaching level N
+requires the sum of the costs of levels 1..N-1. Those cumulative thresholds
+are precomputed once at import time, extended on demand for very large XP
+values, and searched by bisection.
+"""
+from bisect import bisect_right
+import threading
+
+INITIAL_LEVELS = 1000  # Covers roughly the first 13 million XP
+
+# _thresholds[i] is the total XP needed to reach level i + 1
+_thresholds = [0]
+_lock = threading.Lock()
+
+def calculate_xp_for_level(level):
+    """Calculate XP needed to complete a specific level."""
+    return int(500 + pow(level, 1.5))
+
+def _extend_thresholds(max_levels):
+    """Grow the threshold table until it holds max_levels entries."""
+    with _lock:
+        while len(_thresholds) < max_levels:
+            level = len(_thresholds)
+            _thresholds.append(_thresholds[-1] + calculate_xp_for_level(level))
+
+def _ensure_covers(total_xp):
+    """Make sure the table contains a threshold above total_xp."""
+    while _thresholds[-1] <= total_xp:
+        _extend_thresholds(len(_thresholds) * 2)
+
+def xp_required_for_level(level):
+    """Total XP needed to reach the given level."""
+    level = max(int(level), 1)
+    if level > len(_thresholds):
+        _extend_thresholds(level)
+    return _thresholds[level - 1]
+
+def level_for_xp(total_xp):
+    """Return the level reached with total_xp."""
+    total_xp = total_xp or 0
+    _ensure_covers(total_xp)
+    return max(bisect_right(_thresholds, total_xp), 1)
+
+def get_current_level_and_next_xp(total_xp):
+    """
+    Calculate current level and XP needed for next level based on total XP.
+    Returns (current_level, total_xp_required_for_next_level)
+    """
+    level = level_for_xp(total_xp)
+    return level, xp_required_for_level(level + 1)
+
+def get_level_progress(total_xp):
+    """
+    Describe where total_xp falls inside its level.
+    Returns (current_level, xp_into_level, xp_for_level)
+    """
+    total_xp = total_xp or 0
+    level = level_for_xp(total_xp)
+    level_start = xp_required_for_level(level)
+    return level, max(total_xp - level_start, 0), calculate_xp_for_level(level)
+
+_extend_thresholds(INITIAL_LEVELS)
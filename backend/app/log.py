@@ -0,0 +1,165 @@
+"""Application logging.
+
+Modules log through logging.getLogger(__name__), which places them under the
+"app" logger configured here. Records are tagged with the request ID, user ID
+and endpoint on the request thread, handed to a queue, and formatted as JSON
+lines by a background listener so request handlers never block on the output
+stream. Debug records can be sampled and rate limited per logger.
+"""
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from flask import g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+
+APP_LOGGER = 'app'
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+_listener = None
+
+class RequestContextFilter(logging.Filter):
+    """Attach request_id, user_id and endpoint to every record."""
+
+    def filter(self, record):
+        record.request_id = None
+        record.user_id = None
+        record.endpoint = None
+        if has_request_context():
+            record.request_id = g.get('request_id')
+            record.endpoint = request.endpoint
+            record.user_id = _current_user_id()
+        return True
+
+def _current_user_id():
+    try:
+        return get_jwt_identity()
+    except RuntimeError:
+        # No token has been verified for this request
+        return None
+
+class DebugSampler(logging.Filter):
+    """
+    Keep a sample_rate fraction of debug records and at most max_per_second
+    of them per logger. Records above DEBUG always pass.
+    """
+
+    def __init__(self, sample_rate=1.0, max_per_second=None):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.max_per_second = max_per_second
+        self._windows = {}  # logger name -> (window start, records let through)
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return False
+        if not self.max_per_second:
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            start, count = self._windows.get(record.name, (now, 0))
+            if now - start >= 1.0:
+                start, count = now, 0
+            if count >= self.max_per_second:
+                self._windows[record.name] = (start, count)
+                return False
+            self._windows[record.name] = (start, count + 1)
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+            'user_id': getattr(record, 'user_id', None),
+            'endpoint': getattr(record, 'endpoint', None)
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Already rendered by ContextQueueHandler
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class ContextQueueHandler(QueueHandler):
+    """Queue handler that keeps the traceback apart from the message."""
+
+    def prepare(self, record):
+        # Merge the arguments now, on the request thread, and drop anything unpicklable
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def configure_logging(app):
+    """Install the queue handler on the "app" logger and tag requests with an ID."""
+    global _listener
+    logger = logging.getLogger(APP_LOGGER)
+    logger.setLevel(app.config.get('LOG_LEVEL', 'INFO'))
+    logger.propagate = False
+
+    # Replace the handler installed by a previous create_app call
+    _stop_listener()
+    for handler in list(logger.handlers):
+        if getattr(handler, '_app_log_handler', False):
+            logger.removeHandler(handler)
+
+    output = logging.StreamHandler(sys.stderr)
+    if app.config.get('LOG_JSON', True):
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter(
+            '%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s'
+        ))
+
+    records = queue.SimpleQueue()
+    handler = ContextQueueHandler(records)
+    handler._app_log_handler = True
+    handler.addFilter(DebugSampler(
+        sample_rate=app.config.get('LOG_DEBUG_SAMPLE_RATE', 1.0),
+        max_per_second=app.config.get('LOG_DEBUG_MAX_PER_SECOND')
+    ))
+    handler.addFilter(RequestContextFilter())
+    logger.addHandler(handler)
+
+    _listener = QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+
+    @app.before_request
+    def assign_request_id():
+        g.request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+
+    @app.after_request
+    def add_request_id_header(response):
+        request_id = g.get('request_id')
+        if request_id:
+            response.headers[REQUEST_ID_HEADER] = request_id
+        return response
+
+atexit.register(_stop_listener)
@@ -1,15 +1,25 @@
 from app.models.user import User
-from app.models.activity import Activity, UserActivity, UserActivityLog
-from app.models.tracking import Journal, WeightLog, ProgressPhoto
+from app.models.activity import Activity, UserActivity, UserActivityLog, DailyRollover
+from app.models.tracking import (
+    Journal, WeightLog, ProgressPhoto, DailyWeightRollup, DailyMoodRollup, DailyPhotoRollup
+)
 from .gamification import DailyCheckIn, Achievement, WeeklyMission
-from .finance import Asset, MonthlyExpense, Income, FinancialGoal
+from .finance import Asset, MonthlyExpense, Income, FinancialGoal, MonthlyLedgerRollup, GoalForecast
+from .job import BackgroundJob
+from .reference import ReferenceDataVersion
 
 __all__ = [
     'User',
     'Activity',
     'UserActivity',
     'UserActivityLog',
+    'DailyRollover',
     'Journal',
     'WeightLog',
-    'ProgressPhoto'
+    'ProgressPhoto',
+    'DailyWeightRollup',
+    'DailyMoodRollup',
+    'DailyPhotoRollup',
+    'BackgroundJob',
+    'ReferenceDataVersion'
 ]
\ No newline at end of file
@@ -38,6 +38,8 @@ class UserActivity(db.Model):
     __tablename__ = 'user_activities'
     __table_args__ = (
         db.UniqueConstraint('user_id', 'activity_id', name='_user_activity_uc'),
+        db.Index('ix_user_activities_user_id_is_active', 'user_id', 'is_active'),
+        db.Index('ix_user_activities_user_id_date_completed', 'user_id', 'date', 'is_completed_today'),
         {'extend_existing': True}
     )
     
@@ -69,10 +71,24 @@ class UserActivity(db.Model):
 
 class UserActivityLog(db.Model):
     __tablename__ = 'user_activity_logs'
+    __table_args__ = (
+        db.Index('ix_user_activity_logs_user_id_date', 'user_id', 'date'),
+    )
     
     id = db.Column(db.String(36), primary_key=True)
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
     activity_id = db.Column(db.String(36), db.ForeignKey('activities.id'), nullable=False)
     date = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     xp_earned = db.Column(db.Float, nullable=False)
-    multiplier = db.Column(db.Float, default=1.0)
\ No newline at end of file
+    multiplier = db.Column(db.Float, default=1.0)
+
+class DailyRollover(db.Model):
+    __tablename__ = 'daily_rollovers'
+    
+    day = db.Column(db.Date, primary_key=True)  # The day being closed out
+    last_user_id = db.Column(db.String(36))  # Resume point for the batched run
+    users_processed = db.Column(db.Integer, default=0)
+    streaks_broken = db.Column(db.Integer, default=0)
+    flags_reset = db.Column(db.Integer, default=0)
+    started_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    completed_at = db.Column(db.DateTime)
@@ -28,6 +28,9 @@ class MonthlyExpense(db.Model):
 
 class Income(db.Model):
     __tablename__ = 'income'
+    __table_args__ = (
+        db.Index('ix_income_user_id_date', 'user_id', 'date'),
+    )
     
     id = db.Column(db.String(36), primary_key=True)
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
@@ -52,4 +55,29 @@ class FinancialGoal(db.Model):
     category = db.Column(db.String(50))  # Savings, Investment, Debt Payoff
     status = db.Column(db.String(50), default='In Progress')
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
-    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
\ No newline at end of file
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+class MonthlyLedgerRollup(db.Model):
+    __tablename__ = 'monthly_ledger_rollups'
+    
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), primary_key=True)
+    month = db.Column(db.Date, primary_key=True)  # First day of the month
+    category = db.Column(db.String(50), primary_key=True)  # '' for uncategorised entries
+    income = db.Column(db.Float, nullable=False)
+    expenses = db.Column(db.Float, nullable=False)
+    net = db.Column(db.Float, nullable=False)
+
+class GoalForecast(db.Model):
+    __tablename__ = 'goal_forecasts'
+    
+    goal_id = db.Column(db.String(36), db.ForeignKey('financial_goals.id'), primary_key=True)
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
+    probability = db.Column(db.Float)  # Of reaching the target by the deadline; None without a deadline
+    expected_amount = db.Column(db.Float, nullable=False)  # At the deadline or the end of the horizon
+    p10_amount = db.Column(db.Float, nullable=False)
+    p50_amount = db.Column(db.Float, nullable=False)
+    p90_amount = db.Column(db.Float, nullable=False)
+    median_completion_date = db.Column(db.Date)
+    paths = db.Column(db.Integer, nullable=False)
+    seed = db.Column(db.Integer)
+    computed_at = db.Column(db.DateTime, nullable=False)
@@ -3,6 +3,9 @@ from datetime import datetime, timezone
 
 class DailyCheckIn(db.Model):
     __tablename__ = 'daily_check_ins'
+    __table_args__ = (
+        db.Index('ix_daily_check_ins_user_id_date', 'user_id', 'date'),
+    )
     
     id = db.Column(db.String(36), primary_key=True)
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
@@ -0,0 +1,15 @@
+from app.extensions import db
+from datetime import datetime, timezone
+
+class BackgroundJob(db.Model):
+    __tablename__ = 'background_jobs'
+    
+    id = db.Column(db.String(36), primary_key=True)
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=True)
+    kind = db.Column(db.String(50), nullable=False)  # reset_user, ...
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, running, completed, failed
+    result = db.Column(db.Text)  # JSON string returned by the job
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
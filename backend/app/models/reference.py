@@ -0,0 +1,9 @@
+from app.extensions import db
+from datetime import datetime, timezone
+
+class ReferenceDataVersion(db.Model):
+    __tablename__ = 'reference_data_versions'
+    
+    name = db.Column(db.String(50), primary_key=True)  # activities, achievements, weekly_missions
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
@@ -1,8 +1,13 @@
 from app.extensions import db
 from datetime import datetime, timezone
+from sqlalchemy import DDL, event
+from sqlalchemy.orm import query_expression
 
 class Journal(db.Model):
     __tablename__ = 'journals'
+    __table_args__ = (
+        db.Index('ix_journals_user_id_created_at', 'user_id', 'created_at'),
+    )
     
     id = db.Column(db.String(36), primary_key=True)
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
@@ -10,9 +15,69 @@ class Journal(db.Model):
     content = db.Column(db.Text, nullable=False)
     mood = db.Column(db.String(50))
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    # Filled by list queries that ask for ?excerpt= instead of the full content
+    content_excerpt = query_expression()
+
+# Full-text index over journal titles and content, maintained by the database
+# so every write path stays in sync. SQLite gets an FTS5 table fed by
+# triggers; its rowids come from journals_fts_keys, whose INTEGER PRIMARY KEY
+# maps each journal id to a stable integer (the implicit rowid of journals
+# may change on VACUUM since its primary key is TEXT). PostgreSQL gets a
+# trigger-maintained tsvector column with a GIN index. See app/search.py for
+# the queries and the rebuild command.
+JOURNAL_SEARCH_DDL = {
+    'sqlite': [
+        """CREATE TABLE IF NOT EXISTS journals_fts_keys (
+            id INTEGER PRIMARY KEY, journal_id VARCHAR(36) NOT NULL UNIQUE
+        )""",
+        """CREATE VIRTUAL TABLE IF NOT EXISTS journals_fts USING fts5(
+            title, content, tokenize='porter unicode61'
+        )""",
+        """CREATE TRIGGER IF NOT EXISTS journals_fts_insert AFTER INSERT ON journals BEGIN
+            INSERT INTO journals_fts_keys(journal_id) VALUES (new.id);
+            INSERT INTO journals_fts(rowid, title, content)
+            VALUES ((SELECT id FROM journals_fts_keys WHERE journal_id = new.id), new.title, new.content);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS journals_fts_delete AFTER DELETE ON journals BEGIN
+            DELETE FROM journals_fts WHERE rowid = (SELECT id FROM journals_fts_keys WHERE journal_id = old.id);
+            DELETE FROM journals_fts_keys WHERE journal_id = old.id;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS journals_fts_update AFTER UPDATE OF title, content ON journals BEGIN
+            UPDATE journals_fts SET title = new.title, content = new.content
+            WHERE rowid = (SELECT id FROM journals_fts_keys WHERE journal_id = new.id);
+        END"""
+    ],
+    'postgresql': [
+        "ALTER TABLE journals ADD COLUMN IF NOT EXISTS search_vector tsvector",
+        "CREATE INDEX IF NOT EXISTS ix_journals_search_vector ON journals USING GIN (search_vector)",
+        """CREATE OR REPLACE FUNCTION journals_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(NEW.content, '')), 'B');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql""",
+        "DROP TRIGGER IF EXISTS journals_search_vector_trigger ON journals",
+        """CREATE TRIGGER journals_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF title, content ON journals
+            FOR EACH ROW EXECUTE FUNCTION journals_search_vector_update()"""
+    ]
+}
+
+for _dialect, _statements in JOURNAL_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(Journal.__table__, 'after_create', DDL(_statement).execute_if(dialect=_dialect))
+for _table in ['journals_fts', 'journals_fts_keys']:
+    event.listen(Journal.__table__, 'after_drop',
+                 DDL(f'DROP TABLE IF EXISTS {_table}').execute_if(dialect='sqlite'))
 
 class WeightLog(db.Model):
     __tablename__ = 'weight_logs'
+    __table_args__ = (
+        db.Index('ix_weight_logs_user_id_date', 'user_id', 'date'),
+    )
     
     id = db.Column(db.String(36), primary_key=True)
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
@@ -22,10 +87,47 @@ class WeightLog(db.Model):
 
 class ProgressPhoto(db.Model):
     __tablename__ = 'progress_photos'
+    __table_args__ = (
+        db.Index('ix_progress_photos_user_id_date', 'user_id', 'date'),
+        db.Index('ix_progress_photos_content_hash', 'content_hash'),
+    )
     
     id = db.Column(db.String(36), primary_key=True)
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
     photo_url = db.Column(db.String(255), nullable=False)
     category = db.Column(db.String(50))  # front, side, back
     date = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
-    notes = db.Column(db.Text)
\ No newline at end of file
+    notes = db.Column(db.Text)
+    # Set for photos uploaded to our own storage (app/storage.py) rather than hosted elsewhere
+    content_hash = db.Column(db.String(64))  # SHA-256 of the file, its storage key
+    content_type = db.Column(db.String(100))
+    file_size = db.Column(db.Integer)
+
+# Per-user daily rollups read by the analytics endpoints, one row per day
+# (and mood or category). Maintained in the same transaction as every write
+# to the source tables; see app/rollups.py.
+class DailyWeightRollup(db.Model):
+    __tablename__ = 'daily_weight_rollups'
+    
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    min_weight = db.Column(db.Float, nullable=False)
+    max_weight = db.Column(db.Float, nullable=False)
+    total_weight = db.Column(db.Float, nullable=False)  # Sum, so averages over several days stay exact
+    count = db.Column(db.Integer, nullable=False)
+
+class DailyMoodRollup(db.Model):
+    __tablename__ = 'daily_mood_rollups'
+    
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    mood = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False)
+
+class DailyPhotoRollup(db.Model):
+    __tablename__ = 'daily_photo_rollups'
+    
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    category = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False)
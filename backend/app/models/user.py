@@ -1,6 +1,7 @@
 from app.extensions import db
 from datetime import datetime, timezone, date
 from app.models.activity import UserActivity
+from app.leveling import level_for_xp, xp_required_for_level
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -14,6 +15,8 @@ class User(db.Model):
     streak_days = db.Column(db.Integer, default=0)
     multiplier = db.Column(db.Float, default=1.0)
     last_check_in = db.Column(db.Date, nullable=True)
+    last_daily_submission = db.Column(db.Date, nullable=True)  # UTC day of the last submit-daily
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # see app.versioning
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     
     # Relationship with activities
@@ -22,12 +25,13 @@ class User(db.Model):
     @property
     def xp_to_next_level(self):
         """Calculate XP needed for next level."""
-        return self.calculate_xp_required(self.level + 1) - self.calculate_xp_required(self.level)
+        total_xp = self.current_xp or 0
+        return xp_required_for_level(level_for_xp(total_xp) + 1) - total_xp
 
     @staticmethod
     def calculate_xp_required(level):
         """Calculate total XP required for a given level."""
-        return 0.00027 * (level ** 1.6)
+        return xp_required_for_level(level)
 
     def update_streak(self):
         """Update streak based on last check-in."""
@@ -49,9 +53,7 @@ class User(db.Model):
         earned_xp = base_xp * self.multiplier
         self.current_xp += earned_xp
 
-        # Level up logic
-        while self.current_xp >= self.xp_to_next_level:
-            self.current_xp -= self.xp_to_next_level
-            self.level += 1
+        # Level up logic (current_xp is the user's total XP)
+        self.level = level_for_xp(self.current_xp)
 
         return earned_xp
\ No newline at end of file
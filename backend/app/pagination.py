@@ -0,0 +1,199 @@
+"""Offset and keyset pagination for the list endpoints.
+
+Page mode (?page=&per_page=) is the default and reports total and pages.
+Passing ?cursor= (empty for the first page) switches to keyset mode: the
+response carries an opaque next_cursor encoding the last row's sort value
+and id, and the next page seeks past it with (sort_col, id) < (value, id),
+so deep pages cost the same as the first. The total is only counted when
+?include_total=true is passed.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime, date
+from math import ceil
+from flask import request, abort, jsonify
+from sqlalchemy import asc, desc, tuple_
+
+MAX_LIMIT = 100
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor cannot be decoded or belongs to another sort order."""
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'datetime': value.isoformat()}
+    if isinstance(value, date):
+        return {'date': value.isoformat()}
+    return value
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if 'datetime' in value:
+            return datetime.fromisoformat(value['datetime'])
+        if 'date' in value:
+            return date.fromisoformat(value['date'])
+        raise InvalidCursor('Invalid cursor')
+    return value
+
+def _matches_type(value, value_type):
+    """Whether a decoded cursor value compares with sort values of value_type."""
+    if isinstance(value, bool):
+        return value_type is bool
+    if value_type in (int, float):
+        return isinstance(value, (int, float))
+    if value_type is datetime or value_type is date:
+        # A datetime is also a date, but the two do not compare
+        return type(value) is value_type
+    return isinstance(value, value_type)
+
+def encode_cursor(sort_by, direction, value, row_id):
+    """Build the opaque token pointing just past the given row."""
+    payload = json.dumps([sort_by, direction, _encode_value(value), row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(token, sort_by, direction, value_type=None):
+    """
+    Decode a token from encode_cursor for the current sort order, checking
+    that a non-NULL value is of value_type when given.
+    Returns (value, row_id)
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        cursor_sort_by, cursor_direction, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        value = _decode_value(value)
+    except (ValueError, TypeError, binascii.Error):
+        raise InvalidCursor('Invalid cursor')
+    if (cursor_sort_by, cursor_direction) != (sort_by, direction):
+        raise InvalidCursor('Cursor does not match the requested sort order')
+    if not isinstance(row_id, str) or (
+        value is not None and value_type is not None and not _matches_type(value, value_type)
+    ):
+        raise InvalidCursor('Invalid cursor')
+    return value, row_id
+
+def get_cursor_params(per_page):
+    """
+    Read the keyset arguments of the current request.
+    Returns (cursor, limit, include_total); cursor is None in page mode.
+    """
+    cursor = request.args.get('cursor')
+    limit = request.args.get('limit', per_page, type=int)
+    include_total = request.args.get('include_total', 'false').lower() == 'true'
+    return cursor, min(max(limit, 1), MAX_LIMIT), include_total
+
+def _nulls_first(dialect_name, descending):
+    # PostgreSQL and Oracle sort NULL above every value, the others below
+    nulls_high = dialect_name in ('postgresql', 'oracle')
+    return nulls_high == descending
+
+def _python_type(column):
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return None
+
+def paginate_query(query, model, sort_by, direction, page, per_page):
+    """
+    Order query by sort_by then id and return one page.
+    Returns (items, meta) where meta holds the pagination keys of the response.
+    """
+    direction = 'desc' if direction == 'desc' else 'asc'
+    descending = direction == 'desc'
+    order = desc if descending else asc
+    column = getattr(model, sort_by)
+    cursor, limit, include_total = get_cursor_params(per_page)
+
+    if cursor is None:
+        pagination = query.order_by(order(column)).paginate(page=page, per_page=per_page)
+        return pagination.items, {
+            'total': pagination.total,
+            'pages': pagination.pages,
+            'current_page': page
+        }
+
+    ordered = query.order_by(order(column), order(model.id))
+    if not cursor:
+        rows = ordered.limit(limit + 1).all()
+    else:
+        value, last_id = decode_cursor(cursor, sort_by, direction, _python_type(column))
+        dialect_name = query.session.get_bind().dialect.name
+        nulls_first = _nulls_first(dialect_name, descending)
+        after_id = model.id < last_id if descending else model.id > last_id
+
+        # Rows left in the cursor's section: NULL sort values or real values
+        if value is None:
+            rows = ordered.filter(column.is_(None), after_id).limit(limit + 1).all()
+            next_section = column.isnot(None) if nulls_first else None
+        else:
+            key, seek = tuple_(column, model.id), tuple_(value, last_id)
+            rows = ordered.filter(key < seek if descending else key > seek).limit(limit + 1).all()
+            nullable = model.__table__.c[sort_by].nullable
+            next_section = column.is_(None) if nullable and not nulls_first else None
+
+        # Continue into the next section when the current one runs out
+        if len(rows) <= limit and next_section is not None:
+            rows += ordered.filter(next_section).limit(limit + 1 - len(rows)).all()
+
+    items = rows[:limit]
+    meta = {'next_cursor': None, 'limit': limit}
+    if len(rows) > limit:
+        last = items[-1]
+        meta['next_cursor'] = encode_cursor(sort_by, direction, getattr(last, sort_by), last.id)
+    if include_total:
+        meta['total'] = query.order_by(None).count()
+    return items, meta
+
+def paginate_items(items, sort_by, direction, page, per_page):
+    """
+    Same as paginate_query for an in-memory sequence, e.g. cached reference data.
+    Sort values must not be None.
+    """
+    direction = 'desc' if direction == 'desc' else 'asc'
+    descending = direction == 'desc'
+    cursor, limit, include_total = get_cursor_params(per_page)
+
+    if cursor is None:
+        items = sorted(items, key=lambda item: getattr(item, sort_by), reverse=descending)
+        page_items, total, pages = paginate_snapshot(items, page, per_page)
+        return page_items, {'total': total, 'pages': pages, 'current_page': page}
+
+    def key(item):
+        return getattr(item, sort_by), item.id
+
+    ordered = sorted(items, key=key, reverse=descending)
+    if cursor:
+        # Checked against the values it is compared with, which would raise TypeError otherwise
+        value_type = type(getattr(ordered[0], sort_by)) if ordered else None
+        seek = decode_cursor(cursor, sort_by, direction, value_type)
+        ordered = [item for item in ordered if (key(item) < seek if descending else key(item) > seek)]
+
+    page_items = ordered[:limit]
+    meta = {'next_cursor': None, 'limit': limit}
+    if len(ordered) > limit:
+        last = page_items[-1]
+        meta['next_cursor'] = encode_cursor(sort_by, direction, getattr(last, sort_by), last.id)
+    if include_total:
+        meta['total'] = len(items)
+    return page_items, meta
+
+def paginate_snapshot(items, page, per_page):
+    """
+    Slice a cached list the way Query.paginate does, aborting with 404 on invalid pages.
+    Returns (page_items, total, pages)
+    """
+    if page < 1 or per_page < 1:
+        abort(404)
+    total = len(items)
+    start = (page - 1) * per_page
+    page_items = list(items[start:start + per_page])
+    if not page_items and page != 1:
+        abort(404)
+    pages = ceil(total / per_page) if total else 0
+    return page_items, total, pages
+
+def register_pagination_errors(app):
+    """Answer invalid cursors with a 400 in the usual error shape."""
+    @app.errorhandler(InvalidCursor)
+    def handle_invalid_cursor(error):
+        return jsonify({'error': str(error)}), 400
@@ -0,0 +1,117 @@
+"""Read-mostly reference data shared by every user.
+
+The default activity catalog, achievements and weekly missions only change
+through a handful of admin writes, so each app keeps immutable snapshots of
+them in memory. Every write bumps a counter in reference_data_versions; a
+worker compares its snapshot with that row at most every
+REFERENCE_CACHE_CHECK_SECONDS and reloads when another process has written.
+"""
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+from flask import current_app, has_app_context
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models import Activity, Achievement, WeeklyMission, ReferenceDataVersion
+
+def _snapshot_type(model):
+    """Immutable row type with one field per column of model."""
+    return namedtuple(f'{model.__name__}Snapshot', [column.key for column in model.__table__.columns])
+
+def _default_activities():
+    return db.select(Activity).where(Activity.user_id.is_(None), Activity.is_active == True)
+
+REFERENCE_TABLES = {
+    'activities': (Activity, _default_activities),
+    'achievements': (Achievement, lambda: db.select(Achievement)),
+    'weekly_missions': (WeeklyMission, lambda: db.select(WeeklyMission))
+}
+
+_snapshot_types = {name: _snapshot_type(model) for name, (model, _) in REFERENCE_TABLES.items()}
+
+class ReferenceCache:
+    """Per-app snapshots of the reference tables keyed by their version counter."""
+
+    def __init__(self, check_seconds):
+        self.check_seconds = check_seconds
+        self._entries = {}  # name -> (version, snapshot)
+        self._checked = {}  # name -> monotonic time of the last version check
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        now = time.monotonic()
+        entry = self._entries.get(name)
+        if entry is not None and now - self._checked.get(name, 0) < self.check_seconds:
+            return entry[1]
+
+        version = _current_version(name)
+        self._checked[name] = now
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        snapshot = _load(name)
+        with self._lock:
+            self._entries[name] = (version, snapshot)
+        return snapshot
+
+    def invalidate(self, name):
+        with self._lock:
+            self._entries.pop(name, None)
+            self._checked.pop(name, None)
+
+def _current_version(name):
+    version = db.session.scalar(
+        db.select(ReferenceDataVersion.version).where(ReferenceDataVersion.name == name)
+    )
+    return version or 0
+
+def _load(name):
+    model, query = REFERENCE_TABLES[name]
+    snapshot_type = _snapshot_types[name]
+    columns = model.__table__.columns
+    rows = db.session.execute(query().with_only_columns(*columns)).all()
+    return tuple(snapshot_type(*row) for row in rows)
+
+def _get_cache(app=None):
+    app = app or current_app._get_current_object()
+    cache = app.extensions.get('reference_cache')
+    if cache is None:
+        cache = app.extensions.setdefault(
+            'reference_cache', ReferenceCache(app.config.get('REFERENCE_CACHE_CHECK_SECONDS', 2))
+        )
+    return cache
+
+def get_reference_data(name):
+    """Return the cached tuple of snapshots for a reference table."""
+    return _get_cache().get(name)
+
+def bump_reference_version(name):
+    """
+    Mark a reference table as changed in the current transaction.
+    Other workers notice the new version on their next check; this one drops
+    its snapshot as soon as the transaction commits.
+    """
+    now = datetime.now(timezone.utc)
+    result = db.session.execute(
+        update(ReferenceDataVersion)
+        .where(ReferenceDataVersion.name == name)
+        .values(version=ReferenceDataVersion.version + 1, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        db.session.add(ReferenceDataVersion(name=name, version=1, updated_at=now))
+    db.session.info.setdefault('reference_data_changed', set()).add(name)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    names = session.info.pop('reference_data_changed', None)
+    if names and has_app_context():
+        cache = _get_cache()
+        for name in names:
+            cache.invalidate(name)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_on_rollback(session):
+    session.info.pop('reference_data_changed', None)
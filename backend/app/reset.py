@@ -0,0 +1,72 @@
+"""Reset of a user's progress with chunked, set-based updates.
+
+Modules that keep derived per-user data (caches, rollups) register a hook
+with register_reset_hook; each hook is called with the user id after the
+user's rows have been reset.
+"""
+from datetime import datetime, timezone
+from sqlalchemy import update
+from app.extensions import db
+from app.models import User, UserActivity
+
+DEFAULT_CHUNK_SIZE = 1000
+
+_reset_hooks = []
+
+def register_reset_hook(func):
+    """Register func(user_id) to clear derived data when a user is reset."""
+    _reset_hooks.append(func)
+    return func
+
+def reset_user_data(user_id, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Reset a user's XP, level, streak and activity state.
+    Activity rows are updated in primary-key ranges of chunk_size rows, each
+    committed on its own so large users never hold long locks.
+    Returns a summary dict.
+    """
+    today = datetime.now(timezone.utc).date()
+    rows_reset = 0
+    last_id = None
+
+    while True:
+        # Upper primary key of the next chunk; None means the rest fits in one chunk
+        bound_query = db.select(UserActivity.id).where(
+            UserActivity.user_id == user_id
+        ).order_by(UserActivity.id).offset(chunk_size - 1).limit(1)
+        if last_id is not None:
+            bound_query = bound_query.where(UserActivity.id > last_id)
+        bound = db.session.scalar(bound_query)
+
+        stmt = update(UserActivity).where(UserActivity.user_id == user_id)
+        if last_id is not None:
+            stmt = stmt.where(UserActivity.id > last_id)
+        if bound is not None:
+            stmt = stmt.where(UserActivity.id <= bound)
+
+        result = db.session.execute(
+            stmt.values(completed=False, is_completed_today=False, is_active=False, date=today)
+            .execution_options(synchronize_session=False)
+        )
+        rows_reset += result.rowcount
+        db.session.commit()
+
+        if bound is None:
+            break
+        last_id = bound
+
+    # Reset user stats
+    db.session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(current_xp=0, level=1, streak_days=0, multiplier=1.0)
+        .execution_options(synchronize_session=False)
+    )
+
+    for hook in _reset_hooks:
+        hook(user_id)
+
+    db.session.commit()
+    # Objects loaded earlier in this session still hold the old values
+    db.session.expire_all()
+    return {'user_id': user_id, 'activities_reset': rows_reset}
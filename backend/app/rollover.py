@@ -0,0 +1,166 @@
+"""Daily rollover of activity completion flags and streaks.
+
+At each UTC day boundary the previous day is closed out: users who completed
+nothing that day lose their streak, and every is_completed_today flag dated
+before the new day is cleared. Users are processed in primary-key batches,
+each committed on its own, and the resume point is stored in
+daily_rollovers so a crashed run continues where it stopped and a finished
+run is a no-op.
+"""
+import logging
+import threading
+from datetime import datetime, timezone, timedelta
+import click
+from flask.cli import AppGroup
+from sqlalchemy import update, exists, and_
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models import User, UserActivity, DailyRollover
+
+DEFAULT_BATCH_SIZE = 500
+
+logger = logging.getLogger(__name__)
+
+rollover_cli = AppGroup('rollover', help='Daily rollover of completion flags and streaks.')
+
+def _get_or_start_run(day):
+    """Load the progress row for day, creating it on the first run."""
+    run = db.session.get(DailyRollover, day)
+    if run is None:
+        try:
+            run = DailyRollover(day=day, users_processed=0, streaks_broken=0, flags_reset=0)
+            db.session.add(run)
+            db.session.commit()
+        except IntegrityError:
+            # Another worker started the same day first
+            db.session.rollback()
+            run = db.session.get(DailyRollover, day)
+    return run
+
+def _summary(run):
+    return {
+        'day': run.day.isoformat(),
+        'users_processed': run.users_processed or 0,
+        'streaks_broken': run.streaks_broken or 0,
+        'flags_reset': run.flags_reset or 0,
+        'completed': run.completed_at is not None
+    }
+
+def run_rollover(today=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Close out the day before `today` for every user.
+    Returns a summary dict; calling it again for the same day changes nothing.
+    """
+    today = today or datetime.now(timezone.utc).date()
+    day = today - timedelta(days=1)
+    run = _get_or_start_run(day)
+
+    if run.completed_at is not None:
+        return _summary(run)
+
+    while True:
+        # Lock the progress row so concurrent workers take turns on batches
+        run = db.session.get(DailyRollover, day, with_for_update=True, populate_existing=True)
+        if run.completed_at is not None:
+            db.session.rollback()
+            return _summary(run)
+
+        # Next batch of users after the stored resume point
+        query = db.select(User.id).order_by(User.id).limit(batch_size)
+        if run.last_user_id is not None:
+            query = query.where(User.id > run.last_user_id)
+        user_ids = db.session.scalars(query).all()
+        if not user_ids:
+            break
+
+        # Break streaks for users with no completion on the closed day
+        completed_day = exists().where(and_(
+            UserActivity.user_id == User.id,
+            UserActivity.is_completed_today == True,
+            UserActivity.date == day
+        ))
+        # The data version changes with the user's data (see app.versioning)
+        streaks = db.session.execute(
+            update(User)
+            .where(User.id.in_(user_ids), User.streak_days > 0, ~completed_day)
+            .values(streak_days=0, multiplier=1.0, data_version=User.data_version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+        # Reset the daily flags of everything completed before the new day
+        stale_flags = exists().where(and_(
+            UserActivity.user_id == User.id,
+            UserActivity.is_completed_today == True,
+            UserActivity.date < today
+        ))
+        db.session.execute(
+            update(User)
+            .where(User.id.in_(user_ids), stale_flags)
+            .values(data_version=User.data_version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        flags = db.session.execute(
+            update(UserActivity)
+            .where(
+                UserActivity.user_id.in_(user_ids),
+                UserActivity.is_completed_today == True,
+                UserActivity.date < today
+            )
+            .values(is_completed_today=False)
+            .execution_options(synchronize_session=False)
+        )
+
+        # Record progress in the same transaction as the batch
+        run.last_user_id = user_ids[-1]
+        run.users_processed = (run.users_processed or 0) + len(user_ids)
+        run.streaks_broken = (run.streaks_broken or 0) + streaks.rowcount
+        run.flags_reset = (run.flags_reset or 0) + flags.rowcount
+        db.session.commit()
+
+    run.completed_at = datetime.now(timezone.utc)
+    db.session.commit()
+    return _summary(run)
+
+@rollover_cli.command('run')
+@click.option('--date', 'date_str', default=None,
+              help='The day that is starting (YYYY-MM-DD); the previous day is closed out. Defaults to today (UTC).')
+@click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True, type=int,
+              help='Number of users updated per transaction.')
+def run_rollover_command(date_str, batch_size):
+    """Close out yesterday's completions and streaks."""
+    today = datetime.fromisoformat(date_str).date() if date_str else None
+    summary = run_rollover(today=today, batch_size=batch_size)
+    click.echo(
+        f"Rollover for {summary['day']}: {summary['users_processed']} users, "
+        f"{summary['streaks_broken']} streaks broken, {summary['flags_reset']} flags reset"
+    )
+
+def seconds_until_next_day(now=None):
+    """Seconds from now until the next UTC midnight."""
+    now = now or datetime.now(timezone.utc)
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (tomorrow - now).total_seconds()
+
+def start_scheduler(app):
+    """
+    Run the rollover in a daemon thread at every UTC day boundary.
+    Each worker that starts it is safe to run alongside others since the job is idempotent.
+    Returns the threading.Event that stops the scheduler when set.
+    """
+    stop = threading.Event()
+    batch_size = app.config.get('ROLLOVER_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+
+    def loop():
+        # Catch up on a boundary that passed while the app was down
+        while not stop.is_set():
+            try:
+                with app.app_context():
+                    run_rollover(batch_size=batch_size)
+            except Exception:
+                logger.exception("Daily rollover failed")
+            # Wake up a few seconds past midnight so the new day has started
+            stop.wait(seconds_until_next_day() + 5)
+
+    thread = threading.Thread(target=loop, name='daily-rollover', daemon=True)
+    thread.start()
+    return stop
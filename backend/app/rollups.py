@@ -0,0 +1,170 @@
+"""Per-user daily rollups of the tracking tables.
+
+Weight logs, journal moods and progress photos are summarised into one row
+per user and day (and mood or category), which is all the analytics
+endpoints read. A Session after_flush listener recomputes the days touched
+by every flush from the source rows, in the same transaction as the write,
+so ORM writes from any route keep the rollups in sync. Core bulk writes call
+refresh_rollup themselves; `flask rollups rebuild` backfills from scratch.
+"""
+from datetime import datetime, time, timedelta
+import click
+from flask.cli import AppGroup
+from sqlalchemy import cast, delete, event, func, insert, inspect, select, Date
+from sqlalchemy.orm import Session
+from app.extensions import db, UPSERT_DIALECTS
+from app.models import (
+    User, Journal, WeightLog, ProgressPhoto, DailyWeightRollup, DailyMoodRollup, DailyPhotoRollup
+)
+
+DEFAULT_BATCH_SIZE = 100
+
+rollups_cli = AppGroup('rollups', help='Daily tracking rollups.')
+
+def day_of(column, dialect_name):
+    """SQL expression for the calendar day of a timestamp column."""
+    if dialect_name == 'postgresql':
+        return cast(column, Date)
+    return func.date(column, type_=Date)
+
+def bucket_of(column, bucket, dialect_name):
+    """SQL expression for the first day of the day, week or month a Date column falls in."""
+    if dialect_name == 'postgresql':
+        return cast(func.date_trunc(bucket, column), Date)
+    if bucket == 'week':
+        # Monday on or before the day, like date_trunc('week')
+        return func.date(column, '-6 days', 'weekday 1')
+    if bucket == 'month':
+        return func.strftime('%Y-%m-01', column)
+    return func.date(column)
+
+def _weight_rows(day):
+    return select(
+        WeightLog.user_id, day, func.min(WeightLog.weight), func.max(WeightLog.weight),
+        func.sum(WeightLog.weight), func.count()
+    ).group_by(WeightLog.user_id, day)
+
+def _mood_rows(day):
+    return select(Journal.user_id, day, Journal.mood, func.count()).where(
+        Journal.mood.isnot(None)
+    ).group_by(Journal.user_id, day, Journal.mood)
+
+def _photo_rows(day):
+    return select(ProgressPhoto.user_id, day, ProgressPhoto.category, func.count()).where(
+        ProgressPhoto.category.isnot(None)
+    ).group_by(ProgressPhoto.user_id, day, ProgressPhoto.category)
+
+# name -> (source model, timestamp attribute, attributes the rollup reads, rollup model, row query, columns)
+ROLLUPS = {
+    'weight': (WeightLog, 'date', ('weight',), DailyWeightRollup, _weight_rows,
+               ['user_id', 'day', 'min_weight', 'max_weight', 'total_weight', 'count']),
+    'mood': (Journal, 'created_at', ('mood',), DailyMoodRollup, _mood_rows,
+             ['user_id', 'day', 'mood', 'count']),
+    'photos': (ProgressPhoto, 'date', ('category',), DailyPhotoRollup, _photo_rows,
+               ['user_id', 'day', 'category', 'count'])
+}
+
+_rollup_names = {spec[0]: name for name, spec in ROLLUPS.items()}
+
+def upsert_from_select(dialect_name, table, columns, rows):
+    """
+    INSERT ... SELECT that overwrites rows already present under the same
+    primary key, so concurrent refreshes of the same user and day do not
+    collide after both deleted. A plain insert on dialects without ON CONFLICT.
+    """
+    dialect_insert = UPSERT_DIALECTS.get(dialect_name)
+    if dialect_insert is None:
+        return insert(table).from_select(columns, rows)
+    stmt = dialect_insert(table).from_select(columns, rows)
+    keys = [column.name for column in table.primary_key]
+    return stmt.on_conflict_do_update(
+        index_elements=keys,
+        set_={name: stmt.excluded[name] for name in columns if name not in keys}
+    )
+
+def refresh_rollup(name, user_id, days, connection=None):
+    """Recompute a user's rollup rows for the given days from the source table."""
+    days = sorted(set(days))
+    if not days:
+        return
+    source, timestamp, _, target, rows, columns = ROLLUPS[name]
+    connection = connection or db.session.connection()
+    column = getattr(source, timestamp)
+    day = day_of(column, connection.dialect.name)
+
+    # Groups that no longer have source rows go; the others are rewritten in place
+    connection.execute(delete(target.__table__).where(target.user_id == user_id, target.day.in_(days)))
+    connection.execute(upsert_from_select(connection.dialect.name, target.__table__, columns, rows(day).where(
+        source.user_id == user_id,
+        # The range lets the (user_id, date) index narrow the scan
+        column >= datetime.combine(days[0], time.min),
+        column < datetime.combine(days[-1] + timedelta(days=1), time.min),
+        day.in_(days)
+    )))
+
+def _history_values(state, key):
+    # Old and new values without loading anything that is not already loaded
+    return [value for value in state.attrs[key].history.sum() if value is not None]
+
+def _changed_days(session):
+    """(name, user_id) -> days whose rollups the pending flush affects."""
+    changed = {}
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        name = _rollup_names.get(type(obj))
+        if name is None:
+            continue
+        _, timestamp, attributes, _, _, _ = ROLLUPS[name]
+        state = inspect(obj)
+        if obj in session.dirty and not any(
+            state.attrs[key].history.has_changes() for key in ('user_id', timestamp) + attributes
+        ):
+            continue  # e.g. only the notes or journal content changed
+        for user_id in _history_values(state, 'user_id'):
+            days = changed.setdefault((name, user_id), set())
+            days.update(value.date() if isinstance(value, datetime) else value
+                        for value in _history_values(state, timestamp))
+    return changed
+
+@event.listens_for(Session, 'after_flush')
+def _refresh_after_flush(session, flush_context):
+    changed = _changed_days(session)
+    if not changed:
+        return
+    connection = session.connection()
+    for (name, user_id), days in changed.items():
+        refresh_rollup(name, user_id, days, connection=connection)
+
+def rebuild_rollups(user_id=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Recompute every rollup from the source tables, batch_size users per transaction.
+    Returns the number of users processed.
+    """
+    processed = 0
+    last_id = ''
+    while True:
+        query = select(User.id).where(User.id > last_id).order_by(User.id).limit(batch_size)
+        if user_id is not None:
+            query = query.where(User.id == user_id)
+        user_ids = db.session.scalars(query).all()
+        if not user_ids:
+            return processed
+
+        connection = db.session.connection()
+        for source, timestamp, _, target, rows, columns in ROLLUPS.values():
+            day = day_of(getattr(source, timestamp), connection.dialect.name)
+            connection.execute(delete(target.__table__).where(target.user_id.in_(user_ids)))
+            connection.execute(insert(target.__table__).from_select(
+                columns, rows(day).where(source.user_id.in_(user_ids))
+            ))
+        db.session.commit()
+        processed += len(user_ids)
+        last_id = user_ids[-1]
+
+@rollups_cli.command('rebuild')
+@click.option('--user', 'user_id', default=None, help='Only rebuild this user id.')
+@click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True, type=int,
+              help='Users rebuilt per transaction.')
+def rebuild_rollups_command(user_id, batch_size):
+    """Recompute the daily tracking rollups from the source tables."""
+    processed = rebuild_rollups(user_id=user_id, batch_size=batch_size)
+    click.echo(f"Rebuilt rollups for {processed} users")
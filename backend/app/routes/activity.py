@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models import Activity, UserActivityLog
 from app.extensions import db
+from app.refdata import bump_reference_version
 import uuid
 
 activity_bp = Blueprint('activity', __name__)
@@ -47,6 +48,7 @@ def create_activity():
     )
     
     db.session.add(new_activity)
+    bump_reference_version('activities')
     db.session.commit()
     
     return jsonify({
@@ -77,6 +79,7 @@ def update_activity(activity_id):
     if 'description' in data:
         activity.description = data['description']
     
+    bump_reference_version('activities')
     db.session.commit()
     
     return jsonify({
@@ -94,6 +97,7 @@ def delete_activity(activity_id):
     
     # Soft delete by setting is_active to False
     activity.is_active = False
+    bump_reference_version('activities')
     db.session.commit()
     
     return jsonify({'message': 'Activity deactivated successfully'})
\ No newline at end of file
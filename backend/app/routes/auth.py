@@ -4,17 +4,16 @@ from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identi
 from app.extensions import db
 from app.models import User
 import uuid
+import logging
 
 auth_bp = Blueprint('auth', __name__)
+logger = logging.getLogger(__name__)
 
 @auth_bp.route('/register', methods=['POST', 'OPTIONS'])
 def register():
-    # Debug logging
-    print("Registration endpoint hit")
-    print("Request method:", request.method)
-    print("Request headers:", dict(request.headers))
-    print("Content-Type:", request.headers.get('Content-Type'))
-    print("Raw request data:", request.get_data(as_text=True))
+    # Headers and body are not logged since they carry credentials
+    logger.debug("Registration request: method=%s, content_type=%s",
+                 request.method, request.headers.get('Content-Type'))
 
     try:
         if request.method == 'OPTIONS':
@@ -23,41 +22,42 @@ def register():
 
         # Check Content-Type header
         if not request.is_json:
-            print("Error: Request Content-Type is not application/json")
+            logger.info("Registration rejected: Content-Type is not application/json")
             return jsonify({'error': 'Content-Type must be application/json'}), 415
 
         # Get JSON data
         try:
             data = request.get_json()
-            print("Parsed JSON data:", data)
         except Exception as e:
-            print("JSON parsing error:", str(e))
+            logger.info("Registration rejected: JSON parsing error: %s", e)
             return jsonify({'error': 'Invalid JSON format'}), 400
 
         if not data:
-            print("Error: No data provided in request")
+            logger.info("Registration rejected: no data provided")
             return jsonify({'error': 'No data provided'}), 400
             
         # Validate required fields
         required_fields = ['username', 'email', 'password']
         missing_fields = [field for field in required_fields if not data.get(field)]
         if missing_fields:
-            print(f"Error: Missing fields: {missing_fields}")
+            logger.info("Registration rejected: missing fields %s", missing_fields)
             return jsonify({'error': f'Missing required fields: {", ".join(missing_fields)}'}), 400
         
         # Validate email format
         if '@' not in data['email']:
-            print("Error: Invalid email format")
+            logger.info("Registration rejected: invalid email format")
             return jsonify({'error': 'Invalid email format'}), 400
 
         # Check if email already exists
-        if User.query.filter_by(email=data['email']).first():
-            print(f"Error: Email {data['email']} already registered")
+        existing_user = User.query.filter_by(email=data['email']).first()
+        if existing_user:
+            logger.info("Registration rejected: email already registered to user %s", existing_user.id)
             return jsonify({'error': 'Email already registered'}), 409
             
         # Check if username already exists
-        if User.query.filter_by(username=data['username']).first():
-            print(f"Error: Username {data['username']} already taken")
+        existing_user = User.query.filter_by(username=data['username']).first()
+        if existing_user:
+            logger.info("Registration rejected: username already taken by user %s", existing_user.id)
             return jsonify({'error': 'Username already taken'}), 409
         
         # Create new user
@@ -71,7 +71,7 @@ def register():
             
             db.session.add(user)
             db.session.commit()
-            print(f"User created successfully: {user.username}")
+            logger.info("User created successfully: %s", user.id)
             
             # Create access token
             access_token = create_access_token(identity=user.id)
@@ -88,13 +88,13 @@ def register():
             
             return jsonify(response_data), 201
             
-        except Exception as e:
-            print("Database error:", str(e))
+        except Exception:
+            logger.exception("Database error during registration")
             db.session.rollback()
             return jsonify({'error': 'Database error occurred'}), 500
         
     except Exception as e:
-        print("Unexpected error:", str(e))
+        logger.exception("Unexpected registration error")
         return jsonify({'error': 'Registration failed: ' + str(e)}), 500
 
 @auth_bp.route('/login', methods=['POST'])
@@ -125,8 +125,8 @@ def login():
             },
             'access_token': access_token
         })
-    except Exception as e:
-        print(f"Login error: {str(e)}")
+    except Exception:
+        logger.exception("Login error")
         return jsonify({'error': 'Login failed'}), 500
 
 @auth_bp.route('/protected', methods=['GET'])
@@ -139,8 +139,8 @@ def protected():
             'message': f'Protected route accessed by {user.username}',
             'user_id': current_user_id
         })
-    except Exception as e:
-        print(f"Protected route error: {str(e)}")
+    except Exception:
+        logger.exception("Protected route error")
         return jsonify({'error': 'Access denied'}), 401
 
 @auth_bp.route('/profile', methods=['GET'])
@@ -158,6 +158,6 @@ def get_profile():
             'current_xp': user.current_xp,
             'streak_days': user.streak_days
         })
-    except Exception as e:
-        print(f"Profile route error: {str(e)}")
+    except Exception:
+        logger.exception("Profile route error")
         return jsonify({'error': 'Failed to fetch profile'}), 500
\ No newline at end of file
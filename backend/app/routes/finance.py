@@ -3,10 +3,17 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models import Asset, MonthlyExpense, Income, FinancialGoal
 from app.extensions import db
 import uuid
-from datetime import datetime, timezone, timedelta
-from sqlalchemy import desc
+from datetime import datetime, timezone
+from app.pagination import paginate_query
+from app.fields import get_fields, load_fields, serialize
+from app.versioning import register_data_versioning
+from app.finance_summary import cached_financial_summary, invalidate_financial_summary
+from app.ledger import monthly_ledger, MAX_TREND_MONTHS
+from app.projection import cash_flow_projection, DEFAULT_HORIZON_DAYS, MAX_HORIZON_DAYS
+from app.forecast import goal_forecasts, DEFAULT_PATHS, MIN_PATHS, MAX_PATHS
 
 finance_bp = Blueprint('finance', __name__)
+register_data_versioning(finance_bp)
 
 def get_pagination_params():
     page = request.args.get('page', 1, type=int)
@@ -14,6 +21,16 @@ def get_pagination_params():
     return page, per_page
 
 # Asset Routes
+# Fields returned by get_assets
+ASSET_FIELDS = {
+    'id': lambda a: a.id,
+    'name': lambda a: a.name,
+    'category': lambda a: a.category,
+    'value': lambda a: a.value,
+    'purchase_date': lambda a: a.purchase_date.isoformat() if a.purchase_date else None,
+    'notes': lambda a: a.notes
+}
+
 @finance_bp.route('/assets', methods=['GET'])
 @jwt_required()
 def get_assets():
@@ -38,29 +55,20 @@ def get_assets():
     
     # Apply sorting
     sort_by = request.args.get('sort_by', 'name')
-    if sort_by in ['name', 'value', 'purchase_date']:
-        direction = request.args.get('direction', 'asc')
-        if direction == 'desc':
-            query = query.order_by(desc(getattr(Asset, sort_by)))
-        else:
-            query = query.order_by(getattr(Asset, sort_by))
+    if sort_by not in ['name', 'value', 'purchase_date']:
+        sort_by = 'name'
+    direction = request.args.get('direction', 'asc')
+    
+    # Load only the requested fields
+    fields = get_fields(ASSET_FIELDS)
+    query = load_fields(query, Asset, fields, sort_by)
     
-    # Apply pagination
-    pagination = query.paginate(page=page, per_page=per_page)
-    assets = pagination.items
+    # Apply pagination (?page= or ?cursor=)
+    assets, pagination = paginate_query(query, Asset, sort_by, direction, page, per_page)
     
     return jsonify({
-        'items': [{
-            'id': a.id,
-            'name': a.name,
-            'category': a.category,
-            'value': a.value,
-            'purchase_date': a.purchase_date.isoformat() if a.purchase_date else None,
-            'notes': a.notes
-        } for a in assets],
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': page
+        'items': [serialize(a, ASSET_FIELDS, fields) for a in assets],
+        **pagination
     })
 
 @finance_bp.route('/assets', methods=['POST'])
@@ -90,6 +98,7 @@ def create_asset():
     )
     
     db.session.add(new_asset)
+    invalidate_financial_summary(user_id)
     db.session.commit()
     
     return jsonify({
@@ -121,6 +130,7 @@ def update_asset(asset_id):
     if 'notes' in data:
         asset.notes = data['notes']
     
+    invalidate_financial_summary(user_id)
     db.session.commit()
     
     return jsonify({
@@ -138,10 +148,21 @@ def delete_asset(asset_id):
     user_id = get_jwt_identity()
     asset = Asset.query.filter_by(id=asset_id, user_id=user_id).first_or_404()
     db.session.delete(asset)
+    invalidate_financial_summary(user_id)
     db.session.commit()
     return jsonify({'message': 'Asset deleted successfully'})
 
 # Monthly Expense Routes
+# Fields returned by get_monthly_expenses
+MONTHLY_EXPENSE_FIELDS = {
+    'id': lambda e: e.id,
+    'name': lambda e: e.name,
+    'category': lambda e: e.category,
+    'amount': lambda e: e.amount,
+    'due_date': lambda e: e.due_date,
+    'is_recurring': lambda e: e.is_recurring
+}
+
 @finance_bp.route('/monthly-expenses', methods=['GET'])
 @jwt_required()
 def get_monthly_expenses():
@@ -166,29 +187,20 @@ def get_monthly_expenses():
     
     # Apply sorting
     sort_by = request.args.get('sort_by', 'name')
-    if sort_by in ['name', 'amount', 'due_date']:
-        direction = request.args.get('direction', 'asc')
-        if direction == 'desc':
-            query = query.order_by(desc(getattr(MonthlyExpense, sort_by)))
-        else:
-            query = query.order_by(getattr(MonthlyExpense, sort_by))
+    if sort_by not in ['name', 'amount', 'due_date']:
+        sort_by = 'name'
+    direction = request.args.get('direction', 'asc')
+    
+    # Load only the requested fields
+    fields = get_fields(MONTHLY_EXPENSE_FIELDS)
+    query = load_fields(query, MonthlyExpense, fields, sort_by)
     
-    # Apply pagination
-    pagination = query.paginate(page=page, per_page=per_page)
-    expenses = pagination.items
+    # Apply pagination (?page= or ?cursor=)
+    expenses, pagination = paginate_query(query, MonthlyExpense, sort_by, direction, page, per_page)
     
     return jsonify({
-        'items': [{
-            'id': e.id,
-            'name': e.name,
-            'category': e.category,
-            'amount': e.amount,
-            'due_date': e.due_date,
-            'is_recurring': e.is_recurring
-        } for e in expenses],
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': page
+        'items': [serialize(e, MONTHLY_EXPENSE_FIELDS, fields) for e in expenses],
+        **pagination
     })
 
 @finance_bp.route('/monthly-expenses', methods=['POST'])
@@ -222,6 +234,7 @@ def create_monthly_expense():
     )
     
     db.session.add(new_expense)
+    invalidate_financial_summary(user_id)
     db.session.commit()
     
     return jsonify({
@@ -255,6 +268,7 @@ def update_monthly_expense(expense_id):
     if 'is_recurring' in data:
         expense.is_recurring = data['is_recurring']
     
+    invalidate_financial_summary(user_id)
     db.session.commit()
     
     return jsonify({
@@ -272,10 +286,23 @@ def delete_monthly_expense(expense_id):
     user_id = get_jwt_identity()
     expense = MonthlyExpense.query.filter_by(id=expense_id, user_id=user_id).first_or_404()
     db.session.delete(expense)
+    invalidate_financial_summary(user_id)
     db.session.commit()
     return jsonify({'message': 'Monthly expense deleted successfully'})
 
 # Income Routes
+# Fields returned by get_income
+INCOME_FIELDS = {
+    'id': lambda i: i.id,
+    'name': lambda i: i.name,
+    'category': lambda i: i.category,
+    'amount': lambda i: i.amount,
+    'date': lambda i: i.date.isoformat(),
+    'is_recurring': lambda i: i.is_recurring,
+    'frequency': lambda i: i.frequency,
+    'notes': lambda i: i.notes
+}
+
 @finance_bp.route('/income', methods=['GET'])
 @jwt_required()
 def get_income():
@@ -308,31 +335,20 @@ def get_income():
     
     # Apply sorting
     sort_by = request.args.get('sort_by', 'date')
-    if sort_by in ['name', 'amount', 'date']:
-        direction = request.args.get('direction', 'desc')
-        if direction == 'desc':
-            query = query.order_by(desc(getattr(Income, sort_by)))
-        else:
-            query = query.order_by(getattr(Income, sort_by))
+    if sort_by not in ['name', 'amount', 'date']:
+        sort_by = 'date'
+    direction = request.args.get('direction', 'desc')
+    
+    # Load only the requested fields
+    fields = get_fields(INCOME_FIELDS)
+    query = load_fields(query, Income, fields, sort_by)
     
-    # Apply pagination
-    pagination = query.paginate(page=page, per_page=per_page)
-    income = pagination.items
+    # Apply pagination (?page= or ?cursor=)
+    income, pagination = paginate_query(query, Income, sort_by, direction, page, per_page)
     
     return jsonify({
-        'items': [{
-            'id': i.id,
-            'name': i.name,
-            'category': i.category,
-            'amount': i.amount,
-            'date': i.date.isoformat(),
-            'is_recurring': i.is_recurring,
-            'frequency': i.frequency,
-            'notes': i.notes
-        } for i in income],
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': page
+        'items': [serialize(i, INCOME_FIELDS, fields) for i in income],
+        **pagination
     })
 
 @finance_bp.route('/income', methods=['POST'])
@@ -369,6 +385,7 @@ def create_income():
     )
     
     db.session.add(new_income)
+    invalidate_financial_summary(user_id)
     db.session.commit()
     
     return jsonify({
@@ -408,6 +425,7 @@ def update_income(income_id):
     if 'notes' in data:
         income.notes = data['notes']
     
+    invalidate_financial_summary(user_id)
     db.session.commit()
     
     return jsonify({
@@ -427,6 +445,7 @@ def delete_income(income_id):
     user_id = get_jwt_identity()
     income = Income.query.filter_by(id=income_id, user_id=user_id).first_or_404()
     db.session.delete(income)
+    invalidate_financial_summary(user_id)
     db.session.commit()
     return jsonify({'message': 'Income entry deleted successfully'})
 
@@ -474,6 +493,7 @@ def create_financial_goal():
     )
     
     db.session.add(new_goal)
+    invalidate_financial_summary(user_id)
     db.session.commit()
     
     return jsonify({
@@ -507,6 +527,7 @@ def update_goal_progress(goal_id):
     elif goal.deadline and datetime.now(timezone.utc) > goal.deadline:
         goal.status = 'Failed'
     
+    invalidate_financial_summary(user_id)
     db.session.commit()
     
     return jsonify({
@@ -524,82 +545,55 @@ def update_goal_progress(goal_id):
 @jwt_required()
 def get_financial_summary():
     user_id = get_jwt_identity()
+    # One statement when cold, a cache lookup when warm
+    return jsonify(cached_financial_summary(user_id))
+
+@finance_bp.route('/analytics/income-expenses', methods=['GET'])
+@jwt_required()
+def get_income_expenses_trend():
+    user_id = get_jwt_identity()
     
-    # Calculate total assets
-    total_assets = db.session.query(db.func.sum(Asset.value)).filter_by(user_id=user_id).scalar() or 0
-    
-    # Calculate total monthly expenses
-    total_monthly_expenses = db.session.query(db.func.sum(MonthlyExpense.amount)).filter_by(user_id=user_id).scalar() or 0
-    
-    # Calculate total income for current month
-    current_month_start = datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    total_monthly_income = db.session.query(db.func.sum(Income.amount)).filter(
-        Income.user_id == user_id,
-        Income.date >= current_month_start
-    ).scalar() or 0
-    
-    # Calculate recurring income
-    recurring_income = db.session.query(db.func.sum(Income.amount)).filter_by(
-        user_id=user_id,
-        is_recurring=True
-    ).scalar() or 0
+    # Number of months to return, including the current one
+    months = min(max(request.args.get('months', 12, type=int), 1), MAX_TREND_MONTHS)
     
-    # Calculate financial goals progress
-    active_goals = FinancialGoal.query.filter_by(
-        user_id=user_id,
-        status='In Progress'
-    ).all()
+    # One row per month from the ledger rollup, however many entries the months hold
+    ledger = monthly_ledger(user_id, months)
     
-    goals_summary = [{
-        'name': goal.name,
-        'target_amount': goal.target_amount,
-        'current_amount': goal.current_amount,
-        'progress_percentage': (goal.current_amount / goal.target_amount) * 100 if goal.target_amount > 0 else 0,
-        'deadline': goal.deadline.isoformat() if goal.deadline else None
-    } for goal in active_goals]
+    # Format response
+    income_data = [{'month': m.month.isoformat(), 'amount': float(m.income)} for m in ledger if m.income]
+    expense_data = [{'month': m.month.isoformat(), 'amount': float(m.expenses)} for m in ledger if m.expenses]
+    net_data = [{'month': m.month.isoformat(), 'amount': float(m.net)} for m in ledger]
     
     return jsonify({
-        'total_assets': total_assets,
-        'total_monthly_expenses': total_monthly_expenses,
-        'total_monthly_income': total_monthly_income,
-        'recurring_income': recurring_income,
-        'monthly_savings': total_monthly_income - total_monthly_expenses,
-        'active_goals': goals_summary
+        'income': income_data,
+        'expenses': expense_data,
+        'net': net_data
     })
 
-@finance_bp.route('/analytics/income-expenses', methods=['GET'])
+@finance_bp.route('/analytics/projection', methods=['GET'])
 @jwt_required()
-def get_income_expenses_trend():
+def get_cash_flow_projection():
     user_id = get_jwt_identity()
+    horizon_days = request.args.get('horizon_days', DEFAULT_HORIZON_DAYS, type=int)
+    if not 1 <= horizon_days <= MAX_HORIZON_DAYS:
+        return jsonify({'error': f'horizon_days must be between 1 and {MAX_HORIZON_DAYS}'}), 400
+    starting_balance = request.args.get('starting_balance', 0.0, type=float)
     
-    # Get date range from query parameters
-    months = request.args.get('months', 12, type=int)
-    end_date = datetime.now(timezone.utc)
-    start_date = end_date.replace(day=1) - timedelta(days=30 * months)
-    
-    # Get monthly income
-    monthly_income = db.session.query(
-        db.func.date_trunc('month', Income.date).label('month'),
-        db.func.sum(Income.amount).label('total')
-    ).filter(
-        Income.user_id == user_id,
-        Income.date >= start_date
-    ).group_by('month').all()
-    
-    # Get monthly expenses
-    monthly_expenses = db.session.query(
-        db.func.date_trunc('month', MonthlyExpense.created_at).label('month'),
-        db.func.sum(MonthlyExpense.amount).label('total')
-    ).filter(
-        MonthlyExpense.user_id == user_id,
-        MonthlyExpense.created_at >= start_date
-    ).group_by('month').all()
-    
-    # Format response
-    income_data = [{'month': m.month.isoformat(), 'amount': float(m.total)} for m in monthly_income]
-    expense_data = [{'month': m.month.isoformat(), 'amount': float(m.total)} for m in monthly_expenses]
+    return jsonify(cash_flow_projection(user_id, horizon_days, starting_balance))
+
+@finance_bp.route('/analytics/goal-forecast', methods=['GET'])
+@jwt_required()
+def get_goal_forecast():
+    user_id = get_jwt_identity()
+    paths = request.args.get('paths', DEFAULT_PATHS, type=int)
+    paths = min(max(paths, MIN_PATHS), MAX_PATHS)
+    seed = request.args.get('seed', type=int)
+    if seed is not None and seed < 0:
+        return jsonify({'error': 'Seed must be a non-negative integer'}), 400
     
+    # Stored forecasts are reused until a finance write or a day makes them stale
     return jsonify({
-        'income': income_data,
-        'expenses': expense_data
-    }) 
\ No newline at end of file
+        'paths': paths,
+        'seed': seed,
+        'goals': goal_forecasts(user_id, paths=paths, seed=seed)
+    })
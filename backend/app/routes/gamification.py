@@ -4,10 +4,15 @@ from app.models import DailyCheckIn, Achievement, WeeklyMission, UserActivityLog
 from app.extensions import db
 import uuid
 from datetime import datetime, timezone, timedelta
-from sqlalchemy import desc, func
+from sqlalchemy import func
 import json
+from app.leveling import get_level_progress
+from app.refdata import get_reference_data, bump_reference_version
+from app.pagination import paginate_query, paginate_items
+from app.versioning import register_data_versioning
 
 gamification_bp = Blueprint('gamification', __name__)
+register_data_versioning(gamification_bp)
 
 def get_pagination_params():
     page = request.args.get('page', 1, type=int)
@@ -35,16 +40,12 @@ def get_check_ins():
     
     # Apply sorting
     sort_by = request.args.get('sort_by', 'date')
-    if sort_by in ['date', 'completed']:
-        direction = request.args.get('direction', 'desc')
-        if direction == 'desc':
-            query = query.order_by(desc(getattr(DailyCheckIn, sort_by)))
-        else:
-            query = query.order_by(getattr(DailyCheckIn, sort_by))
+    if sort_by not in ['date', 'completed']:
+        sort_by = 'date'
+    direction = request.args.get('direction', 'desc')
     
-    # Apply pagination
-    pagination = query.paginate(page=page, per_page=per_page)
-    check_ins = pagination.items
+    # Apply pagination (?page= or ?cursor=)
+    check_ins, pagination = paginate_query(query, DailyCheckIn, sort_by, direction, page, per_page)
     
     return jsonify({
         'items': [{
@@ -52,9 +53,7 @@ def get_check_ins():
             'date': c.date.isoformat(),
             'completed': c.completed
         } for c in check_ins],
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': page
+        **pagination
     })
 
 @gamification_bp.route('/check-ins', methods=['POST'])
@@ -114,30 +113,26 @@ def update_check_in(check_in_id):
 def get_achievements():
     page, per_page = get_pagination_params()
     
-    # Build query with filters
-    query = Achievement.query
+    # Filter the cached achievements
+    achievements = get_reference_data('achievements')
     
     # Apply filters
     min_xp = request.args.get('min_xp', type=float)
     if min_xp is not None:
-        query = query.filter(Achievement.xp_reward >= min_xp)
+        achievements = [a for a in achievements if a.xp_reward >= min_xp]
     
     max_xp = request.args.get('max_xp', type=float)
     if max_xp is not None:
-        query = query.filter(Achievement.xp_reward <= max_xp)
+        achievements = [a for a in achievements if a.xp_reward <= max_xp]
     
     # Apply sorting
     sort_by = request.args.get('sort_by', 'name')
-    if sort_by in ['name', 'xp_reward']:
-        direction = request.args.get('direction', 'asc')
-        if direction == 'desc':
-            query = query.order_by(desc(getattr(Achievement, sort_by)))
-        else:
-            query = query.order_by(getattr(Achievement, sort_by))
+    if sort_by not in ['name', 'xp_reward']:
+        sort_by = 'name'
+    direction = request.args.get('direction', 'asc')
     
-    # Apply pagination
-    pagination = query.paginate(page=page, per_page=per_page)
-    achievements = pagination.items
+    # Apply pagination (?page= or ?cursor=)
+    achievements, pagination = paginate_items(achievements, sort_by, direction, page, per_page)
     
     return jsonify({
         'items': [{
@@ -147,9 +142,7 @@ def get_achievements():
             'xp_reward': a.xp_reward,
             'condition': json.loads(a.condition) if a.condition else None
         } for a in achievements],
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': page
+        **pagination
     })
 
 @gamification_bp.route('/achievements', methods=['POST'])
@@ -176,6 +169,7 @@ def create_achievement():
     )
     
     db.session.add(new_achievement)
+    bump_reference_version('achievements')
     db.session.commit()
     
     return jsonify({
@@ -203,6 +197,7 @@ def update_achievement(achievement_id):
     if 'condition' in data:
         achievement.condition = json.dumps(data['condition']) if data['condition'] else None
     
+    bump_reference_version('achievements')
     db.session.commit()
     
     return jsonify({
@@ -218,6 +213,7 @@ def update_achievement(achievement_id):
 def delete_achievement(achievement_id):
     achievement = Achievement.query.get_or_404(achievement_id)
     db.session.delete(achievement)
+    bump_reference_version('achievements')
     db.session.commit()
     return jsonify({'message': 'Achievement deleted successfully'})
 
@@ -227,38 +223,31 @@ def delete_achievement(achievement_id):
 def get_weekly_missions():
     page, per_page = get_pagination_params()
     
-    # Build query with filters
-    query = WeeklyMission.query
+    # Filter the cached missions
+    missions = get_reference_data('weekly_missions')
     
     # Apply filters
     min_xp = request.args.get('min_xp', type=float)
     if min_xp is not None:
-        query = query.filter(WeeklyMission.xp_reward >= min_xp)
+        missions = [m for m in missions if m.xp_reward >= min_xp]
     
     max_xp = request.args.get('max_xp', type=float)
     if max_xp is not None:
-        query = query.filter(WeeklyMission.xp_reward <= max_xp)
+        missions = [m for m in missions if m.xp_reward <= max_xp]
     
     active_only = request.args.get('active_only', 'false').lower() == 'true'
     if active_only:
         today = datetime.now(timezone.utc).date()
-        query = query.filter(
-            WeeklyMission.start_date <= today,
-            WeeklyMission.end_date >= today
-        )
+        missions = [m for m in missions if m.start_date <= today <= m.end_date]
     
     # Apply sorting
     sort_by = request.args.get('sort_by', 'start_date')
-    if sort_by in ['name', 'xp_reward', 'start_date', 'end_date']:
-        direction = request.args.get('direction', 'desc')
-        if direction == 'desc':
-            query = query.order_by(desc(getattr(WeeklyMission, sort_by)))
-        else:
-            query = query.order_by(getattr(WeeklyMission, sort_by))
+    if sort_by not in ['name', 'xp_reward', 'start_date', 'end_date']:
+        sort_by = 'start_date'
+    direction = request.args.get('direction', 'desc')
     
-    # Apply pagination
-    pagination = query.paginate(page=page, per_page=per_page)
-    missions = pagination.items
+    # Apply pagination (?page= or ?cursor=)
+    missions, pagination = paginate_items(missions, sort_by, direction, page, per_page)
     
     return jsonify({
         'items': [{
@@ -269,9 +258,7 @@ def get_weekly_missions():
             'start_date': m.start_date.isoformat(),
             'end_date': m.end_date.isoformat()
         } for m in missions],
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': page
+        **pagination
     })
 
 @gamification_bp.route('/weekly-missions', methods=['POST'])
@@ -306,6 +293,7 @@ def create_weekly_mission():
     )
     
     db.session.add(new_mission)
+    bump_reference_version('weekly_missions')
     db.session.commit()
     
     return jsonify({
@@ -340,6 +328,7 @@ def update_weekly_mission(mission_id):
         if mission.end_date < mission.start_date:
             return jsonify({'error': 'End date must be after start date'}), 400
     
+    bump_reference_version('weekly_missions')
     db.session.commit()
     
     return jsonify({
@@ -356,6 +345,7 @@ def update_weekly_mission(mission_id):
 def delete_weekly_mission(mission_id):
     mission = WeeklyMission.query.get_or_404(mission_id)
     db.session.delete(mission)
+    bump_reference_version('weekly_missions')
     db.session.commit()
     return jsonify({'message': 'Weekly mission deleted successfully'})
 
@@ -495,7 +485,7 @@ def get_achievement_progress():
     user_id = get_jwt_identity()
     
     # Get all achievements
-    achievements = Achievement.query.all()
+    achievements = get_reference_data('achievements')
     
     # Calculate progress for each achievement
     achievement_progress = []
@@ -525,10 +515,10 @@ def get_weekly_mission_progress():
     
     # Get current week's missions
     today = datetime.now(timezone.utc).date()
-    current_missions = WeeklyMission.query.filter(
-        WeeklyMission.start_date <= today,
-        WeeklyMission.end_date >= today
-    ).all()
+    current_missions = [
+        m for m in get_reference_data('weekly_missions')
+        if m.start_date <= today <= m.end_date
+    ]
     
     # Get user's check-ins for the current week
     week_start = today - timedelta(days=today.weekday())
@@ -585,17 +575,16 @@ def get_xp_summary():
         UserActivityLog.date >= month_start
     ).scalar() or 0
     
-    # Calculate level (assuming 1000 XP per level)
-    current_level = (total_xp // 1000) + 1
-    xp_for_next_level = 1000 - (total_xp % 1000)
+    # Calculate level from the shared leveling table
+    current_level, xp_into_level, xp_for_level = get_level_progress(total_xp)
     
     return jsonify({
         'total_xp': total_xp,
         'weekly_xp': weekly_xp,
         'monthly_xp': monthly_xp,
         'current_level': current_level,
-        'xp_for_next_level': xp_for_next_level,
-        'level_progress': (total_xp % 1000) / 1000
+        'xp_for_next_level': xp_for_level - xp_into_level,
+        'level_progress': xp_into_level / xp_for_level
     })
 
 @gamification_bp.route('/analytics/activity-stats', methods=['GET'])
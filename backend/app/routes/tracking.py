@@ -1,42 +1,58 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models.tracking import Journal, WeightLog, ProgressPhoto
+from app.models.tracking import (
+    Journal, WeightLog, ProgressPhoto, DailyWeightRollup, DailyPhotoRollup
+)
 from app.models.activity import Activity, UserActivity
 from app.models.user import User
-from app.extensions import db
+from app.extensions import db, UPSERT_DIALECTS
 import uuid
 from datetime import datetime, timezone, timedelta
-from sqlalchemy import desc, func, and_, or_
+from sqlalchemy import func, and_, or_, case, update, insert
+from sqlalchemy.orm import with_expression
 import json
 from app.decorators import token_required
+from app.jobs import submit_job
+from app.reset import reset_user_data, DEFAULT_CHUNK_SIZE
+from app.leveling import get_current_level_and_next_xp, xp_required_for_level
+from app.refdata import get_reference_data
+from app.pagination import paginate_query, get_cursor_params
+from app.search import search_journals
+from app.fields import get_fields, load_fields, serialize
+from app.storage import get_photo_storage, save_multipart_upload, iter_stream, Upload, BlobTooLarge
+from app.thumbnails import generate_variants, variant_urls, variant_mimetype, VARIANT_NAMES
+from app.trends import weight_trend, mood_trend, BUCKETS, DEFAULT_MAX_POINTS, MAX_POINTS
+from app.versioning import register_data_versioning
+from app.weight_import import (
+    validate_weight, validate_weight_log, import_weight_logs, iter_weight_rows, detect_format, utc_naive,
+    FORMATS, WeightImportParseError
+)
 import math
+import logging
 
 tracking_bp = Blueprint('tracking', __name__)
+register_data_versioning(tracking_bp)
+logger = logging.getLogger(__name__)
 
 TEST_MODE = True  # Temporary flag for testing streak/multiplier logic
 
-def calculate_xp_for_level(level):
-    """Calculate XP needed for a specific level."""
-    return int(500 + pow(level, 1.5))
-
-def get_current_level_and_next_xp(total_xp):
-    """
-    Calculate current level and XP needed for next level based on total XP.
-    Returns (current_level, xp_needed_for_next_level)
-    """
-    level = 1
-    while True:
-        next_level_xp = calculate_xp_for_level(level + 1)
-        if total_xp < next_level_xp:
-            return level, next_level_xp
-        level += 1
-
 def get_pagination_params():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
     return page, per_page
 
 # Journal Routes
+# Fields returned by get_journals; excerpt is only filled when requested
+JOURNAL_FIELDS = {
+    'id': lambda j: j.id,
+    'title': lambda j: j.title,
+    'content': lambda j: j.content,
+    'excerpt': lambda j: j.content_excerpt,
+    'mood': lambda j: j.mood,
+    'created_at': lambda j: j.created_at.isoformat()
+}
+DEFAULT_EXCERPT_LENGTH = 200
+
 @tracking_bp.route('/journals', methods=['GET'])
 @jwt_required()
 def get_journals():
@@ -61,28 +77,47 @@ def get_journals():
     
     # Apply sorting
     sort_by = request.args.get('sort_by', 'created_at')
-    if sort_by in ['created_at', 'title']:
-        direction = request.args.get('direction', 'desc')
-        if direction == 'desc':
-            query = query.order_by(desc(getattr(Journal, sort_by)))
-        else:
-            query = query.order_by(getattr(Journal, sort_by))
+    if sort_by not in ['created_at', 'title']:
+        sort_by = 'created_at'
+    direction = request.args.get('direction', 'desc')
+    
+    # Load only the requested fields; ?excerpt=N swaps content for its first N characters
+    excerpt_length = request.args.get('excerpt', type=int)
+    default_fields = [f for f in JOURNAL_FIELDS if f != ('content' if excerpt_length else 'excerpt')]
+    fields = get_fields(JOURNAL_FIELDS, default=default_fields)
+    query = load_fields(query, Journal, fields, sort_by)
+    if 'excerpt' in fields:
+        length = max(excerpt_length or DEFAULT_EXCERPT_LENGTH, 1)
+        query = query.options(with_expression(Journal.content_excerpt, func.substr(Journal.content, 1, length)))
+    
+    # Apply pagination (?page= or ?cursor=)
+    journals, pagination = paginate_query(query, Journal, sort_by, direction, page, per_page)
     
-    # Apply pagination
-    pagination = query.paginate(page=page, per_page=per_page)
-    journals = pagination.items
+    return jsonify({
+        'items': [serialize(j, JOURNAL_FIELDS, fields) for j in journals],
+        **pagination
+    })
+
+@tracking_bp.route('/journals/search', methods=['GET'])
+@jwt_required()
+def search_journal_entries():
+    """Full-text search over the user's journals, best match first, paged by ?cursor=."""
+    user_id = get_jwt_identity()
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify({'error': 'Search query is required'}), 400
+    
+    _, per_page = get_pagination_params()
+    cursor, limit, _ = get_cursor_params(per_page)
+    
+    items, next_cursor = search_journals(user_id, q, cursor=cursor, limit=limit)
+    if items is None:
+        return jsonify({'error': 'Search query must contain at least one word'}), 400
     
     return jsonify({
-        'items': [{
-            'id': j.id,
-            'title': j.title,
-            'content': j.content,
-            'mood': j.mood,
-            'created_at': j.created_at.isoformat()
-        } for j in journals],
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': page
+        'items': items,
+        'next_cursor': next_cursor,
+        'limit': limit
     })
 
 @tracking_bp.route('/journals', methods=['POST'])
@@ -149,6 +184,14 @@ def delete_journal(journal_id):
     return jsonify({'message': 'Journal entry deleted successfully'})
 
 # Weight Log Routes
+# Fields returned by get_weight_logs
+WEIGHT_LOG_FIELDS = {
+    'id': lambda l: l.id,
+    'weight': lambda l: l.weight,
+    'date': lambda l: l.date.isoformat(),
+    'notes': lambda l: l.notes
+}
+
 @tracking_bp.route('/weight-logs', methods=['GET'])
 @jwt_required()
 def get_weight_logs():
@@ -169,27 +212,20 @@ def get_weight_logs():
     
     # Apply sorting
     sort_by = request.args.get('sort_by', 'date')
-    if sort_by in ['date', 'weight']:
-        direction = request.args.get('direction', 'desc')
-        if direction == 'desc':
-            query = query.order_by(desc(getattr(WeightLog, sort_by)))
-        else:
-            query = query.order_by(getattr(WeightLog, sort_by))
+    if sort_by not in ['date', 'weight']:
+        sort_by = 'date'
+    direction = request.args.get('direction', 'desc')
     
-    # Apply pagination
-    pagination = query.paginate(page=page, per_page=per_page)
-    logs = pagination.items
+    # Load only the requested fields
+    fields = get_fields(WEIGHT_LOG_FIELDS)
+    query = load_fields(query, WeightLog, fields, sort_by)
+    
+    # Apply pagination (?page= or ?cursor=)
+    logs, pagination = paginate_query(query, WeightLog, sort_by, direction, page, per_page)
     
     return jsonify({
-        'items': [{
-            'id': l.id,
-            'weight': l.weight,
-            'date': l.date.isoformat(),
-            'notes': l.notes
-        } for l in logs],
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': page
+        'items': [serialize(l, WEIGHT_LOG_FIELDS, fields) for l in logs],
+        **pagination
     })
 
 @tracking_bp.route('/weight-logs', methods=['POST'])
@@ -198,21 +234,19 @@ def create_weight_log():
     user_id = get_jwt_identity()
     data = request.get_json()
     
-    # Validate required fields
-    if 'weight' not in data:
-        return jsonify({'error': 'Weight is required'}), 400
-    
-    # Validate weight is positive
-    if not isinstance(data['weight'], (int, float)) or data['weight'] <= 0:
-        return jsonify({'error': 'Weight must be a positive number'}), 400
+    # Same rules as the bulk import
+    try:
+        weight, date, notes = validate_weight_log(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     # Create new weight log
     new_log = WeightLog(
         id=str(uuid.uuid4()),
         user_id=user_id,
-        weight=float(data['weight']),
-        date=datetime.fromisoformat(data.get('date', datetime.now(timezone.utc).isoformat())),
-        notes=data.get('notes', '')
+        weight=weight,
+        date=date,
+        notes=notes
     )
     
     db.session.add(new_log)
@@ -225,6 +259,34 @@ def create_weight_log():
         'notes': new_log.notes
     }), 201
 
+@tracking_bp.route('/weight-logs/import', methods=['POST'])
+@jwt_required()
+def import_weight_log_file():
+    user_id = get_jwt_identity()
+
+    # A multipart upload in 'file', or the file itself as the request body
+    upload = request.files.get('file')
+    stream = upload.stream if upload else request.stream
+    import_format = request.args.get('format') or detect_format(upload.filename if upload else None)
+    if import_format not in FORMATS:
+        return jsonify({'error': f'Format must be one of: {", ".join(FORMATS)}'}), 400
+
+    unit = request.args.get('unit')
+    if unit not in (None, 'kg', 'lb'):
+        return jsonify({'error': 'Unit must be kg or lb'}), 400
+
+    try:
+        summary = import_weight_logs(user_id, iter_weight_rows(stream, import_format, unit=unit))
+    except WeightImportParseError as e:
+        # Rows before the broken part of the file are kept; last_line says where it stopped
+        logger.info("Weight log import for user %s stopped at line %s (%d imported)",
+                    user_id, e.summary['last_line'], e.summary['accepted'])
+        return jsonify({'error': 'Could not parse the file', **e.summary}), 400
+
+    logger.info("Imported %d weight logs for user %s (%d rejected, %d duplicates)",
+                summary['accepted'], user_id, summary['rejected'], summary['duplicates'])
+    return jsonify(summary)
+
 @tracking_bp.route('/weight-logs/<log_id>', methods=['PUT'])
 @jwt_required()
 def update_weight_log(log_id):
@@ -233,11 +295,12 @@ def update_weight_log(log_id):
     data = request.get_json()
     
     if 'weight' in data:
-        if not isinstance(data['weight'], (int, float)) or data['weight'] <= 0:
-            return jsonify({'error': 'Weight must be a positive number'}), 400
-        log.weight = float(data['weight'])
+        try:
+            log.weight = validate_weight(data['weight'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
     if 'date' in data:
-        log.date = datetime.fromisoformat(data['date'])
+        log.date = utc_naive(datetime.fromisoformat(data['date']))
     if 'notes' in data:
         log.notes = data['notes']
     
@@ -260,6 +323,16 @@ def delete_weight_log(log_id):
     return jsonify({'message': 'Weight log deleted successfully'})
 
 # Progress Photo Routes
+# Fields returned by get_progress_photos
+PROGRESS_PHOTO_FIELDS = {
+    'id': lambda p: p.id,
+    'photo_url': lambda p: p.photo_url,
+    'category': lambda p: p.category,
+    'date': lambda p: p.date.isoformat(),
+    'notes': lambda p: p.notes,
+    'variants': lambda p: variant_urls(p.photo_url, p.content_hash)
+}
+
 @tracking_bp.route('/progress-photos', methods=['GET'])
 @jwt_required()
 def get_progress_photos():
@@ -284,28 +357,21 @@ def get_progress_photos():
     
     # Apply sorting
     sort_by = request.args.get('sort_by', 'date')
-    if sort_by in ['date', 'category']:
-        direction = request.args.get('direction', 'desc')
-        if direction == 'desc':
-            query = query.order_by(desc(getattr(ProgressPhoto, sort_by)))
-        else:
-            query = query.order_by(getattr(ProgressPhoto, sort_by))
+    if sort_by not in ['date', 'category']:
+        sort_by = 'date'
+    direction = request.args.get('direction', 'desc')
     
-    # Apply pagination
-    pagination = query.paginate(page=page, per_page=per_page)
-    photos = pagination.items
+    # Load only the requested fields
+    fields = get_fields(PROGRESS_PHOTO_FIELDS)
+    variant_columns = ['photo_url', 'content_hash'] if 'variants' in fields else []
+    query = load_fields(query, ProgressPhoto, fields, sort_by, *variant_columns)
+    
+    # Apply pagination (?page= or ?cursor=)
+    photos, pagination = paginate_query(query, ProgressPhoto, sort_by, direction, page, per_page)
     
     return jsonify({
-        'items': [{
-            'id': p.id,
-            'photo_url': p.photo_url,
-            'category': p.category,
-            'date': p.date.isoformat(),
-            'notes': p.notes
-        } for p in photos],
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': page
+        'items': [serialize(p, PROGRESS_PHOTO_FIELDS, fields) for p in photos],
+        **pagination
     })
 
 @tracking_bp.route('/progress-photos', methods=['POST'])
@@ -345,6 +411,113 @@ def create_progress_photo():
         'notes': new_photo.notes
     }), 201
 
+# Image types accepted by the photo upload
+PHOTO_CONTENT_TYPES = ['image/jpeg', 'image/png', 'image/webp', 'image/heic']
+PHOTO_MAX_AGE = 365 * 24 * 60 * 60
+
+@tracking_bp.route('/progress-photos/upload', methods=['POST'])
+@jwt_required()
+def upload_progress_photo():
+    user_id = get_jwt_identity()
+    storage = get_photo_storage()
+    max_size = current_app.config['MAX_PHOTO_SIZE']
+    
+    # A multipart form with the image in 'file', or the image itself as the body
+    try:
+        if request.mimetype == 'multipart/form-data':
+            boundary = request.mimetype_params.get('boundary', '').encode()
+            fields, upload = save_multipart_upload(storage, request.stream, boundary, max_size=max_size)
+        elif request.mimetype in PHOTO_CONTENT_TYPES:
+            fields = request.args
+            upload = Upload(storage.save(iter_stream(request.stream), max_size=max_size), request.mimetype, None)
+        else:
+            return jsonify({'error': 'Upload a multipart form or an image body'}), 400
+    except BlobTooLarge as e:
+        return jsonify({'error': str(e)}), 413
+    except ValueError:
+        return jsonify({'error': 'Malformed upload'}), 400
+    
+    if upload is None:
+        return jsonify({'error': 'Photo file is required'}), 400
+    
+    # Validate the photo; a file stored only for this request is left to `flask photos sweep`
+    category = fields.get('category') or request.args.get('category')
+    error = None
+    if upload.content_type not in PHOTO_CONTENT_TYPES:
+        error = f'Photo must be one of: {", ".join(PHOTO_CONTENT_TYPES)}'
+    elif category not in ['front', 'side', 'back']:
+        error = 'Invalid category. Must be one of: front, side, back'
+    else:
+        try:
+            date = datetime.fromisoformat(fields.get('date') or datetime.now(timezone.utc).isoformat())
+        except ValueError:
+            error = 'Date must be an ISO 8601 timestamp'
+    if error:
+        return jsonify({'error': error}), 400
+    
+    photo_id = str(uuid.uuid4())
+    new_photo = ProgressPhoto(
+        id=photo_id,
+        user_id=user_id,
+        photo_url=url_for('tracking.download_progress_photo', photo_id=photo_id),
+        category=category,
+        date=date,
+        notes=fields.get('notes', ''),
+        content_hash=upload.blob.digest,
+        content_type=upload.content_type,
+        file_size=upload.blob.size
+    )
+    
+    db.session.add(new_photo)
+    db.session.commit()
+    
+    # Resized variants are rendered in the background; duplicates already have them
+    if upload.blob.created:
+        submit_job('photo_variants', user_id, generate_variants, upload.blob.digest)
+    
+    return jsonify({
+        'id': new_photo.id,
+        'photo_url': new_photo.photo_url,
+        'category': new_photo.category,
+        'date': new_photo.date.isoformat(),
+        'notes': new_photo.notes,
+        'content_type': new_photo.content_type,
+        'file_size': new_photo.file_size,
+        'variants': variant_urls(new_photo.photo_url, new_photo.content_hash)
+    }), 201
+
+@tracking_bp.route('/progress-photos/<photo_id>/file', methods=['GET'])
+@jwt_required()
+def download_progress_photo(photo_id):
+    user_id = get_jwt_identity()
+    variant = request.args.get('variant')
+    if variant is not None and variant not in VARIANT_NAMES:
+        return jsonify({'error': f'Variant must be one of: {", ".join(VARIANT_NAMES)}'}), 400
+    
+    photo = ProgressPhoto.query.filter_by(id=photo_id, user_id=user_id).first_or_404()
+    if not photo.content_hash:
+        return jsonify({'error': 'Photo has no uploaded file'}), 404
+    
+    # Range, ETag and If-None-Match are answered by send_file
+    storage = get_photo_storage()
+    fallback = bool(variant) and not storage.variant_exists(photo.content_hash, variant)
+    if variant and not fallback:
+        response = storage.send_variant(photo.content_hash, variant, variant_mimetype(variant))
+    else:
+        # The original stands in until the variants are rendered
+        response = storage.send(photo.content_hash, photo.content_type)
+    # Stored files never change, but they belong to one user
+    response.cache_control.public = False
+    response.cache_control.private = True
+    if fallback:
+        # Revalidated on every use, so the variant replaces the original once it is rendered
+        response.cache_control.no_cache = True
+    else:
+        # send_file marks files no-cache when no max age is configured
+        response.cache_control.no_cache = None
+        response.cache_control.max_age = PHOTO_MAX_AGE
+    return response
+
 @tracking_bp.route('/progress-photos/<photo_id>', methods=['PUT'])
 @jwt_required()
 def update_progress_photo(photo_id):
@@ -381,6 +554,7 @@ def delete_progress_photo(photo_id):
     photo = ProgressPhoto.query.filter_by(id=photo_id, user_id=user_id).first_or_404()
     db.session.delete(photo)
     db.session.commit()
+    # Identical uploads share one file, so it is only removed by `flask photos sweep`
     return jsonify({'message': 'Progress photo deleted successfully'})
 
 # Analytics Routes
@@ -389,84 +563,32 @@ def delete_progress_photo(photo_id):
 def get_weight_trend():
     user_id = get_jwt_identity()
     
-    # Get time period from query parameters
+    # Get time period and series size from query parameters
     days = request.args.get('days', 30, type=int)
-    start_date = datetime.now(timezone.utc).date() - timedelta(days=days)
-    
-    # Get weight logs
-    logs = WeightLog.query.filter(
-        WeightLog.user_id == user_id,
-        WeightLog.date >= start_date
-    ).order_by(WeightLog.date).all()
-    
-    if not logs:
-        return jsonify({
-            'weight_data': [],
-            'start_weight': None,
-            'current_weight': None,
-            'weight_change': 0,
-            'average_weight': 0
-        })
-    
-    # Calculate statistics
-    start_weight = logs[0].weight
-    current_weight = logs[-1].weight
-    weight_change = current_weight - start_weight
-    average_weight = sum(log.weight for log in logs) / len(logs)
+    max_points = request.args.get('max_points', DEFAULT_MAX_POINTS, type=int)
+    max_points = min(max(max_points, 3), MAX_POINTS)
+    bucket = request.args.get('bucket')
+    if bucket is not None and bucket not in BUCKETS:
+        return jsonify({'error': f'Bucket must be one of: {", ".join(BUCKETS)}'}), 400
     
-    # Format weight data for chart
-    weight_data = [{
-        'date': log.date.isoformat(),
-        'weight': log.weight
-    } for log in logs]
-    
-    return jsonify({
-        'weight_data': weight_data,
-        'start_weight': start_weight,
-        'current_weight': current_weight,
-        'weight_change': weight_change,
-        'average_weight': average_weight
-    })
+    return jsonify(weight_trend(user_id, days, max_points=max_points, bucket=bucket))
 
 @tracking_bp.route('/analytics/mood-trend', methods=['GET'])
 @jwt_required()
 def get_mood_trend():
     user_id = get_jwt_identity()
     
-    # Get time period from query parameters
+    # Get time period and timeline granularity from query parameters
     days = request.args.get('days', 30, type=int)
-    start_date = datetime.now(timezone.utc).date() - timedelta(days=days)
-    
-    # Get journal entries with mood
-    entries = Journal.query.filter(
-        Journal.user_id == user_id,
-        Journal.created_at >= start_date,
-        Journal.mood.isnot(None)
-    ).order_by(Journal.created_at).all()
+    granularity = request.args.get('granularity', 'day')
+    if granularity not in BUCKETS:
+        return jsonify({'error': f'Granularity must be one of: {", ".join(BUCKETS)}'}), 400
     
-    if not entries:
-        return jsonify({
-            'mood_data': [],
-            'mood_distribution': {},
-            'average_mood': None
-        })
-    
-    # Calculate mood distribution
-    mood_counts = {}
-    for entry in entries:
-        mood_counts[entry.mood] = mood_counts.get(entry.mood, 0) + 1
-    
-    # Format mood data for chart
-    mood_data = [{
-        'date': entry.created_at.isoformat(),
-        'mood': entry.mood
-    } for entry in entries]
-    
-    return jsonify({
-        'mood_data': mood_data,
-        'mood_distribution': mood_counts,
-        'total_entries': len(entries)
-    })
+    # Grouped in SQL over the daily mood rollups; journal rows are never read
+    return jsonify(mood_trend(user_id, days, granularity=granularity))
+
+# Latest photos listed per category in the progress summary
+SUMMARY_PHOTOS_PER_CATEGORY = 12
 
 @tracking_bp.route('/analytics/progress-summary', methods=['GET'])
 @jwt_required()
@@ -477,42 +599,118 @@ def get_progress_summary():
     days = request.args.get('days', 30, type=int)
     start_date = datetime.now(timezone.utc).date() - timedelta(days=days)
     
-    # Get progress photos by category
-    photos = ProgressPhoto.query.filter(
+    # Photo counts per category from the daily rollups
+    photo_counts = dict(db.session.execute(
+        db.select(DailyPhotoRollup.category, func.sum(DailyPhotoRollup.count))
+        .where(DailyPhotoRollup.user_id == user_id, DailyPhotoRollup.day >= start_date)
+        .group_by(DailyPhotoRollup.category)
+    ).all())
+    
+    # Latest photos of each category, newest first
+    position = func.row_number().over(
+        partition_by=ProgressPhoto.category,
+        order_by=(ProgressPhoto.date.desc(), ProgressPhoto.id)
+    ).label('position')
+    latest = db.select(
+        ProgressPhoto.category, ProgressPhoto.date, ProgressPhoto.photo_url, ProgressPhoto.content_hash, position
+    ).where(
         ProgressPhoto.user_id == user_id,
         ProgressPhoto.date >= start_date
+    ).subquery()
+    photos = db.session.execute(
+        db.select(latest.c.category, latest.c.date, latest.c.photo_url, latest.c.content_hash)
+        .where(latest.c.position <= SUMMARY_PHOTOS_PER_CATEGORY)
+        .order_by(latest.c.category, latest.c.position)
     ).all()
     
     # Group photos by category
     category_photos = {}
-    for photo in photos:
-        if photo.category not in category_photos:
-            category_photos[photo.category] = []
-        category_photos[photo.category].append({
-            'date': photo.date.isoformat(),
-            'photo_url': photo.photo_url
+    for category, date, photo_url, content_hash in photos:
+        category_photos.setdefault(category, []).append({
+            'date': date.isoformat(),
+            'photo_url': photo_url,
+            'variants': variant_urls(photo_url, content_hash)
         })
     
-    # Get weight logs
-    weight_logs = WeightLog.query.filter(
-        WeightLog.user_id == user_id,
-        WeightLog.date >= start_date
-    ).order_by(WeightLog.date).all()
-    
-    # Calculate weight statistics
+    # Weight statistics from the daily weight rollups
+    weight_days = db.session.execute(
+        db.select(DailyWeightRollup.total_weight, DailyWeightRollup.count)
+        .where(DailyWeightRollup.user_id == user_id, DailyWeightRollup.day >= start_date)
+        .order_by(DailyWeightRollup.day)
+    ).all()
+    start_weight = weight_days[0][0] / weight_days[0][1] if weight_days else None
+    current_weight = weight_days[-1][0] / weight_days[-1][1] if weight_days else None
     weight_stats = {
-        'start_weight': weight_logs[0].weight if weight_logs else None,
-        'current_weight': weight_logs[-1].weight if weight_logs else None,
-        'weight_change': (weight_logs[-1].weight - weight_logs[0].weight) if weight_logs else 0,
-        'total_measurements': len(weight_logs)
+        'start_weight': start_weight,
+        'current_weight': current_weight,
+        'weight_change': (current_weight - start_weight) if weight_days else 0,
+        'total_measurements': sum(count for _, count in weight_days)
     }
     
     return jsonify({
         'category_photos': category_photos,
+        'category_counts': photo_counts,
         'weight_stats': weight_stats,
-        'total_photos': len(photos)
+        'total_photos': sum(photo_counts.values())
     })
 
+def upsert_user_activities(user_id, activities, today):
+    """
+    Select the given activities for the user with a constant number of statements.
+    Existing rows are reactivated and reset, missing rows are inserted in one multi-row insert.
+    """
+    if not activities:
+        return
+
+    rows = [{
+        'id': str(uuid.uuid4()),
+        'user_id': user_id,
+        'activity_id': activity.id,
+        'activity_name': activity.name,
+        'category': activity.category,
+        'type': activity.type,
+        'date': today,
+        'is_active': True,
+        'completed': False,
+        'is_completed_today': False
+    } for activity in activities]
+    reset_values = {
+        'is_active': True,
+        'date': today,  # Update the date to today
+        'completed': False,  # Reset completion status
+        'is_completed_today': False,  # Reset daily completion
+        'updated_at': datetime.now(timezone.utc)  # onupdate does not fire for ON CONFLICT updates
+    }
+
+    dialect_insert = UPSERT_DIALECTS.get(db.session.get_bind().dialect.name)
+    if dialect_insert is not None:
+        # Single INSERT ... ON CONFLICT on _user_activity_uc
+        stmt = dialect_insert(UserActivity)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserActivity.user_id, UserActivity.activity_id],
+            set_=reset_values
+        )
+        db.session.execute(stmt, rows)
+        return
+
+    # Portable fallback: reset existing rows, then insert only the missing ones
+    activity_ids = [activity.id for activity in activities]
+    db.session.execute(
+        update(UserActivity)
+        .where(UserActivity.user_id == user_id, UserActivity.activity_id.in_(activity_ids))
+        .values(**reset_values)
+        .execution_options(synchronize_session=False)
+    )
+    existing_ids = set(db.session.scalars(
+        db.select(UserActivity.activity_id).where(
+            UserActivity.user_id == user_id,
+            UserActivity.activity_id.in_(activity_ids)
+        )
+    ))
+    missing_rows = [row for row in rows if row['activity_id'] not in existing_ids]
+    if missing_rows:
+        db.session.execute(insert(UserActivity), missing_rows)
+
 # Activity Management Routes
 @tracking_bp.route('/activities', methods=['GET'])
 @jwt_required()
@@ -533,139 +731,211 @@ def update_selected_activities():
         if not isinstance(selected_activities, list):
             return jsonify({'error': 'Invalid data format'}), 400
         
-        # Get all current active selections for the user
-        current_selections = UserActivity.query.filter(
-            UserActivity.user_id == user_id,
-            UserActivity.is_active == True
-        ).all()
-        
-        # Deactivate all current selections
-        for selection in current_selections:
-            selection.is_active = False
-        
-        # Create or update new selections
         today = datetime.now(timezone.utc).date()
-        for activity_id in selected_activities:
-            # Get the activity details
-            activity = Activity.query.get(activity_id)
-            if not activity:
-                continue
-                
-            # Try to find any existing record for this activity (regardless of date)
-            user_activity = UserActivity.query.filter(
-                UserActivity.user_id == user_id,
-                UserActivity.activity_id == activity_id
-            ).first()
-            
-            if user_activity:
-                # Update existing record
-                user_activity.is_active = True
-                user_activity.date = today  # Update the date to today
-                user_activity.completed = False  # Reset completion status
-                user_activity.is_completed_today = False  # Reset daily completion
-            else:
-                # Create new record
-                new_selection = UserActivity(
-                    id=str(uuid.uuid4()),
-                    user_id=user_id,
-                    activity_id=activity_id,
-                    activity_name=activity.name,
-                    category=activity.category,
-                    type=activity.type,
-                    date=today,
-                    is_active=True,
-                    completed=False,
-                    is_completed_today=False
-                )
-                db.session.add(new_selection)
-        
+
+        # Get the details of every referenced activity in one query
+        activities = Activity.query.filter(
+            Activity.id.in_(set(selected_activities))
+        ).all() if selected_activities else []
+
+        # Deactivate all current selections
+        db.session.execute(
+            update(UserActivity)
+            .where(UserActivity.user_id == user_id, UserActivity.is_active == True)
+            .values(is_active=False)
+            .execution_options(synchronize_session=False)
+        )
+
+        # Reactivate existing records and create the missing ones
+        upsert_user_activities(user_id, activities, today)
+
         db.session.commit()
         return jsonify({'message': 'Activities updated successfully'})
         
     except Exception as e:
         db.session.rollback()
-        print(f"Error updating activities: {str(e)}")
+        logger.exception("Error updating activities")
         return jsonify({'error': str(e)}), 500
 
+def get_activity_state(user_id):
+    """
+    Load the activity catalog and the user's selection/completion rows.
+    Returns (activities, user_activities)
+    """
+    # Shared default catalog from the reference cache, plus the user's custom activities
+    activities = list(get_reference_data('activities'))
+    activities += Activity.query.filter(
+        Activity.user_id == user_id,
+        Activity.is_custom == True
+    ).all()
+
+    # Get user's active selections and every row still flagged as completed
+    user_activities = UserActivity.query.filter(
+        UserActivity.user_id == user_id,
+        or_(
+            UserActivity.is_active == True,  # Get all active selections
+            UserActivity.is_completed_today == True  # Get completed activities
+        )
+    ).all()
+
+    return activities, user_activities
+
+def build_activity_catalog(activities, user_activities, today):
+    """
+    Merge the activity catalog with the user's selection and completion state.
+    Returns (activities_list, categorized_activities)
+    """
+    # Create sets for quick lookups
+    selected_activity_ids = {ua.activity_id for ua in user_activities if ua.is_active}
+    completed_activity_ids = {
+        ua.activity_id for ua in user_activities
+        if ua.is_completed_today and ua.date == today
+    }
+
+    # Create a list of all activities with their selection status
+    activities_list = []
+    categorized_activities = {}
+
+    for activity in activities:
+        activity_data = {
+            'id': activity.id,
+            'name': activity.name,
+            'category': activity.category,
+            'type': activity.type,
+            'is_custom': activity.is_custom,
+            'is_active': activity.id in selected_activity_ids,
+            'completed_today': activity.id in completed_activity_ids
+        }
+
+        activities_list.append(activity_data)
+
+        # Organize by category
+        if activity.category not in categorized_activities:
+            categorized_activities[activity.category] = []
+        categorized_activities[activity.category].append(activity_data)
+
+    return activities_list, categorized_activities
+
+def build_user_stats(user, user_activities):
+    """Build the level/XP/streak stats from already loaded user activity rows."""
+    current_level, xp_to_next = get_current_level_and_next_xp(user.current_xp)
+
+    return {
+        'level': current_level,
+        'current_xp': user.current_xp,
+        'xp_to_next_level': xp_to_next,
+        'streak_days': user.streak_days,
+        'multiplier': max(1, min(user.streak_days, 4)),
+        'completed_today': sum(1 for ua in user_activities if ua.is_completed_today),
+        'total_activities': sum(1 for ua in user_activities if ua.is_active)
+    }
+
 @tracking_bp.route('/all-activities', methods=['GET'])
 @jwt_required()
 def get_all_activities():
     user_id = get_jwt_identity()
-    
+
     try:
-        print(f"[DEBUG] Fetching activities for user {user_id}")
-        
-        # Get default activities and user's custom activities
-        activities = Activity.query.filter(
-            or_(
-                and_(Activity.user_id.is_(None), Activity.is_active == True),  # Default activities
-                and_(Activity.user_id == user_id, Activity.is_custom == True)   # User's custom activities
-            )
-        ).all()
-        
-        print(f"[DEBUG] Found {len(activities)} total activities")
-        
+        logger.debug("Fetching activities for user %s", user_id)
+
         # Get today's date
         today = datetime.now(timezone.utc).date()
-        
-        # Get user's active selections and completed activities for today
-        user_activities = UserActivity.query.filter(
-            UserActivity.user_id == user_id,
-            or_(
-                UserActivity.is_active == True,  # Get all active selections
-                and_(UserActivity.date == today, UserActivity.is_completed_today == True)  # Get today's completed activities
-            )
-        ).all()
-        
-        print(f"[DEBUG] Found {len(user_activities)} user activities")
-        
-        # Create sets for quick lookups
-        selected_activity_ids = {ua.activity_id for ua in user_activities if ua.is_active}
-        completed_activity_ids = {ua.activity_id for ua in user_activities if ua.is_completed_today}
-        
-        print(f"[DEBUG] Active activity IDs: {selected_activity_ids}")
-        print(f"[DEBUG] Completed activity IDs: {completed_activity_ids}")
-        
-        # Create a list of all activities with their selection status
-        activities_list = []
-        categorized_activities = {}
-        
-        for activity in activities:
-            is_active = activity.id in selected_activity_ids
-            completed_today = activity.id in completed_activity_ids
-            print(f"[DEBUG] Activity {activity.id} ({activity.name}) - is_active: {is_active}, completed_today: {completed_today}")
-            
-            activity_data = {
-                'id': activity.id,
-                'name': activity.name,
-                'category': activity.category,
-                'type': activity.type,
-                'is_custom': activity.is_custom,
-                'is_active': is_active,
-                'completed_today': completed_today
-            }
-            
-            activities_list.append(activity_data)
-            
-            # Organize by category
-            if activity.category not in categorized_activities:
-                categorized_activities[activity.category] = []
-            categorized_activities[activity.category].append(activity_data)
-        
-        print(f"[DEBUG] Returning {len(activities_list)} activities")
+
+        activities, user_activities = get_activity_state(user_id)
+        activities_list, categorized_activities = build_activity_catalog(activities, user_activities, today)
+
+        logger.debug("Returning %d activities", len(activities_list))
         return jsonify({
             'activities': activities_list,
             'categorized_activities': categorized_activities
         })
-        
-    except Exception as e:
-        print(f"[ERROR] Error fetching activities: {str(e)}")
+
+    except Exception:
+        logger.exception("Error fetching activities")
         return jsonify({
             'activities': [],
             'categorized_activities': {}
         }), 500
 
+@tracking_bp.route('/dashboard', methods=['GET'])
+@jwt_required()
+def get_dashboard():
+    """
+    Return the activity catalog, user stats and profile in one response.
+    Costs three statements once the default catalog is cached: the user, the
+    user's custom activities and the user's activity rows.
+    """
+    user_id = get_jwt_identity()
+    user = User.query.get_or_404(user_id)
+
+    try:
+        today = datetime.now(timezone.utc).date()
+
+        activities, user_activities = get_activity_state(user_id)
+        activities_list, categorized_activities = build_activity_catalog(activities, user_activities, today)
+
+        return jsonify({
+            'activities': activities_list,
+            'categorized_activities': categorized_activities,
+            'stats': build_user_stats(user, user_activities),
+            'profile': {
+                'id': user.id,
+                'username': user.username,
+                'email': user.email,
+                'level': user.level,
+                'current_xp': user.current_xp,
+                'streak_days': user.streak_days,
+                'multiplier': user.multiplier,
+                'created_at': user.created_at.isoformat() if user.created_at else None
+            }
+        })
+
+    except Exception:
+        logger.exception("Error fetching dashboard")
+        return jsonify({'error': 'Failed to fetch dashboard'}), 500
+
 BASE_XP = 500  # Base XP for completing all daily activities
+MAX_BATCH_SIZE = 100  # Maximum number of items accepted by the batch endpoint
+BATCH_ACTIONS = ['select', 'deselect', 'complete']
+
+def get_today_summary(user_id, today):
+    """
+    Count the user's selected and completed activities in one statement.
+    Returns a dict with selected, completed_today, completed_dated_today
+    and completed_yesterday.
+    """
+    yesterday = today - timedelta(days=1)
+    completed = UserActivity.is_completed_today == True
+    row = db.session.query(
+        func.count(case((UserActivity.is_active == True, 1))),
+        func.count(case((completed, 1))),
+        func.count(case((and_(completed, UserActivity.date == today), 1))),
+        func.count(case((and_(completed, UserActivity.date == yesterday), 1)))
+    ).filter(UserActivity.user_id == user_id).one()
+
+    selected, completed_today, completed_dated_today, completed_yesterday = row
+    return {
+        'selected': selected,
+        'completed_today': completed_today,
+        'completed_dated_today': completed_dated_today,
+        'completed_yesterday': completed_yesterday
+    }
+
+def apply_all_complete_bonus(user, total_selected, completed_today):
+    """
+    Award the all-activities-complete XP bonus when every selected activity is done.
+    Returns (xp_gained, multiplier); xp_gained is 0 when the bonus does not apply.
+    """
+    if total_selected == 0 or completed_today != total_selected:
+        return 0, 1
+
+    user.streak_days = min(user.streak_days + 1, 4)
+    multiplier = max(1, min(user.streak_days, 4))
+    xp_gained = BASE_XP * multiplier
+    user.current_xp += xp_gained
+    new_level, xp_to_next = get_current_level_and_next_xp(user.current_xp)
+    user.level = new_level
+    return xp_gained, multiplier
 
 @tracking_bp.route('/activities/<activity_id>/toggle', methods=['POST'])
 @jwt_required()
@@ -674,7 +944,7 @@ def toggle_activity(activity_id):
     user = User.query.get_or_404(user_id)
     
     try:
-        print(f"[DEBUG] Toggle activity request for user {user_id}, activity {activity_id}")
+        logger.debug("Toggle activity request for user %s, activity %s", user_id, activity_id)
         
         # Find the activity
         db_activity = Activity.query.get(activity_id)
@@ -691,7 +961,7 @@ def toggle_activity(activity_id):
         elif request.is_json and request.get_json():
             is_completion = request.get_json().get('is_completion', False)
             
-        print(f"[DEBUG] Request type - is_completion: {is_completion}")
+        logger.debug("Request type - is_completion: %s", is_completion)
         
         # First, try to find any existing record for this activity (regardless of date)
         existing_activity = UserActivity.query.filter(
@@ -700,7 +970,8 @@ def toggle_activity(activity_id):
         ).first()
         
         if existing_activity:
-            print(f"[DEBUG] Found existing activity record - current state: completed={existing_activity.completed}, is_active={existing_activity.is_active}")
+            logger.debug("Found existing activity record - current state: completed=%s, is_active=%s",
+                         existing_activity.completed, existing_activity.is_active)
             
             # Update the existing record
             if is_completion:
@@ -708,17 +979,18 @@ def toggle_activity(activity_id):
                 if not existing_activity.is_completed_today:
                     existing_activity.completed = True
                     existing_activity.is_completed_today = True
+                    existing_activity.date = today  # Completion belongs to today for the daily rollover
                     # Don't modify is_active when completing
-                    print(f"[DEBUG] Completing activity - preserving is_active={existing_activity.is_active}")
+                    logger.debug("Completing activity - preserving is_active=%s", existing_activity.is_active)
                     message = "Activity marked as complete"
                 else:
                     message = "Activity already completed today - no changes made"
-                    print("[DEBUG] Activity was already completed today - no changes made")
+                    logger.debug("Activity was already completed today - no changes made")
             else:
                 # Just toggle selection state
                 existing_activity.is_active = not existing_activity.is_active
                 message = "Activity selection updated"
-                print(f"[DEBUG] Toggled selection state - new is_active: {existing_activity.is_active}")
+                logger.debug("Toggled selection state - new is_active: %s", existing_activity.is_active)
         else:
             # Create new record if none exists
             new_activity = UserActivity(
@@ -734,23 +1006,18 @@ def toggle_activity(activity_id):
                 is_active=True  # Always set is_active to true for new records
             )
             db.session.add(new_activity)
-            print(f"[DEBUG] Created new activity record - completed: {is_completion}, is_active: true")
+            logger.debug("Created new activity record - completed: %s, is_active: true", is_completion)
             message = "Activity selection created"
         
         # Check if all selected activities have been completed
-        total_selected = UserActivity.query.filter_by(user_id=user_id, is_active=True).count()
-        completed_today = UserActivity.query.filter_by(user_id=user_id, is_completed_today=True, date=today).count()
-
-        print(f"[DEBUG] Completion check - {completed_today}/{total_selected} activities complete")
-
-        if total_selected > 0 and completed_today == total_selected:
-            base_xp = 500
-            user.streak_days = min(user.streak_days + 1, 4) if TEST_MODE else min(user.streak_days + 1, 4)
-            multiplier = max(1, min(user.streak_days, 4))
-            xp_gained = base_xp * multiplier
-            user.current_xp += xp_gained
-            new_level, xp_to_next = get_current_level_and_next_xp(user.current_xp)
-            user.level = new_level
+        summary = get_today_summary(user_id, today)
+        total_selected = summary['selected']
+        completed_today = summary['completed_dated_today']
+
+        logger.debug("Completion check - %s/%s activities complete", completed_today, total_selected)
+
+        xp_gained, multiplier = apply_all_complete_bonus(user, total_selected, completed_today)
+        if xp_gained:
             message = f"🔥 All activities complete! {xp_gained} XP earned with {multiplier}x streak!"
         else:
             message = "✅ Activity marked complete, but full XP/streak requires completing all activities."
@@ -758,10 +1025,7 @@ def toggle_activity(activity_id):
         db.session.commit()
         
         # Get count of completed activities today
-        completed_today = UserActivity.query.filter(
-            UserActivity.user_id == user_id,
-            UserActivity.is_completed_today == True
-        ).count()
+        completed_today = summary['completed_today']
         
         # Return appropriate response based on operation type
         if is_completion:
@@ -783,7 +1047,183 @@ def toggle_activity(activity_id):
         
     except Exception as e:
         db.session.rollback()
-        print(f"[ERROR] Error in toggle_activity: {str(e)}")
+        logger.exception("Error in toggle_activity")
+        return jsonify({'error': str(e)}), 500
+
+@tracking_bp.route('/activities/batch', methods=['POST'])
+@jwt_required()
+def batch_update_activities():
+    """
+    Apply select/deselect/complete actions to several activities in one transaction.
+    Expects {"items": [{"activity_id": "...", "action": "select|deselect|complete"}, ...]}
+    and runs a constant number of statements regardless of the batch size.
+    """
+    user_id = get_jwt_identity()
+    user = User.query.get_or_404(user_id)
+
+    data = request.get_json(silent=True) or {}
+    items = data.get('items')
+
+    # Validate the data structure
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'items must be a non-empty list'}), 400
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'A batch may contain at most {MAX_BATCH_SIZE} items'}), 400
+    for item in items:
+        activity_id = item.get('activity_id') if isinstance(item, dict) else None
+        if activity_id is not None and (isinstance(activity_id, bool) or not isinstance(activity_id, (str, int))):
+            return jsonify({'error': 'activity_id must be a string or an integer'}), 400
+
+    try:
+        today = datetime.now(timezone.utc).date()
+        activity_ids = {item.get('activity_id') for item in items if isinstance(item, dict)}
+        activity_ids.discard(None)
+
+        # Load the referenced activities and the user's existing rows in one query each
+        activities = {
+            a.id: a for a in Activity.query.filter(Activity.id.in_(activity_ids)).all()
+        }
+        existing = {
+            row.activity_id: {
+                'is_active': row.is_active,
+                'is_completed_today': row.is_completed_today
+            }
+            for row in db.session.query(
+                UserActivity.activity_id,
+                UserActivity.is_active,
+                UserActivity.is_completed_today
+            ).filter(
+                UserActivity.user_id == user_id,
+                UserActivity.activity_id.in_(activity_ids)
+            )
+        }
+
+        # Apply the actions in order against an in-memory copy of the state
+        state = {activity_id: dict(row) for activity_id, row in existing.items()}
+        newly_completed = set()
+        results = []
+
+        for item in items:
+            if not isinstance(item, dict):
+                results.append({'activity_id': None, 'status': 'error', 'message': 'Invalid item'})
+                continue
+
+            activity_id = item.get('activity_id')
+            action = item.get('action')
+
+            if action not in BATCH_ACTIONS:
+                results.append({
+                    'activity_id': activity_id,
+                    'action': action,
+                    'status': 'error',
+                    'message': f'Action must be one of: {", ".join(BATCH_ACTIONS)}'
+                })
+                continue
+            if activity_id not in activities:
+                results.append({
+                    'activity_id': activity_id,
+                    'action': action,
+                    'status': 'error',
+                    'message': 'Activity not found'
+                })
+                continue
+
+            current = state.get(activity_id)
+            if action == 'select':
+                if current is None:
+                    current = state[activity_id] = {'is_active': True, 'is_completed_today': False}
+                current['is_active'] = True
+                message = 'Activity selected'
+            elif action == 'deselect':
+                if current is not None:
+                    current['is_active'] = False
+                message = 'Activity deselected'
+            elif current is None:
+                # Completing an activity that was never selected selects it as well
+                current = state[activity_id] = {'is_active': True, 'is_completed_today': True}
+                newly_completed.add(activity_id)
+                message = 'Activity marked as complete'
+            elif not current['is_completed_today']:
+                current['is_completed_today'] = True
+                newly_completed.add(activity_id)
+                message = 'Activity marked as complete'
+            else:
+                message = 'Activity already completed today - no changes made'
+
+            results.append({
+                'activity_id': activity_id,
+                'action': action,
+                'status': 'ok',
+                'message': message,
+                'is_active': current['is_active'] if current else False,
+                'completed_today': current['is_completed_today'] if current else False
+            })
+
+        # Group changed rows by their final values so each group is one UPDATE
+        update_groups = {}
+        for activity_id, original in existing.items():
+            final = state[activity_id]
+            completed_now = activity_id in newly_completed
+            if final['is_active'] == original['is_active'] and not completed_now:
+                continue
+            update_groups.setdefault((final['is_active'], completed_now), []).append(activity_id)
+
+        for (is_active, completed_now), group_ids in update_groups.items():
+            values = {'is_active': is_active}
+            if completed_now:
+                values.update({'completed': True, 'is_completed_today': True, 'date': today})
+            db.session.execute(
+                update(UserActivity)
+                .where(UserActivity.user_id == user_id, UserActivity.activity_id.in_(group_ids))
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+
+        # Insert rows for activities the user has never touched in one multi-row insert
+        new_rows = [{
+            'id': str(uuid.uuid4()),
+            'user_id': user_id,
+            'activity_id': activity_id,
+            'activity_name': activities[activity_id].name,
+            'category': activities[activity_id].category,
+            'type': activities[activity_id].type,
+            'date': today,
+            'is_active': final['is_active'],
+            'completed': final['is_completed_today'],
+            'is_completed_today': final['is_completed_today']
+        } for activity_id, final in state.items() if activity_id not in existing]
+        if new_rows:
+            db.session.execute(insert(UserActivity), new_rows)
+
+        # Evaluate the all-activities-complete bonus once for the whole batch
+        summary = get_today_summary(user_id, today)
+        completed_today_count = summary['completed_today']
+
+        xp_gained, multiplier = apply_all_complete_bonus(
+            user, summary['selected'], summary['completed_dated_today']
+        )
+        if xp_gained:
+            message = f"🔥 All activities complete! {xp_gained} XP earned with {multiplier}x streak!"
+        else:
+            message = "✅ Activities updated, but full XP/streak requires completing all activities."
+
+        db.session.commit()
+
+        return jsonify({
+            'message': message,
+            'results': results,
+            'xp': user.current_xp,
+            'level': user.level,
+            'streak': user.streak_days,
+            'totalXpGained': xp_gained,
+            'multiplier': multiplier,
+            'completed_today_count': completed_today_count,
+            'can_submit_daily': completed_today_count >= 3
+        })
+
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("Error in batch_update_activities")
         return jsonify({'error': str(e)}), 500
 
 @tracking_bp.route('/custom-activities', methods=['GET'])
@@ -842,9 +1282,9 @@ def create_custom_activity():
             'is_custom': True
         }), 201
         
-    except Exception as e:
+    except Exception:
         db.session.rollback()
-        print(f"Error creating custom activity: {str(e)}")
+        logger.exception("Error creating custom activity")
         return jsonify({'error': 'Failed to create custom activity'}), 500
 
 @tracking_bp.route('/custom-activities/<activity_id>', methods=['DELETE'])
@@ -869,9 +1309,9 @@ def delete_custom_activity(activity_id):
         
         return jsonify({'message': 'Custom activity deleted successfully'})
         
-    except Exception as e:
+    except Exception:
         db.session.rollback()
-        print(f"Error deleting custom activity: {str(e)}")
+        logger.exception("Error deleting custom activity")
         return jsonify({'error': 'Failed to delete custom activity'}), 500
 
 @tracking_bp.route('/user-stats', methods=['GET'])
@@ -887,32 +1327,20 @@ def get_user_stats():
         # Get today's date
         today = datetime.now(timezone.utc).date()
         
+        # Get selected (bookmarked) and completed counts in one query
+        summary = get_today_summary(user_id, today)
+        completed_today = summary['completed_today']
+        selected_activities = summary['selected']
+        
         # In testing mode, we don't need to check yesterday's completion
         if not TEST_MODE:
-            yesterday = today - timedelta(days=1)
-            yesterday_completed = UserActivity.query.filter(
-                UserActivity.user_id == user_id,
-                UserActivity.date == yesterday,
-                UserActivity.is_completed_today == True
-            ).count() > 0
-            print(f"[DEBUG] Yesterday completed: {yesterday_completed}")
-        
-        # Get today's completed activities count
-        completed_today = UserActivity.query.filter(
-            UserActivity.user_id == user_id,
-            UserActivity.is_completed_today == True
-        ).count()
-        
-        # Get total selected (bookmarked) activities
-        selected_activities = UserActivity.query.filter(
-            UserActivity.user_id == user_id,
-            UserActivity.is_active == True
-        ).count()
+            yesterday_completed = summary['completed_yesterday'] > 0
+            logger.debug("Yesterday completed: %s", yesterday_completed)
         
         # Calculate current multiplier based on streak
         current_multiplier = max(1, min(user.streak_days, 4))
         
-        print(f"[DEBUG] User stats - Level: {current_level}, XP: {user.current_xp}, Streak: {user.streak_days}")
+        logger.debug("User stats - Level: %s, XP: %s, Streak: %s", current_level, user.current_xp, user.streak_days)
         
         return jsonify({
             'level': current_level,
@@ -923,13 +1351,13 @@ def get_user_stats():
             'completed_today': completed_today,
             'total_activities': selected_activities
         })
-    except Exception as e:
-        print(f"Error in get_user_stats: {str(e)}")
+    except Exception:
+        logger.exception("Error in get_user_stats")
         return jsonify({
             'error': 'Failed to fetch user stats',
             'level': 1,
             'current_xp': 0,
-            'xp_to_next_level': 300,  # Starting XP requirement
+            'xp_to_next_level': xp_required_for_level(2),  # Starting XP requirement
             'streak_days': 0,
             'multiplier': 1,
             'completed_today': 0,
@@ -940,28 +1368,25 @@ def get_user_stats():
 @jwt_required()
 def reset_user_progress():
     user_id = get_jwt_identity()
-    user = User.query.get_or_404(user_id)
+    User.query.get_or_404(user_id)
+    chunk_size = current_app.config.get('RESET_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
 
     try:
-        # Reset user stats
-        user.current_xp = 0
-        user.level = 1
-        user.streak_days = 0
-
-        # Reset all user activity records
-        user_activities = UserActivity.query.filter_by(user_id=user_id).all()
-        for ua in user_activities:
-            ua.completed = False
-            ua.is_completed_today = False
-            ua.is_active = False
-            ua.date = datetime.now(timezone.utc).date()
+        # Large users can run the reset off the request thread
+        if request.args.get('background', 'false').lower() == 'true':
+            job = submit_job('reset_user', user_id, reset_user_data, user_id, chunk_size=chunk_size)
+            return jsonify({
+                'message': 'User progress reset started',
+                'job_id': job.id,
+                'status': job.status
+            }), 202
 
-        db.session.commit()
-        print(f"[DEBUG] User {user_id} progress reset successfully")
+        summary = reset_user_data(user_id, chunk_size=chunk_size)
+        logger.info("User %s progress reset successfully (%s activities)", user_id, summary['activities_reset'])
         return jsonify({'message': 'User progress reset successfully'})
-    except Exception as e:
+    except Exception:
         db.session.rollback()
-        print(f"[ERROR] Failed to reset user progress: {str(e)}")
+        logger.exception("Failed to reset user progress")
         return jsonify({'error': 'Failed to reset user progress'}), 500
 
 @tracking_bp.route('/submit-daily', methods=['POST'])
@@ -969,35 +1394,25 @@ def reset_user_progress():
 def submit_daily():
     user_id = get_jwt_identity()
     user = User.query.get_or_404(user_id)
+    summary = None
     
     try:
-        print(f"[DEBUG] Daily submission request for user {user_id}")
+        logger.debug("Daily submission request for user %s", user_id)
         
         # Get today's date
         today = datetime.now(timezone.utc).date()
         
-        # Check if user has already submitted today
-        today_submission = UserActivity.query.filter(
-            UserActivity.user_id == user_id,
-            UserActivity.date == today,
-            UserActivity.is_completed_today == True
-        ).first()
+        # Get submission state and count of completed activities in one query
+        summary = get_today_summary(user_id, today)
+        completed_today = summary['completed_today']
         
-        if today_submission:
+        # Check if user has already submitted today; completing activities alone does not count
+        if user.last_daily_submission == today:
             return jsonify({
                 'error': 'You have already submitted your activities for today',
-                'completed_today_count': UserActivity.query.filter(
-                    UserActivity.user_id == user_id,
-                    UserActivity.is_completed_today == True
-                ).count()
+                'completed_today_count': completed_today
             }), 400
         
-        # Get count of completed activities today
-        completed_today = UserActivity.query.filter(
-            UserActivity.user_id == user_id,
-            UserActivity.is_completed_today == True
-        ).count()
-        
         if completed_today < 3:
             return jsonify({
                 'error': f'You need to complete at least 3 activities before submitting. Currently completed: {completed_today}',
@@ -1022,6 +1437,7 @@ def submit_daily():
         user.streak_days = min(current_streak + 1, 4)  # Cap streak at 4 days
         new_level, xp_to_next = get_current_level_and_next_xp(user.current_xp)
         user.level = new_level
+        user.last_daily_submission = today
         
         # Mark all completed activities as submitted
         UserActivity.query.filter(
@@ -1034,8 +1450,9 @@ def submit_daily():
         # Commit all changes to the database
         db.session.commit()
         
-        print(f"[DEBUG] XP CALCULATION — Level: {current_level}, Streak: {current_streak}, Completed: {completed_today}, Multiplier: {streak_multiplier}, Total XP Gained: {total_xp_gained}")
-        print(f"[DEBUG] Final user state - Level: {user.level}, XP: {user.current_xp}, Streak: {user.streak_days}")
+        logger.debug("XP calculation - Level: %s, Streak: %s, Completed: %s, Multiplier: %s, Total XP Gained: %s",
+                     current_level, current_streak, completed_today, streak_multiplier, total_xp_gained)
+        logger.debug("Final user state - Level: %s, XP: %s, Streak: %s", user.level, user.current_xp, user.streak_days)
         
         # Safe response return with all necessary values and proper defaults
         return jsonify({
@@ -1052,7 +1469,7 @@ def submit_daily():
         
     except Exception as e:
         db.session.rollback()
-        print(f"[ERROR] Error in submit_daily: {str(e)}")
+        logger.exception("Error in submit_daily")
         # Error-safe response with defensive defaults
         return jsonify({
             'error': str(e),
@@ -1060,8 +1477,5 @@ def submit_daily():
             'level': getattr(user, 'level', 1) or 1,
             'streak': getattr(user, 'streak_days', 0) or 0,
             'totalXpGained': 0,
-            'completed_today_count': UserActivity.query.filter(
-                UserActivity.user_id == user_id,
-                UserActivity.is_completed_today == True
-            ).count() or 0
+            'completed_today_count': summary['completed_today'] if summary else 0
         }), 500
\ No newline at end of file
@@ -1,9 +1,15 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models import User
+from app.models import User, BackgroundJob
 from app.extensions import db
+from app.jobs import job_to_dict
+from app.export import export_records, iter_ndjson
+from app.versioning import bump_data_version
+from datetime import datetime, timezone
+import logging
 
 user_bp = Blueprint('user', __name__)
+logger = logging.getLogger(__name__)
 
 @user_bp.route('/profile', methods=['GET'])
 @jwt_required()
@@ -30,8 +36,8 @@ def get_profile():
             'created_at': user.created_at.isoformat() if user.created_at else None
         }), 200
         
-    except Exception as e:
-        print(f"Error getting user profile: {str(e)}")
+    except Exception:
+        logger.exception("Error getting user profile")
         return jsonify({'error': 'Failed to get user profile'}), 500
 
 @user_bp.route('/profile', methods=['PUT', 'PATCH'])
@@ -61,6 +67,8 @@ def update_profile():
                 return jsonify({'error': 'Email already taken'}), 400
             user.email = data['email']
             
+        # The tracking dashboard embeds the profile, so its ETag must change too
+        bump_data_version(user_id)
         db.session.commit()
         
         return jsonify({
@@ -77,7 +85,29 @@ def update_profile():
             }
         }), 200
         
-    except Exception as e:
-        print(f"Error updating user profile: {str(e)}")
+    except Exception:
+        logger.exception("Error updating user profile")
         db.session.rollback()
-        return jsonify({'error': 'Failed to update profile'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Failed to update profile'}), 500
+
+@user_bp.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    user_id = get_jwt_identity()
+    job = BackgroundJob.query.filter_by(id=job_id, user_id=user_id).first_or_404()
+    return jsonify(job_to_dict(job)), 200
+
+@user_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_user_data():
+    user_id = get_jwt_identity()
+    compress = request.args.get('compress') == 'gzip'
+    
+    # Rows are read and written while the response streams
+    body = stream_with_context(iter_ndjson(export_records(user_id), compress=compress))
+    response = Response(body, mimetype='application/x-ndjson')
+    filename = f"live-focus-grow-export-{datetime.now(timezone.utc).date().isoformat()}.ndjson"
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    if compress:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
@@ -0,0 +1,176 @@
+"""Full-text search over journal entries.
+
+The index itself is created next to the journals table (see
+JOURNAL_SEARCH_DDL in app/models/tracking.py) and kept in sync by database
+triggers. Results are ranked best first (bm25 on SQLite, ts_rank_cd on
+PostgreSQL), carry highlighted snippets, and page with the same opaque
+cursors as the list endpoints, keyed on (score, id).
+"""
+import html
+import re
+import click
+from flask.cli import AppGroup
+from sqlalchemy import text
+from app.extensions import db
+from app.models.tracking import Journal, JOURNAL_SEARCH_DDL
+from app.pagination import encode_cursor, decode_cursor
+
+# Markers the database wraps around matches; replaced by <mark> after escaping
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+SNIPPET_TOKENS = 16
+DEFAULT_BATCH_SIZE = 1000
+
+search_cli = AppGroup('search', help='Journal full-text search index.')
+
+SQLITE_SEARCH = """
+SELECT * FROM (
+    SELECT journals.id, journals.title, journals.mood, journals.created_at,
+           -bm25(journals_fts, 10.0, 1.0) AS score,
+           highlight(journals_fts, 0, :start, :end) AS title_highlight,
+           snippet(journals_fts, 1, :start, :end, '...', :tokens) AS snippet
+    FROM journals_fts
+    JOIN journals_fts_keys AS search_keys ON search_keys.id = journals_fts.rowid
+    JOIN journals ON journals.id = search_keys.journal_id
+    WHERE journals_fts MATCH :query AND journals.user_id = :user_id
+) AS results
+{seek}
+ORDER BY score DESC, id
+LIMIT :limit
+"""
+
+POSTGRESQL_SEARCH = """
+SELECT page.id, page.title, page.mood, page.created_at, page.score,
+       ts_headline('english', coalesce(page.title, ''), page.query, :title_options) AS title_highlight,
+       ts_headline('english', page.content, page.query, :snippet_options) AS snippet
+FROM (
+    SELECT * FROM (
+        SELECT journals.id, journals.title, journals.mood, journals.created_at, journals.content, query,
+               ts_rank_cd(journals.search_vector, query) AS score
+        FROM journals, websearch_to_tsquery('english', :query) AS query
+        WHERE journals.user_id = :user_id AND journals.search_vector @@ query
+    ) AS results
+    {seek}
+    ORDER BY score DESC, id
+    LIMIT :limit
+) AS page
+ORDER BY page.score DESC, page.id
+"""
+
+# Re-key and re-index every journal in one pass
+SQLITE_REBUILD = [
+    "DELETE FROM journals_fts",
+    "DELETE FROM journals_fts_keys WHERE journal_id NOT IN (SELECT id FROM journals)",
+    "INSERT OR IGNORE INTO journals_fts_keys(journal_id) SELECT id FROM journals",
+    """INSERT INTO journals_fts(rowid, title, content)
+       SELECT journals_fts_keys.id, journals.title, journals.content
+       FROM journals JOIN journals_fts_keys ON journals_fts_keys.journal_id = journals.id"""
+]
+
+def _fts5_query(q):
+    """Quote every word so user input cannot use FTS5 syntax; the last word matches as a prefix."""
+    terms = re.findall(r'\w+', q)
+    if not terms:
+        return None
+    return ' '.join([f'"{term}"' for term in terms[:-1]] + [f'"{terms[-1]}"*'])
+
+def _highlight(value):
+    """Escape a snippet and turn the database's markers into <mark> tags."""
+    if value is None:
+        return None
+    return html.escape(value).replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_END, '</mark>')
+
+def search_journals(user_id, q, cursor=None, limit=10):
+    """
+    Search the user's journals for q, best match first.
+    Returns (items, next_cursor), or (None, None) when q holds no searchable words.
+    """
+    dialect_name = db.session.get_bind().dialect.name
+    params = {'user_id': user_id, 'limit': limit + 1}
+
+    if dialect_name == 'postgresql':
+        if not re.search(r'\w', q):
+            return None, None
+        sql = POSTGRESQL_SEARCH
+        params.update({
+            'query': q,
+            'title_options': f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, HighlightAll=true',
+            'snippet_options': f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, '
+                               f'MaxWords={SNIPPET_TOKENS}, MinWords=5'
+        })
+    else:
+        query = _fts5_query(q)
+        if query is None:
+            return None, None
+        sql = SQLITE_SEARCH
+        params.update({
+            'query': query, 'start': HIGHLIGHT_START, 'end': HIGHLIGHT_END, 'tokens': SNIPPET_TOKENS
+        })
+
+    seek = ''
+    if cursor:
+        params['score'], params['last_id'] = decode_cursor(cursor, 'score', 'desc', float)
+        seek = 'WHERE score < :score OR (score = :score AND id > :last_id)'
+
+    # Typed like the ORM column, so SQLite's stored strings come back as datetimes
+    statement = text(sql.format(seek=seek)).columns(created_at=Journal.created_at.type)
+    rows = db.session.execute(statement, params).mappings().all()
+    items = [{
+        'id': row['id'],
+        'title': row['title'],
+        'mood': row['mood'],
+        'created_at': row['created_at'].isoformat() if row['created_at'] else None,
+        'score': row['score'],
+        'title_highlight': _highlight(row['title_highlight']) if row['title'] else None,
+        'snippet': _highlight(row['snippet'])
+    } for row in rows[:limit]]
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor('score', 'desc', last['score'], last['id'])
+    return items, next_cursor
+
+def rebuild_search_index(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Create the index if it is missing and fill it from the existing journals.
+    Returns the number of journals indexed.
+    """
+    dialect_name = db.session.get_bind().dialect.name
+    for statement in JOURNAL_SEARCH_DDL.get(dialect_name, []):
+        db.session.execute(text(statement))
+    db.session.commit()
+
+    if dialect_name == 'sqlite':
+        for statement in SQLITE_REBUILD:
+            db.session.execute(text(statement))
+        db.session.commit()
+        return db.session.execute(text('SELECT count(*) FROM journals')).scalar()
+
+    # PostgreSQL: recompute the vectors in primary-key batches, one transaction each
+    indexed = 0
+    last_id = ''
+    while True:
+        ids = db.session.execute(
+            text('SELECT id FROM journals WHERE id > :last_id ORDER BY id LIMIT :batch_size'),
+            {'last_id': last_id, 'batch_size': batch_size}
+        ).scalars().all()
+        if not ids:
+            return indexed
+        db.session.execute(text("""
+            UPDATE journals SET search_vector =
+                setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(content, '')), 'B')
+            WHERE id >= :first_id AND id <= :last_id
+        """), {'first_id': ids[0], 'last_id': ids[-1]})
+        db.session.commit()
+        indexed += len(ids)
+        last_id = ids[-1]
+
+@search_cli.command('rebuild')
+@click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True, type=int,
+              help='Journals updated per transaction (PostgreSQL only).')
+def rebuild_search_index_command(batch_size):
+    """Create the journal search index and backfill it from existing entries."""
+    indexed = rebuild_search_index(batch_size=batch_size)
+    click.echo(f"Indexed {indexed} journals")
@@ -0,0 +1,268 @@
+"""Content-addressed storage for uploaded progress photos.
+
+Blobs are stored under the SHA-256 of their bytes, so identical uploads are
+kept once and a stored blob never changes; the digest doubles as a strong
+ETag. Files are never deleted on the request path, where they could race an
+identical upload; `flask photos sweep` removes the ones no photo refers to.
+The backend is picked with PHOTO_STORAGE, an import path to a
+PhotoStorage subclass, so an S3-compatible stand-in can replace the local
+directory without touching the routes.
+
+Uploads are read from the request stream with werkzeug's sans-IO multipart
+decoder and hashed and written chunk by chunk, never held in memory or
+spooled to a second temporary copy.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from collections import namedtuple
+from flask import current_app, send_file
+from werkzeug.sansio.multipart import MultipartDecoder, NeedData, Preamble, Field, File, Data, Epilogue
+from werkzeug.utils import import_string
+
+CHUNK_SIZE = 64 * 1024
+MAX_FIELD_SIZE = 64 * 1024
+DEFAULT_STORAGE = 'app.storage.LocalPhotoStorage'
+
+StoredBlob = namedtuple('StoredBlob', ['digest', 'size', 'created'])
+Upload = namedtuple('Upload', ['blob', 'content_type', 'filename'])
+
+class BlobTooLarge(ValueError):
+    """Raised when an upload is larger than the configured limit."""
+
+class PhotoStorage:
+    """Interface of a photo storage backend; blobs are addressed by their SHA-256 hex digest."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def save(self, chunks, max_size=None):
+        """
+        Store the bytes of chunks. Returns a StoredBlob; created is False for a
+        duplicate, whose modified time is refreshed so a sweep leaves it alone.
+        """
+        raise NotImplementedError
+
+    def exists(self, digest):
+        raise NotImplementedError
+
+    def open(self, digest):
+        """Binary file object for reading a blob."""
+        raise NotImplementedError
+
+    def delete(self, digest):
+        raise NotImplementedError
+
+    def iter_blobs(self):
+        """Yield (digest, modified) for every stored blob, modified as a POSIX timestamp."""
+        raise NotImplementedError
+
+    def delete_unless_modified(self, digest, since):
+        """
+        Delete a blob and its variants unless it was modified after since.
+        Safe against a concurrent save of the same bytes. Returns whether it was deleted.
+        """
+        raise NotImplementedError
+
+    def send(self, digest, mimetype):
+        """Response serving a blob; send_file answers Range and If-None-Match requests."""
+        return send_file(self.open(digest), mimetype=mimetype, conditional=True, etag=digest)
+
+    # Derived files (e.g. resized photos) stored by name under a blob's digest
+
+    def save_variant(self, digest, name, data):
+        raise NotImplementedError
+
+    def variant_exists(self, digest, name):
+        raise NotImplementedError
+
+    def open_variant(self, digest, name):
+        raise NotImplementedError
+
+    def delete_variants(self, digest):
+        """Delete every variant of a blob."""
+        raise NotImplementedError
+
+    def send_variant(self, digest, name, mimetype):
+        return send_file(self.open_variant(digest, name), mimetype=mimetype, conditional=True,
+                         etag=f'{digest}.{name}')
+
+class LocalPhotoStorage(PhotoStorage):
+    """Blobs in a directory tree on local disk, fanned out by the first bytes of the digest."""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.root = app.config.get('PHOTO_STORAGE_ROOT') or os.path.join(app.instance_path, 'photos')
+        self.temp_dir = os.path.join(self.root, 'tmp')
+
+    def path(self, digest):
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def save(self, chunks, max_size=None):
+        os.makedirs(self.temp_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.temp_dir)
+        try:
+            sha256 = hashlib.sha256()
+            size = 0
+            with os.fdopen(fd, 'wb') as temp_file:
+                for chunk in chunks:
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise BlobTooLarge(f'Photo must be at most {max_size} bytes')
+                    sha256.update(chunk)
+                    temp_file.write(chunk)
+
+            digest = sha256.hexdigest()
+            path = self.path(digest)
+            try:
+                # Fails once a sweep has moved the blob away, and then it is written again
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+            else:
+                os.unlink(temp_path)
+                return StoredBlob(digest, size, False)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Atomic, so readers never see a partial blob; a concurrent identical upload just wins
+            os.replace(temp_path, path)
+            return StoredBlob(digest, size, True)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def exists(self, digest):
+        return os.path.exists(self.path(digest))
+
+    def open(self, digest):
+        return open(self.path(digest), 'rb')
+
+    def delete(self, digest):
+        try:
+            os.unlink(self.path(digest))
+        except FileNotFoundError:
+            pass
+
+    def iter_blobs(self):
+        for directory, subdirectories, names in os.walk(self.root):
+            if directory == self.root:
+                # Blobs live two fan-out levels down; skip temporary files and variants
+                subdirectories[:] = [name for name in subdirectories if name not in ('tmp', 'variants')]
+                continue
+            for name in names:
+                try:
+                    yield name, os.stat(os.path.join(directory, name)).st_mtime
+                except FileNotFoundError:
+                    pass
+
+    def delete_unless_modified(self, digest, since):
+        path = self.path(digest)
+        os.makedirs(self.temp_dir, exist_ok=True)
+        trash = os.path.join(self.temp_dir, f'{digest}.deleted')
+        try:
+            # Atomic: from here on a save of the same bytes writes a new copy instead of reusing this one
+            os.replace(path, trash)
+        except FileNotFoundError:
+            return False
+        if os.stat(trash).st_mtime > since:
+            # A save reused the blob before it was moved; put it back (a new copy is identical)
+            os.replace(trash, path)
+            return False
+        os.unlink(trash)
+        if not os.path.exists(path):
+            self.delete_variants(digest)
+        return True
+
+    def send(self, digest, mimetype):
+        # A path lets the server use wsgi.file_wrapper (sendfile) or X-Sendfile with USE_X_SENDFILE
+        return send_file(self.path(digest), mimetype=mimetype, conditional=True, etag=digest)
+
+    def variant_dir(self, digest):
+        return os.path.join(self.root, 'variants', digest[:2], digest[2:4], digest)
+
+    def save_variant(self, digest, name, data):
+        directory = self.variant_dir(digest)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.')
+        with os.fdopen(fd, 'wb') as temp_file:
+            temp_file.write(data)
+        os.replace(temp_path, os.path.join(directory, name))
+
+    def variant_exists(self, digest, name):
+        return os.path.exists(os.path.join(self.variant_dir(digest), name))
+
+    def open_variant(self, digest, name):
+        return open(os.path.join(self.variant_dir(digest), name), 'rb')
+
+    def delete_variants(self, digest):
+        shutil.rmtree(self.variant_dir(digest), ignore_errors=True)
+
+    def send_variant(self, digest, name, mimetype):
+        return send_file(os.path.join(self.variant_dir(digest), name), mimetype=mimetype,
+                         conditional=True, etag=f'{digest}.{name}')
+
+def get_photo_storage(app=None):
+    """The app's photo storage backend, created from PHOTO_STORAGE on first use."""
+    app = app or current_app._get_current_object()
+    storage = app.extensions.get('photo_storage')
+    if storage is None:
+        backend = import_string(app.config.get('PHOTO_STORAGE') or DEFAULT_STORAGE)
+        storage = app.extensions.setdefault('photo_storage', backend(app))
+    return storage
+
+def iter_stream(stream, chunk_size=CHUNK_SIZE):
+    """Yield a binary stream in chunks."""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+def _multipart_events(stream, boundary):
+    # The decoder only buffers the unparsed tail of the last read, so this bounds memory per request
+    decoder = MultipartDecoder(boundary, max_form_memory_size=2 * CHUNK_SIZE)
+    while True:
+        event = decoder.next_event()
+        if isinstance(event, NeedData):
+            decoder.receive_data(stream.read(CHUNK_SIZE) or None)
+        elif isinstance(event, Epilogue):
+            return
+        elif not isinstance(event, Preamble):
+            yield event
+
+def _part_data(events):
+    # Data events of the current part, up to its last one
+    for event in events:
+        if not isinstance(event, Data):
+            raise ValueError('Malformed multipart body')
+        yield event.data
+        if not event.more_data:
+            return
+
+def save_multipart_upload(storage, stream, boundary, file_field='file', max_size=None):
+    """
+    Parse a multipart/form-data body, saving the file_field part to storage as it arrives.
+    Returns (fields, upload); upload is None when the body has no such file part.
+    Raises ValueError for a malformed body and BlobTooLarge past max_size.
+    """
+    events = _multipart_events(stream, boundary)
+    fields = {}
+    upload = None
+    for event in events:
+        if isinstance(event, File) and event.name == file_field and upload is None:
+            blob = storage.save(_part_data(events), max_size=max_size)
+            upload = Upload(blob, event.headers.get('Content-Type'), event.filename)
+        elif isinstance(event, Field):
+            value = b''
+            for data in _part_data(events):
+                value += data
+                if len(value) > MAX_FIELD_SIZE:
+                    raise ValueError(f'Field {event.name} is too large')
+            fields[event.name] = value.decode('utf-8')
+        elif isinstance(event, File):
+            for _ in _part_data(events):
+                pass  # Other files are skipped, not stored
+        else:
+            raise ValueError('Malformed multipart body')
+    return fields, upload
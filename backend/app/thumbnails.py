@@ -0,0 +1,171 @@
+"""Resized variants of uploaded progress photos.
+
+Each stored photo gets a few fixed-width JPEG and WebP variants. Resizing
+is CPU-bound, so it runs in a process pool, and the upload route hands it
+to a background job instead of waiting for it. Variants are stored next to
+the original under its content hash, so identical uploads share them and a
+variant never goes stale. Downloads fall back to the original until the
+variants exist; `flask photos variants` renders any that are missing.
+`flask photos sweep` deletes stored files, with their variants, that no
+photo refers to any more.
+"""
+import io
+import logging
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from PIL import Image, ImageOps
+from app.extensions import db
+from app.models import ProgressPhoto
+from app.storage import get_photo_storage
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = (320, 640, 1280)
+VARIANT_FORMATS = {'jpg': ('JPEG', 'image/jpeg'), 'webp': ('WEBP', 'image/webp')}
+VARIANT_NAMES = [f'w{width}.{extension}' for width in VARIANT_WIDTHS for extension in VARIANT_FORMATS]
+VARIANT_QUALITY = 82
+# Files touched more recently may belong to an upload that has not committed its photo yet
+SWEEP_GRACE_SECONDS = 60 * 60
+SWEEP_BATCH_SIZE = 500
+
+photos_cli = AppGroup('photos', help='Progress photo storage.')
+
+_pool = None
+
+def variant_mimetype(name):
+    return VARIANT_FORMATS[name.rsplit('.', 1)[1]][1]
+
+def variant_urls(photo_url, content_hash):
+    """Variant name -> URL for an uploaded photo; empty for photos hosted elsewhere."""
+    if not content_hash:
+        return {}
+    return {name: f'{photo_url}?variant={name}' for name in VARIANT_NAMES}
+
+def render_variants(data):
+    """
+    Render every variant of an image. Runs in a worker process, so it only
+    takes and returns bytes. Returns a dict of variant name -> encoded bytes.
+    """
+    with Image.open(io.BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original).convert('RGB')
+    variants = {}
+    for width in VARIANT_WIDTHS:
+        # Narrow originals are re-encoded at their own size rather than upscaled
+        resized = image
+        if image.width > width:
+            resized = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        for extension, (image_format, _) in VARIANT_FORMATS.items():
+            output = io.BytesIO()
+            resized.save(output, image_format, quality=VARIANT_QUALITY)
+            variants[f'w{width}.{extension}'] = output.getvalue()
+    return variants
+
+def _get_pool(workers):
+    global _pool
+    if _pool is None:
+        # spawn, so workers never inherit the locks of the server's threads
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    return _pool
+
+def _store_variants(storage, digest, variants):
+    for name, data in variants.items():
+        storage.save_variant(digest, name, data)
+
+def generate_variants(digest):
+    """
+    Render and store the variants of one stored photo; the background job behind uploads.
+    Uses the process pool unless THUMBNAIL_WORKERS is 0.
+    """
+    storage = get_photo_storage()
+    with storage.open(digest) as original:
+        data = original.read()
+    workers = current_app.config.get('THUMBNAIL_WORKERS', 2)
+    variants = _get_pool(workers).submit(render_variants, data).result() if workers else render_variants(data)
+    _store_variants(storage, digest, variants)
+    return {'digest': digest, 'variants': sorted(variants)}
+
+def missing_variant_digests(storage):
+    """Content hashes of stored photos that lack at least one variant."""
+    digests = db.session.scalars(
+        db.select(ProgressPhoto.content_hash).where(ProgressPhoto.content_hash.isnot(None)).distinct()
+    )
+    for digest in digests:
+        if not all(storage.variant_exists(digest, name) for name in VARIANT_NAMES):
+            yield digest
+
+def regenerate_missing_variants(workers):
+    """
+    Render missing variants across a pool of worker processes.
+    At most two photos per worker are held in memory at a time.
+    Returns (rendered, failed) counts.
+    """
+    storage = get_photo_storage()
+    rendered = failed = 0
+    pending = deque()
+
+    def collect(digest, future):
+        nonlocal rendered, failed
+        try:
+            _store_variants(storage, digest, future.result())
+            rendered += 1
+        except Exception:
+            logger.exception("Could not render variants of %s", digest)
+            failed += 1
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        for digest in missing_variant_digests(storage):
+            if len(pending) >= 2 * workers:
+                collect(*pending.popleft())
+            with storage.open(digest) as original:
+                pending.append((digest, pool.submit(render_variants, original.read())))
+        while pending:
+            collect(*pending.popleft())
+    return rendered, failed
+
+@photos_cli.command('variants')
+@click.option('--workers', default=None, type=int,
+              help='Worker processes; defaults to one per CPU core.')
+def regenerate_variants_command(workers):
+    """Render the resized variants missing for any stored photo."""
+    workers = workers or multiprocessing.cpu_count()
+    rendered, failed = regenerate_missing_variants(workers)
+    click.echo(f"Rendered variants for {rendered} photos, {failed} failed")
+
+def _sweep_batch(storage, digests, since):
+    referenced = set(db.session.scalars(
+        db.select(ProgressPhoto.content_hash).where(ProgressPhoto.content_hash.in_(digests)).distinct()
+    ))
+    return sum(storage.delete_unless_modified(digest, since) for digest in digests if digest not in referenced)
+
+def sweep_unreferenced_blobs(grace_seconds=SWEEP_GRACE_SECONDS, batch_size=SWEEP_BATCH_SIZE):
+    """
+    Delete stored files that no photo refers to and that were not saved or
+    reused within grace_seconds. Returns the number deleted.
+    """
+    storage = get_photo_storage()
+    since = time.time() - grace_seconds
+    deleted = 0
+    batch = []
+    for digest, modified in storage.iter_blobs():
+        if modified > since:
+            continue
+        batch.append(digest)
+        if len(batch) >= batch_size:
+            deleted += _sweep_batch(storage, batch, since)
+            batch = []
+    if batch:
+        deleted += _sweep_batch(storage, batch, since)
+    return deleted
+
+@photos_cli.command('sweep')
+@click.option('--grace-seconds', default=SWEEP_GRACE_SECONDS, show_default=True, type=int,
+              help='Keep files saved or reused more recently than this.')
+def sweep_command(grace_seconds):
+    """Delete stored photo files that no progress photo refers to."""
+    deleted = sweep_unreferenced_blobs(grace_seconds=grace_seconds)
+    click.echo(f"Deleted {deleted} unreferenced photo files")
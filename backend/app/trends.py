@@ -0,0 +1,174 @@
+"""Weight and mood trend series for the analytics endpoints.
+
+Everything is read from the daily rollups (app/rollups.py), one row per day
+(and mood), so a year of history is at most 365 rows however often the user
+weighs in or writes. Per-bucket statistics are grouped in SQL; rolling averages and
+downsampling run as NumPy array operations over the daily rows. The chart
+series is reduced to at most max_points with largest-triangle-three-buckets
+(LTTB), which keeps the peaks and dips a plain stride would drop.
+"""
+from datetime import datetime, timezone, timedelta
+import numpy as np
+from sqlalchemy import func
+from app.extensions import db
+from app.models import DailyWeightRollup, DailyMoodRollup
+from app.rollups import bucket_of
+
+DEFAULT_MAX_POINTS = 500
+MAX_POINTS = 2000
+BUCKETS = ['day', 'week', 'month']
+ROLLING_WINDOWS = {'rolling_7': 7, 'rolling_30': 30}
+
+def bucket_stats(user_id, start, bucket):
+    """Min, max and mean weight per bucket from start on, oldest first."""
+    dialect_name = db.session.get_bind().dialect.name
+    key = bucket_of(DailyWeightRollup.day, bucket, dialect_name).label('bucket')
+    count = func.sum(DailyWeightRollup.count)
+    rows = db.session.execute(
+        db.select(key, func.min(DailyWeightRollup.min_weight), func.max(DailyWeightRollup.max_weight),
+                  func.sum(DailyWeightRollup.total_weight) / count, count)
+        .where(DailyWeightRollup.user_id == user_id, DailyWeightRollup.day >= start)
+        .group_by(key)
+        .order_by(key)
+    ).all()
+    return [{
+        'start': _bucket_start(value),
+        'min': minimum,
+        'max': maximum,
+        'mean': mean,
+        'count': count
+    } for value, minimum, maximum, mean, count in rows]
+
+def _bucket_start(value):
+    # SQLite hands back the bucket as text, PostgreSQL as a date
+    return value if isinstance(value, str) else value.isoformat()
+
+def rolling_mean(days, totals, counts, window_days):
+    """
+    Mean of the weigh-ins within window_days up to and including each day.
+    days are sorted day numbers; totals and counts are the daily sums and weigh-in counts.
+    """
+    totals = np.concatenate(([0.0], np.cumsum(totals)))
+    counts = np.concatenate(([0], np.cumsum(counts)))
+    first = np.searchsorted(days, days - window_days, side='right')
+    last = np.arange(1, len(days) + 1)
+    return (totals[last] - totals[first]) / (counts[last] - counts[first])
+
+def lttb(x, y, threshold):
+    """
+    Indices of the points kept by largest-triangle-three-buckets downsampling.
+    The first and last points are always kept; returns every index when
+    there are no more than threshold points.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # threshold - 2 buckets over the points between the first and the last
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        next_x, next_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+
+        # Twice the triangle area against the previous pick and the next bucket's average
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+    return selected
+
+def weight_trend(user_id, days, max_points=DEFAULT_MAX_POINTS, bucket=None):
+    """Summary, downsampled daily series and optional bucket statistics for the last days."""
+    start = datetime.now(timezone.utc).date() - timedelta(days=days)
+    # The rolling windows of the first days reach back before the period
+    history_start = start - timedelta(days=max(ROLLING_WINDOWS.values()))
+    rows = db.session.execute(
+        db.select(DailyWeightRollup.day, DailyWeightRollup.total_weight, DailyWeightRollup.count)
+        .where(DailyWeightRollup.user_id == user_id, DailyWeightRollup.day >= history_start)
+        .order_by(DailyWeightRollup.day)
+    ).all()
+
+    dates = [row[0] for row in rows]
+    day_numbers = np.array([day.toordinal() for day in dates], dtype=float)
+    totals = np.array([row[1] for row in rows], dtype=float)
+    counts = np.array([row[2] for row in rows], dtype=np.int64)
+    means = totals / counts if len(rows) else totals
+    rolling = {
+        name: rolling_mean(day_numbers, totals, counts, window) for name, window in ROLLING_WINDOWS.items()
+    }
+
+    # Days inside the requested period
+    offset = int(np.searchsorted(day_numbers, start.toordinal(), side='left'))
+    period_means = means[offset:]
+    result = {
+        'weight_data': [],
+        'start_weight': None,
+        'current_weight': None,
+        'weight_change': 0,
+        'average_weight': 0,
+        'total_points': len(period_means)
+    }
+    if bucket:
+        result['buckets'] = bucket_stats(user_id, start, bucket)
+    if not len(period_means):
+        return result
+
+    kept = offset + lttb(day_numbers[offset:], period_means, max_points)
+    result.update({
+        'weight_data': [{
+            'date': dates[i].isoformat(),
+            'weight': float(means[i]),
+            'count': int(counts[i]),
+            **{name: round(float(values[i]), 2) for name, values in rolling.items()}
+        } for i in kept],
+        'start_weight': float(period_means[0]),
+        'current_weight': float(period_means[-1]),
+        'weight_change': float(period_means[-1] - period_means[0]),
+        'average_weight': float(totals[offset:].sum() / counts[offset:].sum())
+    })
+    return result
+
+def mood_trend(user_id, days, granularity='day'):
+    """Mood distribution and a timeline of mood counts per day, week or month."""
+    start = datetime.now(timezone.utc).date() - timedelta(days=days)
+    period = (DailyMoodRollup.user_id == user_id, DailyMoodRollup.day >= start)
+
+    distribution = dict(db.session.execute(
+        db.select(DailyMoodRollup.mood, func.sum(DailyMoodRollup.count))
+        .where(*period)
+        .group_by(DailyMoodRollup.mood)
+        .order_by(DailyMoodRollup.mood)
+    ).all())
+
+    # Counts per bucket and mood, ranked so the dominant mood of each bucket comes first
+    dialect_name = db.session.get_bind().dialect.name
+    key = bucket_of(DailyMoodRollup.day, granularity, dialect_name).label('bucket')
+    counts = db.select(key, DailyMoodRollup.mood, func.sum(DailyMoodRollup.count).label('count')).where(
+        *period
+    ).group_by(key, DailyMoodRollup.mood).subquery()
+    rank = func.row_number().over(
+        partition_by=counts.c.bucket, order_by=(counts.c.count.desc(), counts.c.mood)
+    ).label('rank')
+    rows = db.session.execute(
+        db.select(counts.c.bucket, counts.c.mood, counts.c.count, rank).order_by(counts.c.bucket, rank)
+    ).all()
+
+    timeline = []
+    for bucket, mood, count, position in rows:
+        if position == 1:
+            timeline.append({'date': _bucket_start(bucket), 'dominant_mood': mood, 'moods': {}, 'total': 0})
+        timeline[-1]['moods'][mood] = count
+        timeline[-1]['total'] += count
+
+    return {
+        'mood_data': timeline,
+        'mood_distribution': distribution,
+        'total_entries': sum(distribution.values()),
+        'granularity': granularity
+    }
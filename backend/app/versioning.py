@@ -0,0 +1,120 @@
+"""Per-user data versions and conditional GETs.
+
+Every user row carries a data_version counter. Commits made by a write
+request in a versioned blueprint bump the writer's counter in the same
+transaction, and so does anything else that rewrites a user's data (reset,
+CLI imports). GET requests in those blueprints get a weak ETag built from
+that counter, the reference data versions, the UTC day (the daily rollover
+changes completion flags without a request) and the request path with its
+query string. A matching If-None-Match is answered with 304 before the view
+runs, after one primary-key read.
+"""
+import hashlib
+from datetime import datetime, timezone
+from flask import current_app, g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt import PyJWTError
+from sqlalchemy import event, func, update
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models import User, ReferenceDataVersion
+from app.reset import register_reset_hook
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Blueprint names whose write requests bump the writer's version
+_versioned_blueprints = set()
+
+def bump_data_version(user_id, session=None):
+    """Mark a user's data as changed in the current transaction."""
+    (session or db.session).execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(data_version=User.data_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+def get_data_version(user_id):
+    """
+    The user's version and the total of the reference data versions, in one
+    statement: a primary-key lookup plus a scan of the few reference rows.
+    """
+    reference = db.select(func.coalesce(func.sum(ReferenceDataVersion.version), 0)).scalar_subquery()
+    row = db.session.execute(
+        db.select(User.data_version, reference).where(User.id == user_id)
+    ).first()
+    return tuple(row) if row is not None else None
+
+def current_data_version(user_id):
+    """The user's version, reusing the one read for this request's ETag when there is one."""
+    known = g.get('data_version')
+    if known is not None and known[0] == user_id:
+        return known[1]
+    return get_data_version(user_id)
+
+def data_etag(user_id, version):
+    """Weak ETag value (unquoted) for the current request at a data version."""
+    today = datetime.now(timezone.utc).date().isoformat()
+    key = f'{user_id}\n{today}\n{request.full_path}'.encode()
+    return f'{version[0]}.{version[1]}-{hashlib.sha256(key).hexdigest()[:16]}'
+
+def _request_user():
+    # Auth failures are left to the view's own jwt_required
+    try:
+        verify_jwt_in_request(optional=True)
+    except (JWTExtendedException, PyJWTError):
+        return None
+    return get_jwt_identity()
+
+def _answer_not_modified():
+    g.data_etag = g.data_version = None
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    user_id = _request_user()
+    if user_id is None:
+        return None
+    version = get_data_version(user_id)
+    if version is None:
+        return None
+
+    g.data_version = (user_id, version)
+    g.data_etag = data_etag(user_id, version)
+    if request.if_none_match.contains_weak(g.data_etag):
+        return current_app.response_class(status=304)
+    return None
+
+def _add_etag(response):
+    etag = g.pop('data_etag', None)
+    g.pop('data_version', None)
+    # Views that set their own ETag (e.g. photo files) keep it
+    if etag and response.status_code in (200, 304) and 'ETag' not in response.headers:
+        response.set_etag(etag, weak=True)
+        # Per-user data: browsers may keep it but must revalidate, shared caches must not
+        response.headers['Cache-Control'] = 'private, no-cache'
+        response.vary.add('Authorization')
+    return response
+
+def register_data_versioning(blueprint):
+    """Bump the writer's version on writes and answer conditional GETs for a blueprint."""
+    _versioned_blueprints.add(blueprint.name)
+    blueprint.before_request(_answer_not_modified)
+    blueprint.after_request(_add_etag)
+
+@event.listens_for(Session, 'before_commit')
+def _bump_on_write(session):
+    if not has_request_context() or request.method in SAFE_METHODS:
+        return
+    if request.blueprint not in _versioned_blueprints:
+        return
+    try:
+        user_id = get_jwt_identity()
+    except RuntimeError:
+        return  # Not an authenticated request
+    if user_id is not None:
+        bump_data_version(user_id, session)
+
+@register_reset_hook
+def _bump_on_reset(user_id):
+    # The reset runs as a background job, after the request's own commit
+    bump_data_version(user_id)
@@ -0,0 +1,256 @@
+"""Bulk import of weight logs.
+
+CSV, NDJSON and Apple Health export.xml files are parsed as streams, one row
+at a time (the XML with iterparse, clearing each element once read), so a
+multi-year history never has to fit in memory. Rows are validated with the
+same rules as POST /weight-logs, dates already logged for the user are
+skipped, and the rest is inserted in executemany batches with one commit
+per batch. A file that stops parsing part way keeps everything read before
+the broken part, and the summary says where that was.
+"""
+import codecs
+import csv
+import json
+import math
+import uuid
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+import click
+from flask.cli import AppGroup
+from sqlalchemy import insert
+from app.extensions import db
+from app.models import User, WeightLog
+from app.rollups import refresh_rollup
+from app.versioning import bump_data_version
+
+DEFAULT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 100
+FORMATS = ['csv', 'ndjson', 'apple_health']
+# Raised while reading a file that is not in the announced format
+PARSE_ERRORS = (ET.ParseError, UnicodeDecodeError, csv.Error)
+
+APPLE_BODY_MASS = 'HKQuantityTypeIdentifierBodyMass'
+APPLE_DATE_FORMAT = '%Y-%m-%d %H:%M:%S %z'
+KG_PER_LB = 0.45359237
+
+weight_logs_cli = AppGroup('weight-logs', help='Weight log maintenance.')
+
+class WeightImportParseError(Exception):
+    """Raised when a file stops parsing; summary covers the rows imported before the broken part."""
+
+    def __init__(self, summary):
+        super().__init__(f"Could not parse the file after line {summary['last_line'] or 0}")
+        self.summary = summary
+
+def utc_naive(date):
+    """Weight log dates are stored as UTC wall time without tzinfo."""
+    if date.tzinfo is not None:
+        date = date.astimezone(timezone.utc).replace(tzinfo=None)
+    return date
+
+def validate_weight(weight):
+    """A weight as a float; raises ValueError unless it is a finite positive number."""
+    if isinstance(weight, bool) or not isinstance(weight, (int, float)):
+        raise ValueError('Weight must be a positive number')
+    try:
+        weight = float(weight)
+    except OverflowError:
+        raise ValueError('Weight must be a positive number')
+    # NaN and infinity pass a plain comparison, and CSV or NDJSON can spell them
+    if not math.isfinite(weight) or weight <= 0:
+        raise ValueError('Weight must be a positive number')
+    return weight
+
+def validate_weight_log(data):
+    """
+    Apply the POST /weight-logs rules to one entry.
+    Returns (weight, date, notes) with the date in UTC (see utc_naive);
+    raises ValueError with the client-facing message.
+    """
+    if not isinstance(data, dict) or 'weight' not in data:
+        raise ValueError('Weight is required')
+    weight = validate_weight(data['weight'])
+
+    date = data.get('date')
+    if date is None:
+        date = datetime.now(timezone.utc)
+    elif not isinstance(date, datetime):
+        try:
+            date = datetime.fromisoformat(date)
+        except (TypeError, ValueError):
+            raise ValueError('Date must be an ISO 8601 timestamp')
+
+    notes = data.get('notes', '')
+    if notes is not None and not isinstance(notes, str):
+        raise ValueError('Notes must be a string')
+    return weight, utc_naive(date), notes
+
+def _to_number(value):
+    """CSV cells are text; numbers are converted so validation sees the JSON type."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+def iter_csv(stream):
+    """Yield (line, row) from a CSV with a header row of weight, date and notes."""
+    text = codecs.getreader('utf-8-sig')(stream)
+    reader = csv.DictReader(text)
+    if reader.fieldnames:
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    for row in reader:
+        entry = {key: value for key, value in row.items() if key and value not in (None, '')}
+        if 'weight' in entry:
+            entry['weight'] = _to_number(entry['weight'])
+        yield reader.line_num, entry
+
+def iter_ndjson(stream):
+    """Yield (line, entry) from newline-delimited JSON; unparsable lines yield a ValueError."""
+    for line_number, line in enumerate(codecs.getreader('utf-8-sig')(stream), start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            yield line_number, ValueError('Invalid JSON')
+
+def iter_apple_health(stream, unit=None):
+    """
+    Yield (record, entry) for every body mass record of an Apple Health export.xml.
+    Values are converted between kg and lb when unit is given, otherwise kept as recorded.
+    """
+    events = ET.iterparse(stream, events=('start', 'end'))
+    _, root = next(events)
+    record_number = 0
+    for event, elem in events:
+        if event != 'end' or elem.tag != 'Record':
+            continue
+        record_number += 1
+        if elem.get('type') == APPLE_BODY_MASS:
+            yield record_number, _apple_entry(elem, unit)
+        # Drop everything parsed so far; the root would otherwise keep every record
+        root.clear()
+
+def _apple_entry(elem, unit):
+    try:
+        weight = float(elem.get('value'))
+        date = datetime.strptime(elem.get('startDate') or elem.get('creationDate'), APPLE_DATE_FORMAT)
+    except (TypeError, ValueError):
+        return ValueError('Invalid body mass record')
+    record_unit = (elem.get('unit') or '').lower()
+    if unit == 'kg' and record_unit == 'lb':
+        weight *= KG_PER_LB
+    elif unit == 'lb' and record_unit == 'kg':
+        weight /= KG_PER_LB
+    return {'weight': round(weight, 2), 'date': date, 'notes': elem.get('sourceName', '')}
+
+def iter_weight_rows(stream, import_format, unit=None):
+    if import_format == 'csv':
+        return iter_csv(stream)
+    if import_format == 'ndjson':
+        return iter_ndjson(stream)
+    if import_format == 'apple_health':
+        return iter_apple_health(stream, unit=unit)
+    raise ValueError(f'Unsupported format. Must be one of: {", ".join(FORMATS)}')
+
+def detect_format(filename):
+    """Guess the import format from a file name, or None."""
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    if name.endswith('.xml'):
+        return 'apple_health'
+    return None
+
+def _flush(user_id, pending, summary):
+    """Insert pending rows whose dates the user has not logged yet, then commit."""
+    existing = set(db.session.scalars(
+        db.select(WeightLog.date).where(WeightLog.user_id == user_id, WeightLog.date.in_(list(pending)))
+    ))
+    rows = [row for date, row in pending.items() if date not in existing]
+    summary['duplicates'] += len(pending) - len(rows)
+    if rows:
+        db.session.execute(insert(WeightLog), rows)
+        # Bulk inserts bypass the flush listener that maintains the rollups
+        refresh_rollup('weight', user_id, [row['date'].date() for row in rows])
+    db.session.commit()
+    summary['accepted'] += len(rows)
+    pending.clear()
+
+def import_weight_logs(user_id, rows, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Validate and insert (line, entry) pairs for a user.
+    Returns a summary with accepted, rejected and duplicates counts, the first
+    errors and the last line read. Raises WeightImportParseError, after
+    inserting the rows read before it, when the file stops parsing.
+    """
+    summary = {'accepted': 0, 'rejected': 0, 'duplicates': 0, 'errors': [], 'last_line': None}
+    pending = {}  # date -> row, so a date repeated within the file is kept once
+
+    try:
+        for line, entry in rows:
+            summary['last_line'] = line
+            try:
+                if isinstance(entry, Exception):
+                    raise entry
+                weight, date, notes = validate_weight_log(entry)
+            except ValueError as e:
+                summary['rejected'] += 1
+                if len(summary['errors']) < MAX_REPORTED_ERRORS:
+                    summary['errors'].append({'line': line, 'error': str(e)})
+                continue
+
+            if date in pending:
+                summary['duplicates'] += 1
+                continue
+            pending[date] = {'id': str(uuid.uuid4()), 'user_id': user_id, 'weight': weight,
+                             'date': date, 'notes': notes}
+            if len(pending) >= batch_size:
+                _flush(user_id, pending, summary)
+    except PARSE_ERRORS as e:
+        if pending:
+            _flush(user_id, pending, summary)
+        raise WeightImportParseError(summary) from e
+
+    if pending:
+        _flush(user_id, pending, summary)
+    return summary
+
+@weight_logs_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--user', 'user_ref', required=True, help='User id or email to import for.')
+@click.option('--format', 'import_format', type=click.Choice(FORMATS), default=None,
+              help='File format; detected from the extension when omitted.')
+@click.option('--unit', type=click.Choice(['kg', 'lb']), default=None,
+              help='Convert Apple Health values to this unit.')
+@click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True, type=int,
+              help='Rows inserted per transaction.')
+def import_weight_logs_command(path, user_ref, import_format, unit, batch_size):
+    """Import weight logs for a user from a CSV, NDJSON or Apple Health export file."""
+    user = db.session.get(User, user_ref) or User.query.filter_by(email=user_ref).first()
+    if user is None:
+        raise click.ClickException(f'No user {user_ref}')
+    import_format = import_format or detect_format(path)
+    if import_format is None:
+        raise click.ClickException('Could not detect the format; pass --format')
+
+    parse_error = None
+    with open(path, 'rb') as stream:
+        try:
+            summary = import_weight_logs(user.id, iter_weight_rows(stream, import_format, unit=unit),
+                                         batch_size=batch_size)
+        except WeightImportParseError as e:
+            parse_error, summary = e, e.summary
+    if summary['accepted']:
+        bump_data_version(user.id)
+        db.session.commit()
+    click.echo(
+        f"Imported {summary['accepted']} weight logs, rejected {summary['rejected']}, "
+        f"skipped {summary['duplicates']} duplicates"
+    )
+    for error in summary['errors']:
+        click.echo(f"  line {error['line']}: {error['error']}", err=True)
+    if parse_error is not None:
+        raise click.ClickException(str(parse_error))
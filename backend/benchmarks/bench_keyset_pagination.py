@@ -0,0 +1,47 @@
+"""Latency of GET /api/tracking/journals at page 1 and page 1000, offset vs cursor mode."""
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app.extensions import db
+from app.models import Journal
+from app.pagination import encode_cursor
+from benchmarks.common import benchmark_app, count_statements, timed
+
+JOURNALS = 50000
+PER_PAGE = 10
+PAGES = [1, 10, 100, 1000, 4000]
+
+def cursor_before_page(user_id, page):
+    """The cursor a client holds after walking to the given page."""
+    if page == 1:
+        return ''
+    last = Journal.query.filter_by(user_id=user_id).order_by(
+        Journal.created_at.desc(), Journal.id.desc()
+    ).offset((page - 1) * PER_PAGE - 1).first()
+    return encode_cursor('created_at', 'desc', last.created_at, last.id)
+
+def main():
+    with benchmark_app() as (app, user, headers):
+        start = datetime(2020, 1, 1)
+        db.session.execute(insert(Journal), [
+            {'id': f'journal-{i:06d}', 'user_id': user.id, 'content': f'Entry {i}',
+             'created_at': start + timedelta(minutes=i)}
+            for i in range(JOURNALS)
+        ])
+        db.session.commit()
+        client = app.test_client()
+
+        print(f"{JOURNALS} journals, {PER_PAGE} per page")
+        print(f"{'page':>6} {'offset ms':>10} {'cursor ms':>10} {'statements':>11}")
+        for page in PAGES:
+            offset_url = f'/api/tracking/journals?page={page}&per_page={PER_PAGE}'
+            cursor_url = f'/api/tracking/journals?cursor={cursor_before_page(user.id, page)}&limit={PER_PAGE}'
+
+            with count_statements() as statements:
+                client.get(cursor_url, headers=headers)
+
+            offset_ms = timed(lambda: client.get(offset_url, headers=headers))
+            cursor_ms = timed(lambda: client.get(cursor_url, headers=headers))
+            print(f"{page:>6} {offset_ms:>10.2f} {cursor_ms:>10.2f} {len(statements):>11}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+"""Level lookup cost by total XP: bisection table versus a level-by-level loop."""
+import timeit
+from app.leveling import calculate_xp_for_level, level_for_xp
+
+XP_VALUES = [0, 1_000, 100_000, 1_000_000, 10_000_000, 100_000_000]
+LOOKUPS = 10_000
+
+def linear_level(total_xp):
+    """Walk the levels one by one, as the old route helper did."""
+    level, threshold = 1, 0
+    while threshold + calculate_xp_for_level(level) <= total_xp:
+        threshold += calculate_xp_for_level(level)
+        level += 1
+    return level
+
+def main():
+    print(f"{'total xp':>12} {'level':>7} {'bisect us':>10} {'linear us':>10}")
+    for total_xp in XP_VALUES:
+        level = level_for_xp(total_xp)
+        bisect_us = timeit.timeit(lambda: level_for_xp(total_xp), number=LOOKUPS) / LOOKUPS * 1e6
+        linear_runs = max(LOOKUPS // max(level, 1), 10)
+        linear_us = timeit.timeit(lambda: linear_level(total_xp), number=linear_runs) / linear_runs * 1e6
+        print(f"{total_xp:>12} {level:>7} {bisect_us:>10.2f} {linear_us:>10.2f}")
+
+if __name__ == '__main__':
+    main()
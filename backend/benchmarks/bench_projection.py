@@ -0,0 +1,42 @@
+"""Latency of the cash-flow projection over hundreds of recurring items, engine and endpoint."""
+from datetime import datetime, timezone, timedelta
+from sqlalchemy import insert
+from app.extensions import db
+from app.models import Income, MonthlyExpense
+from app.projection import recurring_items, project_cash_flow
+from benchmarks.common import benchmark_app, timed
+
+INCOMES = 300
+EXPENSES = 300
+HORIZONS = [30, 365, 3650]
+FREQUENCIES = ['daily', 'weekly', 'monthly']
+
+def main():
+    with benchmark_app() as (app, user, headers):
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        db.session.execute(insert(Income), [
+            {'id': f'income-{i:04d}', 'user_id': user.id, 'name': 'Income', 'amount': 10.0 + i,
+             'date': now - timedelta(days=i), 'is_recurring': True, 'frequency': FREQUENCIES[i % 3]}
+            for i in range(INCOMES)
+        ])
+        db.session.execute(insert(MonthlyExpense), [
+            {'id': f'expense-{i:04d}', 'user_id': user.id, 'name': 'Expense', 'amount': 20.0 + i,
+             'due_date': i % 31 + 1, 'is_recurring': True, 'created_at': now - timedelta(days=i)}
+            for i in range(EXPENSES)
+        ])
+        db.session.commit()
+        incomes, expenses = recurring_items(user.id)
+        today = now.date()
+        client = app.test_client()
+
+        print(f"{INCOMES} recurring incomes, {EXPENSES} recurring expenses")
+        print(f"{'horizon_days':<14} {'engine ms':>10} {'endpoint ms':>12} {'months':>7}")
+        for horizon in HORIZONS:
+            engine = timed(lambda: project_cash_flow(incomes, expenses, today, horizon))
+            url = f'/api/finance/analytics/projection?horizon_days={horizon}'
+            response = client.get(url, headers=headers)
+            endpoint = timed(lambda: client.get(url, headers=headers))
+            print(f"{horizon:<14} {engine:>10.1f} {endpoint:>12.1f} {len(response.get_json()['monthly']):>7}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,28 @@
+"""Statement count and latency of POST /api/tracking/activities by selection size."""
+from app.extensions import db
+from app.models import Activity
+from benchmarks.common import benchmark_app, count_statements, timed
+
+SELECTION_SIZES = [1, 10, 50, 200, 1000]
+
+def main():
+    with benchmark_app() as (app, user, headers):
+        db.session.add_all([
+            Activity(id=f'activity-{i}', name=f'Activity {i}', category='Mind + Body', type='physical')
+            for i in range(max(SELECTION_SIZES))
+        ])
+        db.session.commit()
+        client = app.test_client()
+
+        print(f"{'selected':>10} {'statements':>12} {'best ms':>10}")
+        for size in SELECTION_SIZES:
+            payload = {'selected_activities': [f'activity-{i}' for i in range(size)]}
+
+            with count_statements() as statements:
+                client.post('/api/tracking/activities', json=payload, headers=headers)
+
+            elapsed = timed(lambda: client.post('/api/tracking/activities', json=payload, headers=headers))
+            print(f"{size:>10} {len(statements):>12} {elapsed:>10.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""Latency and payload size of GET /api/tracking/analytics/weight-trend over ten years of weigh-ins."""
+from datetime import datetime, timezone, timedelta
+from sqlalchemy import insert
+from app.extensions import db
+from app.models import WeightLog
+from app.rollups import rebuild_rollups
+from benchmarks.common import benchmark_app, timed
+
+YEARS = 10
+PER_DAY = 3
+QUERIES = ['days=30', 'days=365', 'days=3650', 'days=3650&max_points=100', 'days=3650&bucket=month']
+
+def main():
+    with benchmark_app() as (app, user, headers):
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        logs = YEARS * 365 * PER_DAY
+        db.session.execute(insert(WeightLog), [
+            {'id': f'log-{i:06d}', 'user_id': user.id, 'weight': 80 + (i % 50) / 10,
+             'date': now - timedelta(hours=24 / PER_DAY * i)}
+            for i in range(logs)
+        ])
+        db.session.commit()
+        rebuild_rollups()
+        client = app.test_client()
+
+        print(f"{logs} weight logs")
+        print(f"{'query':<28} {'ms':>8} {'points':>7} {'bytes':>8}")
+        for query in QUERIES:
+            url = f'/api/tracking/analytics/weight-trend?{query}'
+            response = client.get(url, headers=headers)
+            elapsed = timed(lambda: client.get(url, headers=headers))
+            print(f"{query:<28} {elapsed:>8.1f} {len(response.get_json()['weight_data']):>7} "
+                  f"{len(response.data):>8}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Shared helpers for the benchmark scripts.
+
+Run a benchmark from the backend directory, e.g.:
+    python -m benchmarks.bench_select_activities
+"""
+import time
+import uuid
+from contextlib import contextmanager
+from sqlalchemy import event
+from flask_jwt_extended import create_access_token
+from werkzeug.security import generate_password_hash
+from app import create_app
+from app.extensions import db
+from app.models import User
+
+@contextmanager
+def benchmark_app():
+    """Create an app backed by an in-memory database with a single user."""
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        user = User(
+            id=str(uuid.uuid4()),
+            email='bench@example.com',
+            username='bench',
+            password_hash=generate_password_hash('bench')
+        )
+        db.session.add(user)
+        db.session.commit()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+        try:
+            yield app, user, headers
+        finally:
+            db.session.remove()
+            db.drop_all()
+
+@contextmanager
+def count_statements():
+    """Count the SQL statements executed inside the block."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+def timed(func, repeat=5):
+    """Return the best wall-clock time of func() in milliseconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
@@ -11,8 +11,26 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'dev-jwt-secret-key'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    ROLLOVER_SCHEDULER_ENABLED = os.environ.get('ROLLOVER_SCHEDULER_ENABLED', 'false').lower() == 'true'
+    ROLLOVER_BATCH_SIZE = int(os.environ.get('ROLLOVER_BATCH_SIZE', 500))
+    RESET_CHUNK_SIZE = int(os.environ.get('RESET_CHUNK_SIZE', 1000))
+    BACKGROUND_JOB_WORKERS = int(os.environ.get('BACKGROUND_JOB_WORKERS', 2))
+    BACKGROUND_JOBS_EAGER = False
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_JSON = os.environ.get('LOG_JSON', 'true').lower() == 'true'
+    LOG_DEBUG_SAMPLE_RATE = float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', 1.0))
+    LOG_DEBUG_MAX_PER_SECOND = int(os.environ.get('LOG_DEBUG_MAX_PER_SECOND', 100))
+    REFERENCE_CACHE_CHECK_SECONDS = float(os.environ.get('REFERENCE_CACHE_CHECK_SECONDS', 2))
+    PHOTO_STORAGE = os.environ.get('PHOTO_STORAGE', 'app.storage.LocalPhotoStorage')
+    PHOTO_STORAGE_ROOT = os.environ.get('PHOTO_STORAGE_ROOT')  # Defaults to <instance>/photos
+    MAX_PHOTO_SIZE = int(os.environ.get('MAX_PHOTO_SIZE', 20 * 1024 * 1024))
+    THUMBNAIL_WORKERS = int(os.environ.get('THUMBNAIL_WORKERS', 2))  # 0 renders in the job's thread
+    FINANCIAL_SUMMARY_CACHE_SIZE = int(os.environ.get('FINANCIAL_SUMMARY_CACHE_SIZE', 10000))  # Users per worker
 
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
-    JWT_SECRET_KEY = 'test-jwt-secret-key'
\ No newline at end of file
+    JWT_SECRET_KEY = 'test-jwt-secret-key'
+    ROLLOVER_SCHEDULER_ENABLED = False
+    BACKGROUND_JOBS_EAGER = True
+    THUMBNAIL_WORKERS = 0
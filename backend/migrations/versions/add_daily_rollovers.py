@@ -0,0 +1,34 @@
+"""add daily_rollovers table
+
+Revision ID: add_daily_rollovers
+Revises: e45b622a4332
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_daily_rollovers'
+down_revision = 'e45b622a4332'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Track progress of the daily rollover job so it can resume after a crash
+    op.create_table('daily_rollovers',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('last_user_id', sa.String(length=36), nullable=True),
+        sa.Column('users_processed', sa.Integer(), nullable=True),
+        sa.Column('streaks_broken', sa.Integer(), nullable=True),
+        sa.Column('flags_reset', sa.Integer(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('day')
+    )
+
+
+def downgrade():
+    op.drop_table('daily_rollovers')
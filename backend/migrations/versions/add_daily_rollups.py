@@ -0,0 +1,52 @@
+"""add daily tracking rollup tables
+
+Revision ID: add_daily_rollups
+Revises: add_journal_search
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_daily_rollups'
+down_revision = 'add_journal_search'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing history is backfilled with `flask rollups rebuild`
+    op.create_table('daily_weight_rollups',
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('min_weight', sa.Float(), nullable=False),
+        sa.Column('max_weight', sa.Float(), nullable=False),
+        sa.Column('total_weight', sa.Float(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+    op.create_table('daily_mood_rollups',
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('mood', sa.String(length=50), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'day', 'mood')
+    )
+    op.create_table('daily_photo_rollups',
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('category', sa.String(length=50), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'day', 'category')
+    )
+
+
+def downgrade():
+    op.drop_table('daily_photo_rollups')
+    op.drop_table('daily_mood_rollups')
+    op.drop_table('daily_weight_rollups')
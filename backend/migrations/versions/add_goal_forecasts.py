@@ -0,0 +1,41 @@
+"""add goal forecast table
+
+Revision ID: add_goal_forecasts
+Revises: add_monthly_ledger_rollups
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_goal_forecasts'
+down_revision = 'add_monthly_ledger_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('goal_forecasts',
+        sa.Column('goal_id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('probability', sa.Float(), nullable=True),
+        sa.Column('expected_amount', sa.Float(), nullable=False),
+        sa.Column('p10_amount', sa.Float(), nullable=False),
+        sa.Column('p50_amount', sa.Float(), nullable=False),
+        sa.Column('p90_amount', sa.Float(), nullable=False),
+        sa.Column('median_completion_date', sa.Date(), nullable=True),
+        sa.Column('paths', sa.Integer(), nullable=False),
+        sa.Column('seed', sa.Integer(), nullable=True),
+        sa.Column('computed_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['goal_id'], ['financial_goals.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('goal_id')
+    )
+    op.create_index('ix_goal_forecasts_user_id', 'goal_forecasts', ['user_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_goal_forecasts_user_id', table_name='goal_forecasts')
+    op.drop_table('goal_forecasts')
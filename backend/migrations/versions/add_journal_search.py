@@ -0,0 +1,86 @@
+"""add journal full-text search index
+
+Revision ID: add_journal_search
+Revises: add_reference_data_versions
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_journal_search'
+down_revision = 'add_reference_data_versions'
+branch_labels = None
+depends_on = None
+
+SQLITE_UPGRADE = [
+    # Stable integer keys for the FTS rows; the implicit rowid of journals can change on VACUUM
+    """CREATE TABLE IF NOT EXISTS journals_fts_keys (
+        id INTEGER PRIMARY KEY, journal_id VARCHAR(36) NOT NULL UNIQUE
+    )""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS journals_fts USING fts5(
+        title, content, tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS journals_fts_insert AFTER INSERT ON journals BEGIN
+        INSERT INTO journals_fts_keys(journal_id) VALUES (new.id);
+        INSERT INTO journals_fts(rowid, title, content)
+        VALUES ((SELECT id FROM journals_fts_keys WHERE journal_id = new.id), new.title, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS journals_fts_delete AFTER DELETE ON journals BEGIN
+        DELETE FROM journals_fts WHERE rowid = (SELECT id FROM journals_fts_keys WHERE journal_id = old.id);
+        DELETE FROM journals_fts_keys WHERE journal_id = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS journals_fts_update AFTER UPDATE OF title, content ON journals BEGIN
+        UPDATE journals_fts SET title = new.title, content = new.content
+        WHERE rowid = (SELECT id FROM journals_fts_keys WHERE journal_id = new.id);
+    END""",
+    # Index the rows that existed before the table was created
+    "INSERT OR IGNORE INTO journals_fts_keys(journal_id) SELECT id FROM journals",
+    """INSERT INTO journals_fts(rowid, title, content)
+       SELECT journals_fts_keys.id, journals.title, journals.content
+       FROM journals JOIN journals_fts_keys ON journals_fts_keys.journal_id = journals.id"""
+]
+
+POSTGRESQL_UPGRADE = [
+    # Nullable with no default, so adding it does not rewrite the table;
+    # existing rows are filled by `flask search rebuild` in batches
+    "ALTER TABLE journals ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    "CREATE INDEX IF NOT EXISTS ix_journals_search_vector ON journals USING GIN (search_vector)",
+    """CREATE OR REPLACE FUNCTION journals_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.content, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS journals_search_vector_trigger ON journals",
+    """CREATE TRIGGER journals_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF title, content ON journals
+        FOR EACH ROW EXECUTE FUNCTION journals_search_vector_update()"""
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+    elif dialect == 'postgresql':
+        for statement in POSTGRESQL_UPGRADE:
+            op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for trigger in ['journals_fts_insert', 'journals_fts_delete', 'journals_fts_update']:
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS journals_fts')
+        op.execute('DROP TABLE IF EXISTS journals_fts_keys')
+    elif dialect == 'postgresql':
+        op.execute('DROP TRIGGER IF EXISTS journals_search_vector_trigger ON journals')
+        op.execute('DROP FUNCTION IF EXISTS journals_search_vector_update()')
+        op.execute('DROP INDEX IF EXISTS ix_journals_search_vector')
+        op.execute('ALTER TABLE journals DROP COLUMN IF EXISTS search_vector')
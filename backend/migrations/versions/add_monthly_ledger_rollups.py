@@ -0,0 +1,34 @@
+"""add monthly ledger rollup table
+
+Revision ID: add_monthly_ledger_rollups
+Revises: add_user_data_version
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_monthly_ledger_rollups'
+down_revision = 'add_user_data_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing history is backfilled with `flask ledger rebuild`
+    op.create_table('monthly_ledger_rollups',
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.Column('category', sa.String(length=50), nullable=False),
+        sa.Column('income', sa.Float(), nullable=False),
+        sa.Column('expenses', sa.Float(), nullable=False),
+        sa.Column('net', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'month', 'category')
+    )
+
+
+def downgrade():
+    op.drop_table('monthly_ledger_rollups')
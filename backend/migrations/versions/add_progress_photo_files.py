@@ -0,0 +1,31 @@
+"""add uploaded file columns to progress_photos
+
+Revision ID: add_progress_photo_files
+Revises: add_daily_rollups
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_progress_photo_files'
+down_revision = 'add_daily_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('progress_photos', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('progress_photos', sa.Column('content_type', sa.String(length=100), nullable=True))
+    op.add_column('progress_photos', sa.Column('file_size', sa.Integer(), nullable=True))
+    # Reference counting of shared blobs when a photo is deleted
+    op.create_index('ix_progress_photos_content_hash', 'progress_photos', ['content_hash'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_progress_photos_content_hash', table_name='progress_photos')
+    op.drop_column('progress_photos', 'file_size')
+    op.drop_column('progress_photos', 'content_type')
+    op.drop_column('progress_photos', 'content_hash')
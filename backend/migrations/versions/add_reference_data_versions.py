@@ -0,0 +1,34 @@
+"""add reference_data_versions table
+
+Revision ID: add_reference_data_versions
+Revises: add_user_access_path_indexes
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_reference_data_versions'
+down_revision = 'add_user_access_path_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Version counters checked by every worker's reference-data cache
+    versions = op.create_table('reference_data_versions',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(versions, [
+        {'name': name, 'version': 0}
+        for name in ('activities', 'achievements', 'weekly_missions')
+    ])
+
+
+def downgrade():
+    op.drop_table('reference_data_versions')
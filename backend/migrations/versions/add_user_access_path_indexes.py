@@ -0,0 +1,38 @@
+"""add composite indexes for per-user access paths
+
+Revision ID: add_user_access_path_indexes
+Revises: add_background_jobs
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_access_path_indexes'
+down_revision = 'add_background_jobs'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_user_activities_user_id_is_active', 'user_activities', ['user_id', 'is_active']),
+    ('ix_user_activities_user_id_date_completed', 'user_activities', ['user_id', 'date', 'is_completed_today']),
+    ('ix_user_activity_logs_user_id_date', 'user_activity_logs', ['user_id', 'date']),
+    ('ix_journals_user_id_created_at', 'journals', ['user_id', 'created_at']),
+    ('ix_weight_logs_user_id_date', 'weight_logs', ['user_id', 'date']),
+    ('ix_progress_photos_user_id_date', 'progress_photos', ['user_id', 'date']),
+    ('ix_income_user_id_date', 'income', ['user_id', 'date']),
+    ('ix_daily_check_ins_user_id_date', 'daily_check_ins', ['user_id', 'date'])
+]
+
+
+def upgrade():
+    # Composite indexes matching the user_id-prefixed filters used by the routes
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
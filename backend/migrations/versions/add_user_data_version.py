@@ -0,0 +1,25 @@
+"""add data_version column to users
+
+Revision ID: add_user_data_version
+Revises: add_progress_photo_files
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_data_version'
+down_revision = 'add_progress_photo_files'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Bumped by every write to the user's data; read by primary key to build ETags
+    op.add_column('users', sa.Column('data_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    op.drop_column('users', 'data_version')
@@ -0,0 +1,25 @@
+"""add last_daily_submission column to users
+
+Revision ID: add_user_last_daily_submission
+Revises: add_goal_forecasts
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_last_daily_submission'
+down_revision = 'add_goal_forecasts'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Completions are dated today on toggle, so submissions are recorded on their own
+    op.add_column('users', sa.Column('last_daily_submission', sa.Date(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('users', 'last_daily_submission')
@@ -1,6 +1,7 @@
 from app import create_app
 from app.extensions import db
 from app.models.activity import Activity
+from app.refdata import bump_reference_version
 import uuid
 
 app = create_app()
@@ -98,6 +99,7 @@ def seed_activities():
                 )
                 db.session.add(new_activity)
         
+        bump_reference_version('activities')
         db.session.commit()
         print("Default activities seeded successfully!")
 
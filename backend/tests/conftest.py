@@ -5,6 +5,7 @@ from app.models import User
 from datetime import datetime, timezone
 import uuid
 from werkzeug.security import generate_password_hash
+from sqlalchemy import event
 
 @pytest.fixture
 def app():
@@ -50,4 +51,17 @@ def auth_tokens(client, test_user):
         'password': 'testpassword'
     })
     assert response.status_code == 200
-    return response.get_json() 
\ No newline at end of file
+    return response.get_json()
+
+@pytest.fixture
+def query_counter(app):
+    """Record every SQL statement executed against the test database."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    yield statements
+    event.remove(engine, 'before_cursor_execute', before_cursor_execute)
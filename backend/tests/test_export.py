@@ -0,0 +1,48 @@
+import gzip
+import json
+import uuid
+from werkzeug.security import generate_password_hash
+from app import export
+from app.extensions import db
+from app.models import User, Journal
+
+def parse_ndjson(body):
+    return [json.loads(line) for line in body.decode().splitlines()]
+
+def test_export_streams_every_record_as_ndjson(client, auth_tokens, app, monkeypatch):
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    client.post('/api/tracking/journals', headers=headers, json={'content': 'Day one', 'mood': 'good'})
+    client.post('/api/tracking/weight-logs', headers=headers, json={'weight': 80.5})
+    client.post('/api/finance/assets', headers=headers, json={'name': 'Bike', 'value': 450})
+
+    # Another user's rows are never exported
+    other = User(id=str(uuid.uuid4()), email='other@example.com', username='other',
+                 password_hash=generate_password_hash('x'))
+    db.session.add(other)
+    db.session.add(Journal(id=str(uuid.uuid4()), user_id=other.id, content='Not mine'))
+    db.session.commit()
+
+    monkeypatch.setattr(export, 'FLUSH_SIZE', 1)
+    response = client.get('/api/user/export', headers=headers)
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.headers['Content-Disposition'].startswith('attachment; filename="live-focus-grow-export-')
+
+    records = parse_ndjson(response.data)
+    assert records[0]['type'] == 'profile'
+    assert records[0]['data']['email'] == 'test@example.com'
+    assert 'password_hash' not in records[0]['data']
+    by_type = {}
+    for record in records[1:]:
+        by_type.setdefault(record['type'], []).append(record['data'])
+    assert [journal['content'] for journal in by_type['journal']] == ['Day one']
+    assert by_type['weight_log'][0]['weight'] == 80.5
+    assert by_type['asset'][0]['name'] == 'Bike'
+
+    compressed = client.get('/api/user/export?compress=gzip', headers=headers)
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert parse_ndjson(gzip.decompress(compressed.data)) == records
+
+def test_export_requires_auth(client):
+    assert client.get('/api/user/export').status_code == 401
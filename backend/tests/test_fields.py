@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+from app.models import User, Journal, Income
+from app.extensions import db
+
+def list_select(statements, table):
+    """The row query of a list request, as opposed to its COUNT(*)."""
+    return next(s for s in statements if f'FROM {table}' in s and 'count(*)' not in s)
+
+def test_journal_fields_and_excerpt(client, auth_tokens, query_counter):
+    """Unrequested journal columns are left out of the SQL and the response"""
+    user = User.query.first()
+    db.session.add_all([
+        Journal(id=f'journal-{i}', user_id=user.id, title=f'Title {i}', mood='happy',
+                content='x' * 5000, created_at=datetime(2026, 1, 1) + timedelta(days=i))
+        for i in range(3)
+    ])
+    db.session.commit()
+    db.session.expunge_all()
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+
+    query_counter.clear()
+    data = client.get('/api/tracking/journals?fields=title,mood', headers=headers).get_json()
+    assert [set(item) for item in data['items']] == [{'id', 'title', 'mood'}] * 3
+    select = list_select(query_counter, 'journals')
+    assert 'journals.content' not in select
+    assert data['total'] == 3
+
+    query_counter.clear()
+    data = client.get('/api/tracking/journals?excerpt=10', headers=headers).get_json()
+    item = data['items'][0]
+    assert item['excerpt'] == 'x' * 10
+    assert 'content' not in item
+    assert set(item) == {'id', 'title', 'excerpt', 'mood', 'created_at'}
+    select = list_select(query_counter, 'journals')
+    assert 'journals.content AS' not in select
+    assert 'substr(journals.content' in select
+
+    # Without fields or excerpt the response is unchanged
+    data = client.get('/api/tracking/journals', headers=headers).get_json()
+    assert set(data['items'][0]) == {'id', 'title', 'content', 'mood', 'created_at'}
+    assert len(data['items'][0]['content']) == 5000
+
+    # The sort key is still loaded for the cursor when it is not requested
+    data = client.get('/api/tracking/journals?fields=mood&cursor=&limit=2', headers=headers).get_json()
+    assert data['next_cursor']
+    data = client.get(f'/api/tracking/journals?fields=mood&cursor={data["next_cursor"]}&limit=2',
+                      headers=headers).get_json()
+    assert [item['id'] for item in data['items']] == ['journal-0']
+
+    response = client.get('/api/tracking/journals?fields=title,password', headers=headers)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Unknown fields: password'
+
+def test_income_fields(client, auth_tokens, query_counter):
+    """Finance lists defer notes unless asked for"""
+    user = User.query.first()
+    db.session.add(Income(id='income-1', user_id=user.id, name='Salary', amount=100,
+                          date=datetime(2026, 1, 1), notes='n' * 1000))
+    db.session.commit()
+    db.session.expunge_all()
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+
+    query_counter.clear()
+    data = client.get('/api/finance/income?fields=name,amount', headers=headers).get_json()
+    assert data['items'] == [{'id': 'income-1', 'name': 'Salary', 'amount': 100}]
+    select = list_select(query_counter, 'income')
+    assert 'income.notes' not in select
@@ -0,0 +1,56 @@
+from datetime import datetime, timezone
+from app.extensions import db
+from app.finance_summary import load_financial_summary
+from app.models import Income
+from app.versioning import bump_data_version
+
+def test_summary_is_one_statement_then_cached(client, auth_tokens, query_counter):
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    client.post('/api/finance/assets', headers=headers, json={'name': 'Flat', 'value': 1000})
+    client.post('/api/finance/assets', headers=headers, json={'name': 'Bike', 'value': 500})
+    client.post('/api/finance/monthly-expenses', headers=headers, json={'name': 'Rent', 'amount': 400, 'due_date': 1})
+    client.post('/api/finance/income', headers=headers,
+                json={'name': 'Salary', 'amount': 2000, 'date': now.isoformat(), 'is_recurring': True, 'frequency': 'monthly'})
+    client.post('/api/finance/income', headers=headers,
+                json={'name': 'Old bonus', 'amount': 300, 'date': '2020-01-15T00:00:00'})
+    client.post('/api/finance/financial-goals', headers=headers,
+                json={'name': 'Car', 'target_amount': 5000, 'current_amount': 1000})
+
+    query_counter.clear()
+    summary = client.get('/api/finance/analytics/summary', headers=headers).get_json()
+    # The data version lookup and the summary itself
+    assert len(query_counter) == 2
+    assert summary['total_assets'] == 1500
+    assert summary['total_monthly_expenses'] == 400
+    assert summary['total_monthly_income'] == 2000
+    assert summary['recurring_income'] == 2000
+    assert summary['monthly_savings'] == 1600
+    assert [(g['name'], g['progress_percentage']) for g in summary['active_goals']] == [('Car', 20.0)]
+
+    query_counter.clear()
+    assert client.get('/api/finance/analytics/summary', headers=headers).get_json() == summary
+    assert len(query_counter) == 1
+
+    # Finance writes drop the cached summary
+    client.post('/api/finance/assets', headers=headers, json={'name': 'Watch', 'value': 100})
+    assert client.get('/api/finance/analytics/summary', headers=headers).get_json()['total_assets'] == 1600
+
+def test_summary_of_a_user_without_records(client, auth_tokens):
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    summary = client.get('/api/finance/analytics/summary', headers=headers).get_json()
+    assert summary == {'total_assets': 0, 'total_monthly_expenses': 0, 'total_monthly_income': 0,
+                       'recurring_income': 0, 'monthly_savings': 0, 'active_goals': []}
+    assert load_financial_summary(auth_tokens['user']['id']) == summary
+
+def test_writes_from_other_workers_are_seen(client, auth_tokens):
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    user_id = auth_tokens['user']['id']
+    assert client.get('/api/finance/analytics/summary', headers=headers).get_json()['total_monthly_income'] == 0
+
+    # Another worker's write bumps the version without touching this worker's cache
+    db.session.add(Income(id='income-1', user_id=user_id, name='Gift', amount=50,
+                          date=datetime.now(timezone.utc).replace(tzinfo=None)))
+    bump_data_version(user_id)
+    db.session.commit()
+    assert client.get('/api/finance/analytics/summary', headers=headers).get_json()['total_monthly_income'] == 50
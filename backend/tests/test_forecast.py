@@ -0,0 +1,128 @@
+from datetime import datetime, timezone, timedelta
+from app.extensions import db
+from app.forecast import GoalInput, simulate_goals, recurring_baseline, monthly_history, _store_forecasts
+from app.ledger import add_months, month_of
+from app.models import FinancialGoal, GoalForecast, Income, MonthlyExpense
+from app.projection import RecurringItem
+
+def test_simulation_with_a_steady_history():
+    goals = [GoalInput('soon', 1000.0, 0.0, 5), GoalInput('later', 1000.0, 0.0, 12)]
+    forecasts = simulate_goals(goals, [200.0], paths=200, seed=1)
+    # 200 a month split over two goals is 100 each
+    assert forecasts['soon']['probability'] == 0.0
+    assert forecasts['later']['probability'] == 1.0
+    assert forecasts['later']['completion_months'] == 10
+    assert forecasts['later']['p50_amount'] == 1200.0
+
+    # Goals without a deadline get amounts and completion but no probability
+    forecast = simulate_goals([GoalInput('open', 500.0, 100.0, None)], [50.0], paths=100, seed=1)['open']
+    assert forecast['probability'] is None
+    assert forecast['completion_months'] == 8
+
+def test_simulation_is_seedable():
+    goals = [GoalInput('goal', 3000.0, 500.0, 18)]
+    history = [400.0, -300.0, 150.0, 0.0, 900.0, -50.0]
+    first = simulate_goals(goals, history, paths=2000, seed=42)
+    assert simulate_goals(goals, history, paths=2000, seed=42) == first
+    assert 0 < first['goal']['probability'] < 1
+    assert first['goal']['p10_amount'] < first['goal']['p50_amount'] < first['goal']['p90_amount']
+
+def test_forecast_route_stores_and_discards_results(client, auth_tokens, runner, query_counter):
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    this_month = month_of(datetime.now(timezone.utc))
+    for i, amount in enumerate([800, 1200, 1000, 600, 1400, 1000]):
+        month = add_months(this_month, -1 - i)
+        client.post('/api/finance/income', headers=headers, json={
+            'name': 'Salary', 'amount': amount, 'date': f'{month.isoformat()}T09:00:00'
+        })
+    deadline = (datetime.now(timezone.utc) + timedelta(days=400)).replace(tzinfo=None)
+    client.post('/api/finance/financial-goals', headers=headers, json={
+        'name': 'Car', 'target_amount': 14000, 'current_amount': 1000, 'deadline': deadline.isoformat()
+    })
+
+    data = client.get('/api/finance/analytics/goal-forecast?seed=7&paths=1000', headers=headers).get_json()
+    assert (data['paths'], data['seed']) == (1000, 7)
+    [goal] = data['goals']
+    assert goal['name'] == 'Car'
+    assert 0 < goal['probability'] < 1
+    assert goal['median_completion_date'] is not None
+
+    # Served from the stored forecast: data version, goals and stored forecasts
+    query_counter.clear()
+    again = client.get('/api/finance/analytics/goal-forecast?seed=7&paths=1000', headers=headers).get_json()
+    assert again == data
+    assert len(query_counter) == 3
+
+    # Any income, expense or goal write discards the user's forecasts
+    client.post('/api/finance/monthly-expenses', headers=headers,
+                json={'name': 'Rent', 'amount': 500, 'due_date': 1})
+    assert GoalForecast.query.count() == 0
+
+    result = runner.invoke(args=['finance', 'forecast', '--workers', '1', '--paths', '500', '--seed', '3'])
+    assert result.exit_code == 0, result.output
+    assert 'Forecast goals for 1 users, 0 failed' in result.output
+    db.session.expire_all()
+    assert [(f.paths, f.seed) for f in GoalForecast.query.all()] == [(500, 3)]
+
+    assert client.get('/api/finance/analytics/goal-forecast?seed=-1', headers=headers).status_code == 400
+
+def test_recurring_expenses_count_every_month(client, auth_tokens):
+    """A recurring expense added months ago weighs on every future month, not just on its first"""
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    now = datetime.now(timezone.utc)
+    this_month = month_of(now)
+    for i, amount in enumerate([800, 1200, 1000, 600, 1400, 1000]):
+        month = add_months(this_month, -1 - i)
+        client.post('/api/finance/income', headers=headers, json={
+            'name': 'Salary', 'amount': amount, 'date': f'{month.isoformat()}T09:00:00'
+        })
+    deadline = (now + timedelta(days=400)).replace(tzinfo=None)
+    client.post('/api/finance/financial-goals', headers=headers, json={
+        'name': 'Car', 'target_amount': 12000, 'current_amount': 1000, 'deadline': deadline.isoformat()
+    })
+    url = '/api/finance/analytics/goal-forecast?seed=7&paths=1000'
+    [before] = client.get(url, headers=headers).get_json()['goals']
+    assert before['probability'] > 0.5
+
+    # Booked in the ledger only in the month it was added, five months ago
+    db.session.add(MonthlyExpense(
+        id='rent', user_id=auth_tokens['user']['id'], name='Rent', amount=600, due_date=1, is_recurring=True,
+        created_at=datetime.combine(add_months(this_month, -5), datetime.min.time()) + timedelta(hours=9)
+    ))
+    db.session.commit()
+    [after] = client.get(url, headers=headers).get_json()['goals']
+    # About 1000 - 600 a month leaves the goal out of reach
+    assert after['probability'] == 0.0
+
+def test_recurring_baseline_follows_the_schedule():
+    today = datetime(2024, 1, 10).date()
+    rent = RecurringItem(500.0, datetime(2023, 6, 1).date(), 'monthly', 1)
+    pay = RecurringItem(100.0, datetime(2024, 1, 12).date(), 'weekly', 12)
+    baseline = recurring_baseline([pay], [rent], today, 3)
+    assert len(baseline) == 3
+    # Rent is due once in each month of the horizon, pay every week from the 12th
+    assert sum(baseline) == 100.0 * 13 - 500.0 * 3
+
+
+def test_history_without_a_complete_month_is_flat(app, auth_tokens):
+    """A bonus this month says nothing of a whole month, so it does not count as one"""
+    user_id = auth_tokens['user']['id']
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    assert monthly_history(user_id, now.date()) == [0.0]
+    db.session.add(Income(id='bonus', user_id=user_id, name='Bonus', amount=5000, date=now, is_recurring=False))
+    db.session.commit()
+    assert monthly_history(user_id, now.date()) == [0.0]
+
+def test_storing_forecasts_overwrites_rows_stored_concurrently(app, auth_tokens):
+    user_id = auth_tokens['user']['id']
+    goal = FinancialGoal(id='car', user_id=user_id, name='Car', target_amount=1000, current_amount=0)
+    db.session.add(goal)
+    db.session.commit()
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    forecast = {'probability': 0.5, 'expected_amount': 900.0, 'p10_amount': 500.0, 'p50_amount': 900.0,
+                'p90_amount': 1300.0, 'completion_months': None}
+    _store_forecasts(user_id, {'car': forecast}, 1000, 7, now)
+    # Another request that also found them stale stores its own on top
+    _store_forecasts(user_id, {'car': {**forecast, 'probability': 0.6}}, 1000, 7, now)
+    db.session.commit()
+    assert [f.probability for f in GoalForecast.query.all()] == [0.6]
@@ -0,0 +1,77 @@
+from datetime import datetime, date, timezone
+from sqlalchemy import insert
+from app.extensions import db
+from app.ledger import add_months, month_of
+from app.models import Income, MonthlyExpense, MonthlyLedgerRollup
+
+def ledger_rows(user_id):
+    rows = MonthlyLedgerRollup.query.filter_by(user_id=user_id).order_by(
+        MonthlyLedgerRollup.month, MonthlyLedgerRollup.category
+    )
+    return [(r.month, r.category, r.income, r.expenses, r.net) for r in rows]
+
+def test_ledger_follows_finance_writes(client, auth_tokens):
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    user_id = auth_tokens['user']['id']
+    this_month = month_of(datetime.now(timezone.utc))
+    last_month = add_months(this_month, -1)
+
+    salary = client.post('/api/finance/income', headers=headers, json={
+        'name': 'Salary', 'category': 'Salary', 'amount': 3000,
+        'date': f'{last_month.isoformat()}T09:00:00'
+    }).get_json()
+    client.post('/api/finance/income', headers=headers, json={
+        'name': 'Tip', 'amount': 20, 'date': f'{this_month.isoformat()}T12:00:00'
+    })
+    rent = client.post('/api/finance/monthly-expenses', headers=headers, json={
+        'name': 'Rent', 'category': 'Housing', 'amount': 1200, 'due_date': 1
+    }).get_json()
+    assert ledger_rows(user_id) == [
+        (last_month, 'Salary', 3000, 0, 3000),
+        (this_month, '', 20, 0, 20),
+        (this_month, 'Housing', 0, 1200, -1200)
+    ]
+
+    # Moving an entry to another month refreshes both months
+    client.put(f'/api/finance/income/{salary["id"]}', headers=headers,
+               json={'amount': 3100, 'date': f'{this_month.isoformat()}T09:00:00'})
+    client.delete(f'/api/finance/monthly-expenses/{rent["id"]}', headers=headers)
+    assert ledger_rows(user_id) == [
+        (this_month, '', 20, 0, 20),
+        (this_month, 'Salary', 3100, 0, 3100)
+    ]
+
+def test_trend_reads_one_row_per_month(client, auth_tokens, runner, query_counter):
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    user_id = auth_tokens['user']['id']
+    this_month = month_of(datetime.now(timezone.utc))
+    # Bulk history written behind the ORM's back, then backfilled
+    db.session.execute(insert(Income), [
+        {'id': f'income-{i}', 'user_id': user_id, 'name': 'Sale', 'category': f'Cat {i % 3}', 'amount': 10.0,
+         'date': datetime.combine(add_months(this_month, -(i % 14)), datetime.min.time())}
+        for i in range(280)
+    ])
+    db.session.add(MonthlyExpense(id='rent', user_id=user_id, name='Rent', amount=50.0,
+                                  created_at=datetime.combine(this_month, datetime.min.time())))
+    db.session.commit()
+
+    result = runner.invoke(args=['ledger', 'rebuild'])
+    assert result.exit_code == 0, result.output
+    assert 'Rebuilt the ledger for 1 users' in result.output
+
+    query_counter.clear()
+    data = client.get('/api/finance/analytics/income-expenses?months=6', headers=headers).get_json()
+    assert len(query_counter) == 2  # Data version and the ledger
+    assert [m['month'] for m in data['income']] == [add_months(this_month, i).isoformat() for i in range(-5, 1)]
+    assert all(m['amount'] == 200.0 for m in data['income'])
+    assert data['expenses'] == [{'month': this_month.isoformat(), 'amount': 50.0}]
+    assert data['net'][-1] == {'month': this_month.isoformat(), 'amount': 150.0}
+
+    # Months are clamped rather than stepping past year 1
+    response = client.get('/api/finance/analytics/income-expenses?months=100000', headers=headers)
+    assert response.status_code == 200
+    assert len(response.get_json()['income']) == 14
+
+def test_add_months():
+    assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+    assert add_months(date(2024, 11, 1), 14) == date(2026, 1, 1)
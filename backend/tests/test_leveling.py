@@ -0,0 +1,50 @@
+import pytest
+from app.leveling import (
+    calculate_xp_for_level,
+    xp_required_for_level,
+    level_for_xp,
+    get_current_level_and_next_xp,
+    get_level_progress
+)
+from app.models import User
+
+def linear_level(total_xp):
+    """Reference implementation walking the levels one by one."""
+    level, threshold = 1, 0
+    while threshold + calculate_xp_for_level(level) <= total_xp:
+        threshold += calculate_xp_for_level(level)
+        level += 1
+    return level
+
+def test_thresholds_are_cumulative():
+    """Test the threshold table sums the per-level costs"""
+    assert xp_required_for_level(1) == 0
+    assert xp_required_for_level(2) == calculate_xp_for_level(1)
+    assert xp_required_for_level(3) == calculate_xp_for_level(1) + calculate_xp_for_level(2)
+
+@pytest.mark.parametrize('total_xp', [0, 1, 500, 501, 1003, 1004, 25_000, 999_999, 5_000_000])
+def test_level_for_xp_matches_linear_walk(total_xp):
+    """Test bisection agrees with the level-by-level loop"""
+    assert level_for_xp(total_xp) == linear_level(total_xp)
+
+def test_level_lookup_extends_table():
+    """Test XP beyond the precomputed table still resolves"""
+    total_xp = 10 ** 11
+    level, next_xp = get_current_level_and_next_xp(total_xp)
+    assert xp_required_for_level(level) <= total_xp < next_xp
+    assert next_xp == xp_required_for_level(level + 1)
+
+def test_level_progress():
+    """Test progress within the current level"""
+    assert get_level_progress(None) == (1, 0, calculate_xp_for_level(1))
+    level, xp_into_level, xp_for_level = get_level_progress(xp_required_for_level(4) + 10)
+    assert (level, xp_into_level, xp_for_level) == (4, 10, calculate_xp_for_level(4))
+
+def test_user_add_xp_uses_total_xp():
+    """Test the User model levels up from its total XP"""
+    user = User(level=1, current_xp=0, multiplier=2)
+    earned = user.add_xp(600)
+    assert earned == 1200
+    assert user.current_xp == 1200
+    assert user.level == level_for_xp(1200) == 3
+    assert user.xp_to_next_level == xp_required_for_level(4) - 1200
@@ -0,0 +1,72 @@
+import json
+import logging
+import pytest
+from app.log import DebugSampler, JsonFormatter, APP_LOGGER
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+@pytest.fixture
+def app_logger(app):
+    """Capture records reaching the "app" logger at DEBUG level."""
+    logger = logging.getLogger(APP_LOGGER)
+    level = logger.level
+    handler = ListHandler()
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    yield handler
+    logger.removeHandler(handler)
+    logger.setLevel(level)
+
+def test_records_carry_request_context(client, auth_tokens, app_logger):
+    """Route logs are tagged with request ID, user ID and endpoint"""
+    response = client.get('/api/tracking/all-activities', headers={
+        'Authorization': f'Bearer {auth_tokens["access_token"]}',
+        'X-Request-ID': 'req-123'
+    })
+    assert response.status_code == 200
+    assert response.headers['X-Request-ID'] == 'req-123'
+
+    records = [r for r in app_logger.records if r.name == 'app.routes.tracking']
+    assert records
+    entry = json.loads(JsonFormatter().format(records[0]))
+    assert entry['level'] == 'DEBUG'
+    assert entry['request_id'] == 'req-123'
+    assert entry['user_id'] == auth_tokens['user']['id']
+    assert entry['endpoint'] == 'tracking.get_all_activities'
+
+    # A request ID is generated when the client does not send one
+    response = client.get('/')
+    assert len(response.headers['X-Request-ID']) == 32
+
+def test_disabled_levels_are_not_formatted(app):
+    """Arguments of disabled debug calls are never converted to strings"""
+    class Expensive:
+        calls = 0
+
+        def __str__(self):
+            Expensive.calls += 1
+            return 'expensive'
+
+    logger = logging.getLogger('app.routes.tracking')
+    assert not logger.isEnabledFor(logging.DEBUG)
+    logger.debug("State: %s", Expensive())
+    assert Expensive.calls == 0
+
+def test_debug_sampler_limits_rate():
+    """Debug records are capped per logger per second; warnings always pass"""
+    sampler = DebugSampler(max_per_second=3)
+
+    def record(name, level=logging.DEBUG):
+        return logging.LogRecord(name, level, __file__, 1, 'message', None, None)
+
+    assert [sampler.filter(record('a')) for _ in range(5)] == [True, True, True, False, False]
+    assert sampler.filter(record('b'))
+    assert sampler.filter(record('a', logging.WARNING))
+
+    assert not DebugSampler(sample_rate=0.0).filter(record('a'))
@@ -0,0 +1,120 @@
+import pytest
+from datetime import date, datetime, timedelta
+from app.models import User, Journal, DailyCheckIn, Achievement
+from app.extensions import db
+from app.pagination import encode_cursor, decode_cursor, InvalidCursor
+
+def walk(client, url, headers, limit):
+    """Follow next_cursor from the first page to the last; returns the pages."""
+    pages = []
+    cursor = ''
+    while cursor is not None:
+        separator = '&' if '?' in url else '?'
+        data = client.get(f'{url}{separator}cursor={cursor}&limit={limit}', headers=headers).get_json()
+        pages.append(data)
+        cursor = data['next_cursor']
+    return pages
+
+def test_cursor_pagination_matches_page_mode(client, auth_tokens, query_counter):
+    """Cursor pages visit every row once, in the same order as page mode"""
+    user = User.query.first()
+    start = datetime(2026, 1, 1)
+    # Pairs of journals share a timestamp so the id tie-breaker matters
+    db.session.add_all([
+        Journal(id=f'journal-{i:02d}', user_id=user.id, content=f'Entry {i}',
+                title=None if i % 4 == 0 else f'Title {i % 3}',
+                created_at=start + timedelta(days=i // 2))
+        for i in range(23)
+    ])
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+
+    pages = walk(client, '/api/tracking/journals', headers, 5)
+    assert [len(p['items']) for p in pages] == [5, 5, 5, 5, 3]
+    assert 'total' not in pages[0]
+    keyset_ids = [item['id'] for p in pages for item in p['items']]
+    assert len(set(keyset_ids)) == 23
+
+    # Same order as page mode apart from ties, which keyset breaks by id
+    expected = sorted(range(23), key=lambda i: (i // 2, i), reverse=True)
+    assert keyset_ids == [f'journal-{i:02d}' for i in expected]
+    page_mode = client.get('/api/tracking/journals?per_page=100', headers=headers).get_json()
+    assert [item['created_at'] for item in page_mode['items']] == \
+        [item['created_at'] for p in pages for item in p['items']]
+
+    # A deep page is a single seek with no COUNT(*)
+    query_counter.clear()
+    client.get(f'/api/tracking/journals?cursor={pages[2]["next_cursor"]}&limit=5', headers=headers)
+    selects = [s for s in query_counter if 'journals' in s]
+    assert len(selects) == 1
+    assert 'count(' not in selects[0].lower()
+    assert '(journals.created_at, journals.id) <' in selects[0]
+
+    # Nullable sort columns continue into the NULL section in both directions
+    for direction in ['asc', 'desc']:
+        pages = walk(client, f'/api/tracking/journals?sort_by=title&direction={direction}', headers, 4)
+        ids = [item['id'] for p in pages for item in p['items']]
+        assert sorted(ids) == sorted(f'journal-{i:02d}' for i in range(23))
+        assert sum(1 for p in pages for item in p['items'] if item['title'] is None) == 6
+
+    data = client.get('/api/tracking/journals?cursor=&limit=5&include_total=true', headers=headers).get_json()
+    assert data['total'] == 23
+
+def test_cursor_pagination_dates_and_cached_lists(client, auth_tokens):
+    """Date sort keys and in-memory reference lists page the same way"""
+    user = User.query.first()
+    db.session.add_all([
+        DailyCheckIn(id=f'check-in-{i}', user_id=user.id, date=datetime(2026, 3, 1 + i).date())
+        for i in range(7)
+    ])
+    db.session.add_all([Achievement(id=f'a-{i}', name=f'Achievement {i}', xp_reward=10 * (i % 3 + 1))
+                        for i in range(7)])
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+
+    pages = walk(client, '/api/gamification/check-ins', headers, 3)
+    assert [item['date'] for p in pages for item in p['items']] == \
+        [f'2026-03-0{7 - i}' for i in range(7)]
+
+    pages = walk(client, '/api/gamification/achievements?sort_by=xp_reward&direction=desc', headers, 3)
+    rewards = [item['xp_reward'] for p in pages for item in p['items']]
+    assert rewards == sorted(rewards, reverse=True)
+    assert len({item['id'] for p in pages for item in p['items']}) == 7
+
+def test_invalid_cursor(client, auth_tokens):
+    """Malformed cursors and cursors from another sort order are rejected"""
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    response = client.get('/api/tracking/journals?cursor=not-a-cursor', headers=headers)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+    cursor = encode_cursor('title', 'asc', 'Title', 'journal-1')
+    response = client.get(f'/api/tracking/journals?cursor={cursor}', headers=headers)
+    assert response.status_code == 400
+
+    assert decode_cursor(encode_cursor('date', 'desc', datetime(2026, 1, 2, 3, 4), 'x'), 'date', 'desc') == \
+        (datetime(2026, 1, 2, 3, 4), 'x')
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, 'title', 'desc')
+
+def test_cursor_values_must_match_the_sort_key(client, auth_tokens):
+    """A cursor value of the wrong type is a 400, not a comparison error"""
+    db.session.add_all([Achievement(id=f'a-{i}', name=f'Achievement {i}', xp_reward=10.0) for i in range(3)])
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+
+    for value, row_id in [('ten', 'a-1'), ({'date': '2026-01-01'}, 'a-1'), (10, 1), (True, 'a-1')]:
+        cursor = encode_cursor('xp_reward', 'desc', value, row_id)
+        response = client.get(f'/api/gamification/achievements?sort_by=xp_reward&direction=desc&cursor={cursor}',
+                              headers=headers)
+        assert response.status_code == 400
+    cursor = encode_cursor('xp_reward', 'desc', 10, 'a-1')
+    response = client.get(f'/api/gamification/achievements?sort_by=xp_reward&direction=desc&cursor={cursor}',
+                          headers=headers)
+    assert response.status_code == 200
+
+    cursor = encode_cursor('created_at', 'desc', 'yesterday', 'journal-1')
+    assert client.get(f'/api/tracking/journals?cursor={cursor}', headers=headers).status_code == 400
+    with pytest.raises(InvalidCursor):
+        decode_cursor(encode_cursor('date', 'desc', datetime(2026, 1, 2), 'x'), 'date', 'desc', date)
+
@@ -0,0 +1,116 @@
+import hashlib
+import io
+import os
+import time
+import pytest
+from app.models import ProgressPhoto
+from app.storage import get_photo_storage
+from app.thumbnails import sweep_unreferenced_blobs
+
+IMAGE = b'\xff\xd8\xff\xe0' + bytes(range(256)) * 1000
+
+@pytest.fixture
+def photo_root(app, tmp_path):
+    app.config['PHOTO_STORAGE_ROOT'] = str(tmp_path)
+    app.extensions.pop('photo_storage', None)
+    return tmp_path
+
+def upload(client, headers, body=IMAGE, content_type='image/jpeg', **fields):
+    data = {'file': (io.BytesIO(body), 'photo.jpg', content_type), **fields}
+    return client.post('/api/tracking/progress-photos/upload', headers=headers, data=data,
+                       content_type='multipart/form-data')
+
+def stored_files(root):
+    return sorted(name for _, _, names in os.walk(root) for name in names)
+
+def test_upload_is_content_addressed_and_deduplicated(client, auth_tokens, photo_root, runner):
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    digest = hashlib.sha256(IMAGE).hexdigest()
+
+    first = upload(client, headers, category='front', notes='Week 1', date='2024-05-01T08:00:00')
+    assert first.status_code == 201
+    data = first.get_json()
+    assert data['photo_url'] == f'/api/tracking/progress-photos/{data["id"]}/file'
+    assert (data['category'], data['notes'], data['file_size']) == ('front', 'Week 1', len(IMAGE))
+    assert os.path.exists(photo_root / digest[:2] / digest[2:4] / digest)
+
+    # The same bytes again are stored once
+    second = upload(client, headers, category='side')
+    assert second.status_code == 201
+    assert stored_files(photo_root) == [digest]
+
+    # The file is only swept once no photo uses it and it has not been saved again recently
+    client.delete(f'/api/tracking/progress-photos/{data["id"]}', headers=headers)
+    assert sweep_unreferenced_blobs(grace_seconds=0) == 0
+    assert stored_files(photo_root) == [digest]
+    client.delete(f'/api/tracking/progress-photos/{second.get_json()["id"]}', headers=headers)
+    assert stored_files(photo_root) == [digest]
+    assert sweep_unreferenced_blobs() == 0
+    result = runner.invoke(args=['photos', 'sweep', '--grace-seconds', '0'])
+    assert 'Deleted 1 unreferenced photo files' in result.output
+    assert stored_files(photo_root) == []
+
+def test_sweep_keeps_files_reused_by_a_concurrent_upload(client, auth_tokens, photo_root):
+    """An upload that reuses an unreferenced file before its photo commits keeps the file"""
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    digest = hashlib.sha256(IMAGE).hexdigest()
+    photo_id = upload(client, headers, category='front').get_json()['id']
+    client.delete(f'/api/tracking/progress-photos/{photo_id}', headers=headers)
+    path = photo_root / digest[:2] / digest[2:4] / digest
+    os.utime(path, (time.time() - 7200, time.time() - 7200))
+
+    # An identical upload finds the file, and its photo is not committed yet
+    storage = get_photo_storage()
+    assert storage.save([IMAGE]).created is False
+    since = time.time() - 60
+    assert storage.delete_unless_modified(digest, since) is False
+    assert sweep_unreferenced_blobs(grace_seconds=60) == 0
+    assert path.exists()
+
+    # Once the file has been moved away, an identical upload writes it again
+    assert storage.delete_unless_modified(digest, time.time() + 1) is True
+    assert not path.exists()
+    assert storage.save([IMAGE]).created is True
+    assert path.read_bytes() == IMAGE
+
+def test_upload_rejects_invalid_photos(client, auth_tokens, photo_root, app):
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    assert upload(client, headers, category='top').status_code == 400
+    assert upload(client, headers, content_type='text/html', category='front').status_code == 400
+    assert client.post('/api/tracking/progress-photos/upload', headers=headers,
+                       data={'category': 'front'}, content_type='multipart/form-data').status_code == 400
+    app.config['MAX_PHOTO_SIZE'] = 1024
+    assert upload(client, headers, category='front').status_code == 413
+    # Nothing is left behind after a sweep, not even temporary files
+    sweep_unreferenced_blobs(grace_seconds=0)
+    assert stored_files(photo_root) == []
+    assert ProgressPhoto.query.count() == 0
+
+def test_download_supports_etag_and_ranges(client, auth_tokens, photo_root):
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    # Raw image bodies take their fields from the query string
+    response = client.post('/api/tracking/progress-photos/upload?category=back', headers=headers,
+                           data=IMAGE, content_type='image/jpeg')
+    assert response.status_code == 201
+    url = response.get_json()['photo_url']
+
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    assert response.data == IMAGE
+    assert response.mimetype == 'image/jpeg'
+    assert response.headers['ETag'] == f'"{hashlib.sha256(IMAGE).hexdigest()}"'
+    assert 'private' in response.headers['Cache-Control']
+
+    cached = client.get(url, headers={**headers, 'If-None-Match': response.headers['ETag']})
+    assert cached.status_code == 304
+
+    partial = client.get(url, headers={**headers, 'Range': 'bytes=4-99'})
+    assert partial.status_code == 206
+    assert partial.data == IMAGE[4:100]
+    assert partial.headers['Content-Range'] == f'bytes 4-99/{len(IMAGE)}'
+
+    # Photos hosted elsewhere have no file to serve
+    linked = client.post('/api/tracking/progress-photos', headers=headers,
+                         json={'photo_url': 'https://example.com/a.jpg', 'category': 'front'}).get_json()
+    assert client.get(f'/api/tracking/progress-photos/{linked["id"]}/file', headers=headers).status_code == 404
+    assert get_photo_storage().exists(hashlib.sha256(IMAGE).hexdigest())
@@ -0,0 +1,59 @@
+from datetime import date
+import numpy as np
+from app.projection import RecurringItem, expand_items, project_cash_flow
+
+def test_expand_items_places_occurrences():
+    start = date(2024, 1, 29)  # A Monday
+    items = [
+        RecurringItem(10.0, date(2024, 1, 1), 'weekly', 1),     # Mondays, started in the past
+        RecurringItem(1.0, date(2024, 2, 2), 'daily', 2),       # Daily from Feb 2
+        RecurringItem(100.0, date(2023, 5, 31), 'monthly', 31)  # Last day of every month
+    ]
+    flows = expand_items(items, start, 40)
+    days = {str(np.datetime64(start) + i): flows[i] for i in np.flatnonzero(flows)}
+    assert days['2024-01-29'] == 10
+    assert days['2024-02-05'] == 11
+    assert days['2024-01-31'] == 100
+    assert days['2024-02-29'] == 101  # Leap day stands in for the 31st
+    assert days['2024-03-03'] == 1
+    assert '2024-02-01' not in days
+    assert flows.sum() == 6 * 10 + 36 * 1 + 2 * 100
+
+def test_monthly_items_do_not_start_before_their_anchor():
+    flows = expand_items([RecurringItem(50.0, date(2024, 3, 10), 'monthly', 5)], date(2024, 3, 1), 60)
+    # March 5th is before the anchor, April 5th is the first occurrence
+    assert np.flatnonzero(flows).tolist() == [35]
+
+def test_projection_totals_and_first_negative_day():
+    incomes = [RecurringItem(1000.0, date(2024, 1, 15), 'monthly', 15)]
+    expenses = [RecurringItem(1500.0, date(2024, 1, 1), 'monthly', 1)]
+    projection = project_cash_flow(incomes, expenses, date(2024, 1, 1), 91, starting_balance=2000.0)
+    assert projection['first_negative_date'] == '2024-03-01'
+    assert projection['ending_balance'] == 500.0
+    assert projection['lowest_balance'] == {'date': '2024-03-01', 'amount': -500.0}
+    assert [(m['month'], m['net'], m['balance']) for m in projection['monthly']] == [
+        ('2024-01-01', -500.0, 1500.0), ('2024-02-01', -500.0, 1000.0), ('2024-03-01', -500.0, 500.0)
+    ]
+
+def test_projection_route(client, auth_tokens):
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    client.post('/api/finance/income', headers=headers, json={
+        'name': 'Salary', 'amount': 3000, 'date': '2020-01-01T00:00:00',
+        'is_recurring': True, 'frequency': 'monthly'
+    })
+    client.post('/api/finance/monthly-expenses', headers=headers,
+                json={'name': 'Rent', 'amount': 1000, 'due_date': 1})
+    client.post('/api/finance/monthly-expenses', headers=headers,
+                json={'name': 'Gym', 'amount': 50, 'due_date': 3, 'is_recurring': False})
+
+    data = client.get('/api/finance/analytics/projection?horizon_days=3650', headers=headers).get_json()
+    assert data['horizon_days'] == 3650
+    assert len(data['monthly']) in (120, 121)
+    # Both fall on the 1st from this month on; the one-off gym fee is not projected
+    paydays = sum(1 for m in data['monthly'] if m['income'])
+    assert paydays >= 119
+    assert (data['total_income'], data['total_expenses']) == (3000 * paydays, 1000 * paydays)
+    assert data['first_negative_date'] is None
+
+    assert client.get('/api/finance/analytics/projection?horizon_days=0', headers=headers).status_code == 400
+    assert client.get('/api/finance/analytics/projection?horizon_days=99999', headers=headers).status_code == 400
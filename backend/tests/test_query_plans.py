@@ -0,0 +1,124 @@
+"""Query-plan regression tests for the per-user access paths.
+
+Every statement a route runs is captured and EXPLAINed; a plan that reads
+one of the per-user tables without an index fails the test. SQLite always
+runs; PostgreSQL runs when TEST_POSTGRES_URL points at an empty database.
+"""
+import os
+import re
+import uuid
+import pytest
+from datetime import datetime, timezone
+from sqlalchemy import event
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.extensions import db
+from app.models import (
+    User, Activity, UserActivity, UserActivityLog, Journal, WeightLog, ProgressPhoto,
+    Income, DailyCheckIn
+)
+
+PER_USER_TABLES = [
+    'user_activities', 'user_activity_logs', 'journals', 'weight_logs',
+    'progress_photos', 'income', 'daily_check_ins',
+    'daily_weight_rollups', 'daily_mood_rollups', 'daily_photo_rollups', 'monthly_ledger_rollups',
+    'goal_forecasts'
+]
+
+ROUTES = [
+    '/api/tracking/journals',
+    '/api/tracking/journals?mood=happy',
+    '/api/tracking/weight-logs',
+    '/api/tracking/progress-photos',
+    '/api/tracking/analytics/weight-trend',
+    '/api/tracking/analytics/weight-trend?bucket=week',
+    '/api/tracking/analytics/mood-trend',
+    '/api/tracking/analytics/mood-trend?granularity=month',
+    '/api/tracking/analytics/progress-summary',
+    '/api/tracking/all-activities',
+    '/api/tracking/user-stats',
+    '/api/tracking/dashboard',
+    '/api/finance/income',
+    '/api/finance/analytics/income-expenses',
+    '/api/finance/analytics/goal-forecast',
+    '/api/gamification/check-ins',
+    '/api/gamification/analytics/check-in-streak',
+    '/api/gamification/analytics/xp-summary'
+]
+
+@pytest.fixture(params=['sqlite', 'postgresql'])
+def plan_app(request):
+    if request.param == 'postgresql':
+        url = os.environ.get('TEST_POSTGRES_URL')
+        if not url:
+            pytest.skip('TEST_POSTGRES_URL is not set')
+    app = create_app('testing')
+    if request.param == 'postgresql':
+        app.config['SQLALCHEMY_DATABASE_URI'] = url
+        # Re-initialize the engine for the new URL
+        app.extensions.pop('sqlalchemy')
+        db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def seed(user_id):
+    now = datetime.now(timezone.utc)
+    db.session.add(User(id=user_id, email=f'{user_id}@example.com', username=user_id, password_hash='x'))
+    db.session.add(Activity(id=f'{user_id}-activity', name='Activity', category='Mind + Body'))
+    db.session.add(UserActivity(id=f'{user_id}-ua', user_id=user_id, activity_id=f'{user_id}-activity',
+                                activity_name='Activity', category='Mind + Body'))
+    db.session.add(UserActivityLog(id=f'{user_id}-log', user_id=user_id, activity_id=f'{user_id}-activity',
+                                   xp_earned=10))
+    db.session.add(Journal(id=f'{user_id}-journal', user_id=user_id, content='Entry', mood='happy'))
+    db.session.add(WeightLog(id=f'{user_id}-weight', user_id=user_id, weight=80, date=now))
+    db.session.add(ProgressPhoto(id=f'{user_id}-photo', user_id=user_id, photo_url='x', category='front', date=now))
+    db.session.add(Income(id=f'{user_id}-income', user_id=user_id, name='Salary', amount=100, date=now))
+    db.session.add(DailyCheckIn(id=f'{user_id}-check-in', user_id=user_id, date=now.date()))
+
+def explain(statement, parameters):
+    conn = db.session.connection()
+    if conn.dialect.name == 'postgresql':
+        conn.exec_driver_sql('SET enable_seqscan = off')
+        rows = conn.exec_driver_sql('EXPLAIN ' + statement, parameters).fetchall()
+        return [row[0] for row in rows]
+    rows = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+    return [row[-1] for row in rows]
+
+def full_scans(plan):
+    """Return the per-user tables the plan reads without an index."""
+    scanned = []
+    for line in plan:
+        for table in PER_USER_TABLES:
+            if re.search(rf'\bSeq Scan on {table}\b', line) or re.match(rf'SCAN {table}\b', line):
+                scanned.append(table)
+    return scanned
+
+@pytest.mark.parametrize('route', ROUTES)
+def test_route_queries_use_indexes(plan_app, route):
+    user_id = str(uuid.uuid4())
+    seed(user_id)
+    seed(str(uuid.uuid4()))
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+            captured.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = plan_app.test_client().get(route, headers=headers)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+    assert response.status_code == 200
+    assert captured
+
+    for statement, parameters in captured:
+        plan = explain(statement, parameters)
+        assert not full_scans(plan), f'{route} scans without an index:\n{statement}\n' + '\n'.join(plan)
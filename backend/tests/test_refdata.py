@@ -0,0 +1,81 @@
+import pytest
+from app.models import Activity, Achievement, ReferenceDataVersion
+from app.extensions import db
+from app.refdata import get_reference_data, bump_reference_version
+from app.pagination import paginate_snapshot
+from werkzeug.exceptions import NotFound
+
+def make_activity(activity_id, **kwargs):
+    return Activity(id=activity_id, name=activity_id, category='Mind + Body', type='physical', **kwargs)
+
+def test_activity_catalog_is_cached(app, query_counter):
+    """Repeated reads are served from the snapshot until the version changes"""
+    db.session.add_all([make_activity('default-1'), make_activity('default-2'),
+                        make_activity('retired', is_active=False)])
+    db.session.commit()
+
+    activities = get_reference_data('activities')
+    assert sorted(a.id for a in activities) == ['default-1', 'default-2']
+    with pytest.raises(AttributeError):
+        activities[0].name = 'changed'
+
+    query_counter.clear()
+    assert get_reference_data('activities') is activities
+    assert len(query_counter) == 0
+
+    # A write through the versioned path drops the snapshot on commit
+    db.session.add(make_activity('default-3'))
+    bump_reference_version('activities')
+    db.session.commit()
+    assert len(get_reference_data('activities')) == 3
+
+def test_version_row_invalidates_other_workers(app):
+    """Another process bumping the version row is noticed on the next check"""
+    app.config['REFERENCE_CACHE_CHECK_SECONDS'] = 0
+    app.extensions.pop('reference_cache', None)
+    db.session.add(Achievement(id='a-1', name='First', xp_reward=10))
+    db.session.commit()
+    assert len(get_reference_data('achievements')) == 1
+
+    # Simulate a write from another worker: new row and version, no local invalidation
+    db.session.add(Achievement(id='a-2', name='Second', xp_reward=20))
+    db.session.add(ReferenceDataVersion(name='achievements', version=1))
+    db.session.commit()
+    assert len(get_reference_data('achievements')) == 2
+
+    # A rolled back write keeps the snapshot
+    snapshot = get_reference_data('achievements')
+    bump_reference_version('achievements')
+    db.session.rollback()
+    assert get_reference_data('achievements') is snapshot
+
+def test_achievement_routes_use_cache(client, auth_tokens):
+    """Achievement writes are visible to the cached listing right away"""
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    assert client.get('/api/gamification/achievements', headers=headers).get_json()['total'] == 0
+
+    for name, xp in [('Beta', 20), ('Alpha', 10), ('Gamma', 30)]:
+        response = client.post('/api/gamification/achievements',
+                               json={'name': name, 'xp_reward': xp}, headers=headers)
+        assert response.status_code == 201
+
+    data = client.get('/api/gamification/achievements?per_page=2&min_xp=15', headers=headers).get_json()
+    assert [a['name'] for a in data['items']] == ['Beta', 'Gamma']
+    assert data['total'] == 2
+    assert data['pages'] == 1
+
+    data = client.get('/api/gamification/achievements?sort_by=xp_reward&direction=desc',
+                      headers=headers).get_json()
+    assert [a['xp_reward'] for a in data['items']] == [30, 20, 10]
+
+    achievement_id = data['items'][0]['id']
+    client.delete(f'/api/gamification/achievements/{achievement_id}', headers=headers)
+    assert client.get('/api/gamification/achievements', headers=headers).get_json()['total'] == 2
+
+def test_paginate_snapshot():
+    """Snapshot pagination mirrors Query.paginate"""
+    items = tuple(range(25))
+    assert paginate_snapshot(items, 3, 10) == ([20, 21, 22, 23, 24], 25, 3)
+    assert paginate_snapshot((), 1, 10) == ([], 0, 0)
+    with pytest.raises(NotFound):
+        paginate_snapshot(items, 4, 10)
@@ -0,0 +1,101 @@
+import pytest
+from datetime import datetime, timezone, timedelta
+from app.models import User, Activity, UserActivity, DailyRollover
+from app.extensions import db
+from app.rollover import run_rollover, seconds_until_next_day
+
+TODAY = datetime(2026, 10, 16, tzinfo=timezone.utc).date()
+YESTERDAY = TODAY - timedelta(days=1)
+
+def make_user(user_id, streak_days):
+    return User(
+        id=user_id,
+        email=f'{user_id}@example.com',
+        username=user_id,
+        password_hash='x',
+        streak_days=streak_days,
+        multiplier=min(streak_days, 4)
+    )
+
+def make_completion(user_id, activity_id, day):
+    return UserActivity(
+        id=f'{user_id}-{activity_id}',
+        user_id=user_id,
+        activity_id=activity_id,
+        activity_name=activity_id,
+        category='Mind + Body',
+        completed=True,
+        is_completed_today=True,
+        date=day
+    )
+
+@pytest.fixture
+def rollover_data(app):
+    db.session.add_all([
+        Activity(id=f'activity-{i}', name=f'Activity {i}', category='Mind + Body') for i in range(2)
+    ])
+    db.session.add_all([
+        make_user('user-a', 3),  # Completed yesterday and today
+        make_user('user-b', 2),  # Last completed two days ago
+        make_user('user-c', 1)   # Never completed anything
+    ])
+    db.session.add_all([
+        make_completion('user-a', 'activity-0', YESTERDAY),
+        make_completion('user-a', 'activity-1', TODAY),
+        make_completion('user-b', 'activity-0', YESTERDAY - timedelta(days=1))
+    ])
+    db.session.commit()
+
+def test_rollover_closes_out_yesterday(runner, rollover_data):
+    """Test the CLI command breaks missed streaks and resets old flags"""
+    result = runner.invoke(args=['rollover', 'run', '--date', TODAY.isoformat(), '--batch-size', '1'])
+    assert result.exit_code == 0
+    assert '3 users, 2 streaks broken, 2 flags reset' in result.output
+    
+    db.session.expire_all()
+    assert db.session.get(User, 'user-a').streak_days == 3
+    assert db.session.get(User, 'user-b').streak_days == 0
+    assert db.session.get(User, 'user-c').streak_days == 0
+    assert db.session.get(User, 'user-b').multiplier == 1.0
+    
+    # Only today's completion keeps its daily flag
+    flagged = UserActivity.query.filter_by(is_completed_today=True).all()
+    assert [ua.id for ua in flagged] == ['user-a-activity-1']
+
+    # Every user whose streak or flags changed gets a new data version, so cached responses go stale
+    assert [db.session.get(User, user_id).data_version for user_id in ['user-a', 'user-b', 'user-c']] == [1, 2, 1]
+    
+    run = db.session.get(DailyRollover, YESTERDAY)
+    assert run.completed_at is not None
+
+def test_rollover_is_idempotent(app, rollover_data):
+    """Test a second run for the same day changes nothing"""
+    first = run_rollover(today=TODAY)
+    
+    # Restore a streak; a finished run must not break it again
+    db.session.get(User, 'user-c').streak_days = 5
+    db.session.commit()
+    
+    second = run_rollover(today=TODAY)
+    assert second == first
+    assert db.session.get(User, 'user-c').streak_days == 5
+
+def test_rollover_resumes_after_interruption(app, rollover_data):
+    """Test a run continues after the stored resume point"""
+    db.session.add(DailyRollover(day=YESTERDAY, last_user_id='user-b', users_processed=2,
+                                 streaks_broken=0, flags_reset=0))
+    db.session.commit()
+    
+    summary = run_rollover(today=TODAY)
+    assert summary['users_processed'] == 3
+    assert summary['streaks_broken'] == 1
+    
+    db.session.expire_all()
+    # user-b was already processed, so its state is left alone
+    assert db.session.get(User, 'user-b').streak_days == 2
+    assert db.session.get(User, 'user-c').streak_days == 0
+
+def test_seconds_until_next_day():
+    """Test the scheduler wakes at the next UTC midnight"""
+    now = datetime(2026, 10, 16, 23, 59, 30, tzinfo=timezone.utc)
+    assert seconds_until_next_day(now) == 30
@@ -0,0 +1,85 @@
+import io
+from datetime import date
+from sqlalchemy import delete
+from app.extensions import db
+from app.models import WeightLog, DailyWeightRollup, DailyMoodRollup, DailyPhotoRollup
+from app.rollups import rebuild_rollups, upsert_from_select, day_of, ROLLUPS
+
+def rollup_rows(model, *columns):
+    return sorted(tuple(getattr(row, column) for column in columns) for row in model.query.all())
+
+def test_weight_rollups_follow_route_writes(client, auth_tokens):
+    """Creates, date changes and deletes refresh the affected days in the same request"""
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    ids = [client.post('/api/tracking/weight-logs', json={'weight': weight, 'date': when},
+                       headers=headers).get_json()['id']
+           for weight, when in [(80, '2024-05-01T07:00:00'), (82, '2024-05-01T21:00:00'),
+                                (81, '2024-05-02T07:00:00')]]
+    assert rollup_rows(DailyWeightRollup, 'day', 'min_weight', 'max_weight', 'total_weight', 'count') == [
+        (date(2024, 5, 1), 80.0, 82.0, 162.0, 2),
+        (date(2024, 5, 2), 81.0, 81.0, 81.0, 1)
+    ]
+
+    # Moving a weigh-in refreshes both the old and the new day
+    client.put(f'/api/tracking/weight-logs/{ids[1]}', json={'date': '2024-05-03T07:00:00'}, headers=headers)
+    assert rollup_rows(DailyWeightRollup, 'day', 'count') == [
+        (date(2024, 5, 1), 1), (date(2024, 5, 2), 1), (date(2024, 5, 3), 1)
+    ]
+
+    client.delete(f'/api/tracking/weight-logs/{ids[2]}', headers=headers)
+    assert rollup_rows(DailyWeightRollup, 'day', 'count') == [(date(2024, 5, 1), 1), (date(2024, 5, 3), 1)]
+
+def test_mood_and_photo_rollups(client, auth_tokens, query_counter):
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    journal = client.post('/api/tracking/journals', json={'content': 'Good day', 'mood': 'happy'},
+                          headers=headers).get_json()
+    client.post('/api/tracking/journals', json={'content': 'No mood'}, headers=headers)
+    today = date.fromisoformat(journal['created_at'][:10])
+    assert rollup_rows(DailyMoodRollup, 'day', 'mood', 'count') == [(today, 'happy', 1)]
+
+    client.put(f'/api/tracking/journals/{journal["id"]}', json={'mood': 'calm'}, headers=headers)
+    assert rollup_rows(DailyMoodRollup, 'mood', 'count') == [('calm', 1)]
+
+    # Edits that do not touch the rolled up columns leave the rollups alone
+    query_counter.clear()
+    client.put(f'/api/tracking/journals/{journal["id"]}', json={'content': 'Great day'}, headers=headers)
+    assert not [statement for statement in query_counter if 'daily_mood_rollups' in statement]
+
+    photo = client.post('/api/tracking/progress-photos', headers=headers, json={
+        'photo_url': 'https://example.com/front.jpg', 'category': 'front', 'date': '2024-05-01T08:00:00'
+    }).get_json()
+    client.put(f'/api/tracking/progress-photos/{photo["id"]}', json={'category': 'side'}, headers=headers)
+    assert rollup_rows(DailyPhotoRollup, 'day', 'category', 'count') == [(date(2024, 5, 1), 'side', 1)]
+
+def test_weight_import_and_rebuild(client, auth_tokens, runner):
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    body = b'weight,date\n80,2024-06-01T07:00:00\n81,2024-06-01T19:00:00\n79,2024-06-02T07:00:00\n'
+    client.post('/api/tracking/weight-logs/import', headers=headers, content_type='multipart/form-data',
+                data={'file': (io.BytesIO(body), 'weights.csv')})
+    expected = [(date(2024, 6, 1), 161.0, 2), (date(2024, 6, 2), 79.0, 1)]
+    assert rollup_rows(DailyWeightRollup, 'day', 'total_weight', 'count') == expected
+
+    # A backfill recomputes everything from the source rows
+    db.session.execute(delete(DailyWeightRollup))
+    db.session.commit()
+    result = runner.invoke(args=['rollups', 'rebuild', '--batch-size', '1'])
+    assert result.exit_code == 0, result.output
+    assert 'Rebuilt rollups for 1 users' in result.output
+    db.session.expire_all()
+    assert rollup_rows(DailyWeightRollup, 'day', 'total_weight', 'count') == expected
+    assert rebuild_rollups(user_id='missing') == 0
+
+def test_rollup_upsert_overwrites_rows_inserted_concurrently(client, auth_tokens):
+    """The insert half of a refresh updates a row another transaction inserted after our delete"""
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    client.post('/api/tracking/weight-logs', json={'weight': 80, 'date': '2024-05-01T07:00:00'}, headers=headers)
+    db.session.execute(DailyWeightRollup.__table__.update().values(total_weight=1.0, count=9))
+
+    _, _, _, target, rows, columns = ROLLUPS['weight']
+    connection = db.session.connection()
+    day = day_of(WeightLog.date, connection.dialect.name)
+    connection.execute(upsert_from_select(connection.dialect.name, target.__table__, columns,
+                                          rows(day).where(WeightLog.user_id == auth_tokens['user']['id'])))
+    db.session.commit()
+    assert rollup_rows(DailyWeightRollup, 'day', 'total_weight', 'count') == [(date(2024, 5, 1), 80.0, 1)]
+
@@ -0,0 +1,88 @@
+from app.models import Journal
+from app.extensions import db
+from sqlalchemy import text
+
+def search(client, headers, q, **params):
+    query = '&'.join([f'q={q}'] + [f'{k}={v}' for k, v in params.items()])
+    return client.get(f'/api/tracking/journals/search?{query}', headers=headers)
+
+def test_journal_search_ranks_and_highlights(client, auth_tokens):
+    """Matches are ranked, highlighted and escaped; other users' entries never match"""
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    for title, content in [
+        ('Morning meditation', 'Sat quietly for ten minutes before work.'),
+        ('Gym', 'Ran five kilometres, then some meditation to cool down.'),
+        ('Groceries', 'Bought <b>apples</b> and bread.')
+    ]:
+        assert client.post('/api/tracking/journals', json={'title': title, 'content': content},
+                           headers=headers).status_code == 201
+    db.session.add(Journal(id='other-user', user_id='someone-else', title='Meditation', content='Meditation'))
+    db.session.commit()
+
+    data = search(client, headers, 'meditation').get_json()
+    assert [item['title'] for item in data['items']] == ['Morning meditation', 'Gym']
+    assert data['items'][0]['title_highlight'] == 'Morning <mark>meditation</mark>'
+    assert '<mark>meditation</mark>' in data['items'][1]['snippet']
+    assert data['next_cursor'] is None
+    # Timestamps are formatted like the journal list's
+    listed = client.get('/api/tracking/journals', headers=headers).get_json()['items']
+    assert {item['created_at'] for item in data['items']} <= {item['created_at'] for item in listed}
+
+    # Porter stemming and prefix matching on the last word
+    assert [item['title'] for item in search(client, headers, 'kilometre').get_json()['items']] == ['Gym']
+    assert len(search(client, headers, 'medit').get_json()['items']) == 2
+
+    # User content is escaped around the highlight markers
+    snippet = search(client, headers, 'apples').get_json()['items'][0]['snippet']
+    assert snippet == 'Bought &lt;b&gt;<mark>apples</mark>&lt;/b&gt; and bread.'
+
+    # FTS operators in the query are treated as plain words
+    assert search(client, headers, 'bread" OR NEAR(').status_code == 200
+    assert search(client, headers, '').status_code == 400
+    assert search(client, headers, '%21%21').status_code == 400
+
+def test_journal_search_tracks_writes_and_pages(client, auth_tokens):
+    """Updates and deletes are reflected immediately; results page by cursor"""
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    ids = [
+        client.post('/api/tracking/journals', json={'title': f'Entry {i}', 'content': 'walking ' * (i + 1)},
+                    headers=headers).get_json()['id']
+        for i in range(5)
+    ]
+
+    seen = []
+    cursor = ''
+    while cursor is not None:
+        data = search(client, headers, 'walk', limit=2, cursor=cursor).get_json()
+        seen += [item['id'] for item in data['items']]
+        cursor = data['next_cursor']
+    assert sorted(seen) == sorted(ids)
+    # Entries repeating the word more often rank higher
+    assert seen[0] == ids[-1]
+
+    client.put(f'/api/tracking/journals/{ids[0]}', json={'content': 'swimming'}, headers=headers)
+    client.delete(f'/api/tracking/journals/{ids[1]}', headers=headers)
+    assert len(search(client, headers, 'walk').get_json()['items']) == 3
+    assert [item['id'] for item in search(client, headers, 'swim').get_json()['items']] == [ids[0]]
+
+    # The index is keyed on journal ids, so renumbered rowids (as VACUUM may do) change nothing
+    db.session.execute(text('UPDATE journals SET rowid = rowid + 1000'))
+    db.session.commit()
+    assert [item['id'] for item in search(client, headers, 'swim').get_json()['items']] == [ids[0]]
+    client.delete(f'/api/tracking/journals/{ids[0]}', headers=headers)
+    assert search(client, headers, 'swim').get_json()['items'] == []
+    assert len(search(client, headers, 'walk').get_json()['items']) == 3
+
+def test_rebuild_search_index(client, auth_tokens, runner):
+    """The rebuild command backfills an empty index from existing journals"""
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    client.post('/api/tracking/journals', json={'title': 'Backfilled', 'content': 'old entry'}, headers=headers)
+    db.session.execute(text("DELETE FROM journals_fts"))
+    db.session.execute(text("DELETE FROM journals_fts_keys"))
+    db.session.commit()
+    assert search(client, headers, 'entry').get_json()['items'] == []
+
+    result = runner.invoke(args=['search', 'rebuild'])
+    assert result.exit_code == 0
+    assert 'Indexed 1 journals' in result.output
+    assert len(search(client, headers, 'entry').get_json()['items']) == 1
@@ -0,0 +1,87 @@
+import io
+import hashlib
+import shutil
+import pytest
+from PIL import Image
+from app.storage import get_photo_storage
+from app.thumbnails import VARIANT_NAMES, render_variants, sweep_unreferenced_blobs
+
+def image_bytes(width=2000, height=1500, image_format='PNG'):
+    output = io.BytesIO()
+    Image.new('RGB', (width, height), (200, 120, 40)).save(output, image_format)
+    return output.getvalue()
+
+@pytest.fixture
+def photo_root(app, tmp_path):
+    app.config['PHOTO_STORAGE_ROOT'] = str(tmp_path)
+    app.extensions.pop('photo_storage', None)
+    return tmp_path
+
+def test_render_variants_sizes_and_formats():
+    variants = render_variants(image_bytes())
+    assert sorted(variants) == sorted(VARIANT_NAMES)
+    with Image.open(io.BytesIO(variants['w640.webp'])) as image:
+        assert (image.format, image.size) == ('WEBP', (640, 480))
+    with Image.open(io.BytesIO(variants['w1280.jpg'])) as image:
+        assert (image.format, image.size) == ('JPEG', (1280, 960))
+    # Small originals are never upscaled
+    with Image.open(io.BytesIO(render_variants(image_bytes(400, 300))['w1280.jpg'])) as image:
+        assert image.size == (400, 300)
+
+def test_upload_renders_variants_and_lists_their_urls(client, auth_tokens, photo_root):
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    body = image_bytes()
+    digest = hashlib.sha256(body).hexdigest()
+    response = client.post('/api/tracking/progress-photos/upload?category=front', headers=headers,
+                           data=body, content_type='image/png')
+    assert response.status_code == 201
+    photo = response.get_json()
+    assert photo['variants']['w320.webp'] == f'{photo["photo_url"]}?variant=w320.webp'
+    assert all(get_photo_storage().variant_exists(digest, name) for name in VARIANT_NAMES)
+
+    variant = client.get(photo['variants']['w320.webp'], headers=headers)
+    assert variant.status_code == 200
+    assert variant.mimetype == 'image/webp'
+    assert variant.headers['ETag'] == f'"{digest}.w320.webp"'
+    assert len(variant.data) < len(body)
+    assert client.get(f'{photo["photo_url"]}?variant=w999.gif', headers=headers).status_code == 400
+
+    items = client.get('/api/tracking/progress-photos?fields=variants', headers=headers).get_json()['items']
+    assert items == [{'id': photo['id'], 'variants': photo['variants']}]
+    summary = client.get('/api/tracking/analytics/progress-summary', headers=headers).get_json()
+    assert summary['category_photos']['front'][0]['variants'] == photo['variants']
+
+    # Linked photos have no variants
+    client.post('/api/tracking/progress-photos', headers=headers,
+                json={'photo_url': 'https://example.com/a.jpg', 'category': 'side'})
+    summary = client.get('/api/tracking/analytics/progress-summary', headers=headers).get_json()
+    assert summary['category_photos']['side'][0]['variants'] == {}
+
+    # Sweeping the file of a deleted photo removes its variants too
+    client.delete(f'/api/tracking/progress-photos/{photo["id"]}', headers=headers)
+    assert sweep_unreferenced_blobs(grace_seconds=0) == 1
+    assert not get_photo_storage().variant_exists(digest, 'w320.jpg')
+
+def test_missing_variants_fall_back_and_regenerate(client, auth_tokens, photo_root, runner):
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    body = image_bytes(800, 600, 'JPEG')
+    digest = hashlib.sha256(body).hexdigest()
+    photo = client.post('/api/tracking/progress-photos/upload?category=back', headers=headers,
+                        data=body, content_type='image/jpeg').get_json()
+    storage = get_photo_storage()
+    shutil.rmtree(storage.variant_dir(digest))
+
+    # The original is served until the variant exists, but must not be cached as the variant
+    response = client.get(photo['variants']['w320.webp'], headers=headers)
+    assert response.status_code == 200
+    assert response.data == body
+    assert response.headers['Cache-Control'] == 'no-cache, private'
+    assert client.get(photo['photo_url'], headers=headers).headers['Cache-Control'] == 'private, max-age=31536000'
+
+    result = runner.invoke(args=['photos', 'variants', '--workers', '2'])
+    assert result.exit_code == 0, result.output
+    assert 'Rendered variants for 1 photos, 0 failed' in result.output
+    assert all(storage.variant_exists(digest, name) for name in VARIANT_NAMES)
+    response = client.get(photo['variants']['w320.webp'], headers=headers)
+    assert response.mimetype == 'image/webp'
+    assert response.headers['Cache-Control'] == 'private, max-age=31536000'
@@ -1,7 +1,10 @@
 import pytest
 from datetime import datetime, timezone, timedelta
-from app.models import Journal, WeightLog, ProgressPhoto, User
+from app.models import Journal, WeightLog, ProgressPhoto, User, Activity, UserActivity
+from app.reset import register_reset_hook, _reset_hooks
 from app.extensions import db
+import app.routes.tracking as tracking
+from app.refdata import get_reference_data
 
 def test_get_journals(client, auth_tokens):
     """Test getting journals with pagination and filters"""
@@ -260,4 +263,299 @@ def test_analytics(client, auth_tokens):
     assert len(data['category_photos']['front']) == 3
     assert len(data['category_photos']['side']) == 2
     assert data['total_photos'] == 5
-    assert data['weight_stats']['total_measurements'] == 5 
\ No newline at end of file
+    assert data['weight_stats']['total_measurements'] == 5
+
+def test_dashboard(client, auth_tokens, query_counter):
+    """Test the composite dashboard endpoint"""
+    user = User.query.first()
+    
+    # Create default activities and select/complete some of them
+    activities = [
+        Activity(
+            id=f'activity-{i}',
+            name=f'Activity {i}',
+            category='Mind + Body' if i % 2 == 0 else 'Growth + Creation',
+            type='physical'
+        ) for i in range(6)
+    ]
+    db.session.add_all(activities)
+    user_activities = [
+        UserActivity(
+            id=f'user-activity-{i}',
+            user_id=user.id,
+            activity_id=f'activity-{i}',
+            activity_name=f'Activity {i}',
+            category='Mind + Body' if i % 2 == 0 else 'Growth + Creation',
+            is_active=True,
+            is_completed_today=i < 2,
+            date=datetime.now(timezone.utc).date()
+        ) for i in range(4)
+    ]
+    db.session.add_all(user_activities)
+    db.session.commit()
+    
+    # Warm the shared default catalog cache
+    get_reference_data('activities')
+    
+    query_counter.clear()
+    response = client.get('/api/tracking/dashboard',
+                         headers={'Authorization': f'Bearer {auth_tokens["access_token"]}'})
+    assert response.status_code == 200
+    data = response.get_json()
+    
+    # Data version, one user lookup, one custom activity query and one user activity query
+    assert len(query_counter) == 4
+    
+    assert len(data['activities']) == 6
+    assert sum(1 for a in data['activities'] if a['is_active']) == 4
+    assert sum(1 for a in data['activities'] if a['completed_today']) == 2
+    assert len(data['categorized_activities']['Mind + Body']) == 3
+    assert data['stats']['completed_today'] == 2
+    assert data['stats']['total_activities'] == 4
+    assert data['stats']['level'] == 1
+    assert data['profile']['username'] == 'testuser'
+
+def test_batch_update_activities(client, auth_tokens, query_counter):
+    """Test the bulk select/deselect/complete endpoint"""
+    user = User.query.first()
+    
+    activities = [
+        Activity(
+            id=f'activity-{i}',
+            name=f'Activity {i}',
+            category='Mind + Body',
+            type='physical'
+        ) for i in range(10)
+    ]
+    db.session.add_all(activities)
+    db.session.add(UserActivity(
+        id='user-activity-0',
+        user_id=user.id,
+        activity_id='activity-0',
+        activity_name='Activity 0',
+        category='Mind + Body',
+        is_active=True
+    ))
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    
+    # Select two activities, deselect one and send an invalid item
+    query_counter.clear()
+    response = client.post('/api/tracking/activities/batch', json={'items': [
+        {'activity_id': 'activity-1', 'action': 'select'},
+        {'activity_id': 'activity-0', 'action': 'deselect'},
+        {'activity_id': 'activity-2', 'action': 'select'},
+        {'activity_id': 'missing', 'action': 'select'},
+        {'activity_id': 'activity-3', 'action': 'explode'}
+    ]}, headers=headers)
+    assert response.status_code == 200
+    small_batch_statements = len(query_counter)
+    data = response.get_json()
+    assert [r['status'] for r in data['results']] == ['ok', 'ok', 'ok', 'error', 'error']
+    assert data['results'][1]['is_active'] is False
+    assert data['totalXpGained'] == 0
+    
+    # Complete eight activities, including both selected ones
+    query_counter.clear()
+    response = client.post('/api/tracking/activities/batch', json={'items': [
+        {'activity_id': f'activity-{i}', 'action': 'complete'} for i in range(1, 9)
+    ]}, headers=headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert all(r['status'] == 'ok' and r['completed_today'] for r in data['results'])
+    assert data['completed_today_count'] == 8
+    assert data['totalXpGained'] == 500
+    assert data['streak'] == 1
+    
+    # Statement count does not grow with the batch size
+    assert len(query_counter) <= small_batch_statements
+    
+    selected = UserActivity.query.filter_by(user_id=user.id, is_active=True).count()
+    assert selected == 8
+    
+    # Completing again is reported but changes nothing
+    response = client.post('/api/tracking/activities/batch', json={'items': [
+        {'activity_id': 'activity-1', 'action': 'complete'}
+    ]}, headers=headers)
+    assert 'already completed' in response.get_json()['results'][0]['message']
+    
+    # Invalid payload
+    response = client.post('/api/tracking/activities/batch', json={'items': []}, headers=headers)
+    assert response.status_code == 400
+    for activity_id in ([1], {'id': 1}, True, 1.5):
+        response = client.post('/api/tracking/activities/batch', json={'items': [
+            {'activity_id': activity_id, 'action': 'select'}
+        ]}, headers=headers)
+        assert response.status_code == 400
+
+def test_update_selected_activities(client, auth_tokens, query_counter, monkeypatch):
+    """Test bulk selection keeps the statement count flat"""
+    user = User.query.first()
+    
+    activities = [
+        Activity(
+            id=f'activity-{i}',
+            name=f'Activity {i}',
+            category='Mind + Body',
+            type='physical'
+        ) for i in range(60)
+    ]
+    db.session.add_all(activities)
+    db.session.add(UserActivity(
+        id='user-activity-0',
+        user_id=user.id,
+        activity_id='activity-0',
+        activity_name='Activity 0',
+        category='Mind + Body',
+        is_active=False,
+        completed=True,
+        is_completed_today=True
+    ))
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    
+    statement_counts = []
+    for size in (5, 50):
+        query_counter.clear()
+        response = client.post('/api/tracking/activities',
+                               json={'selected_activities': [f'activity-{i}' for i in range(size)] + ['missing']},
+                               headers=headers)
+        assert response.status_code == 200
+        statement_counts.append(len(query_counter))
+        assert UserActivity.query.filter_by(user_id=user.id, is_active=True).count() == size
+    
+    assert statement_counts[0] == statement_counts[1]
+    
+    # Reselecting an existing record resets its completion state
+    reselected = UserActivity.query.filter_by(user_id=user.id, activity_id='activity-0').one()
+    assert reselected.is_active is True
+    assert reselected.is_completed_today is False
+    assert UserActivity.query.filter_by(user_id=user.id).count() == 50
+    
+    # Dialects without ON CONFLICT support fall back to update + insert
+    monkeypatch.setattr(tracking, 'UPSERT_DIALECTS', {})
+    response = client.post('/api/tracking/activities',
+                           json={'selected_activities': [f'activity-{i}' for i in range(40, 60)]},
+                           headers=headers)
+    assert response.status_code == 200
+    assert UserActivity.query.filter_by(user_id=user.id, is_active=True).count() == 20
+    assert UserActivity.query.filter_by(user_id=user.id).count() == 60
+
+def test_user_stats_and_submit_daily(client, auth_tokens, query_counter):
+    """Test user stats and daily submission share one summary query"""
+    user = User.query.first()
+    yesterday = datetime.now(timezone.utc).date() - timedelta(days=1)
+    
+    db.session.add_all([
+        Activity(id=f'activity-{i}', name=f'Activity {i}', category='Mind + Body') for i in range(4)
+    ])
+    db.session.add_all([
+        UserActivity(
+            id=f'user-activity-{i}',
+            user_id=user.id,
+            activity_id=f'activity-{i}',
+            activity_name=f'Activity {i}',
+            category='Mind + Body',
+            is_active=True,
+            completed=i < 3,
+            is_completed_today=i < 3,
+            date=yesterday
+        ) for i in range(4)
+    ])
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    
+    query_counter.clear()
+    response = client.get('/api/tracking/user-stats', headers=headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['completed_today'] == 3
+    assert data['total_activities'] == 4
+    # Data version, one user lookup and one summary query
+    assert len(query_counter) == 3
+    
+    query_counter.clear()
+    response = client.post('/api/tracking/submit-daily', headers=headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['completed_today_count'] == 3
+    assert data['totalXpGained'] == 300
+    # User lookup, summary, completion update, user update and data version bump
+    assert len(query_counter) == 5
+    
+    # A second submission on the same day is rejected
+    response = client.post('/api/tracking/submit-daily', headers=headers)
+    assert response.status_code == 400
+    assert response.get_json()['completed_today_count'] == 3
+
+def test_submit_daily_after_toggling(client, auth_tokens):
+    """Completing activities through toggle does not count as today's submission"""
+    db.session.add_all([
+        Activity(id=f'activity-{i}', name=f'Activity {i}', category='Mind + Body') for i in range(3)
+    ])
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+
+    for i in range(3):
+        response = client.post(f'/api/tracking/activities/activity-{i}/toggle', headers=headers)
+        assert response.status_code == 200
+        response = client.post(f'/api/tracking/activities/activity-{i}/toggle?complete=true', headers=headers)
+        assert response.status_code == 200
+    assert response.get_json()['can_submit_daily'] is True
+
+    response = client.post('/api/tracking/submit-daily', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['completed_today_count'] == 3
+
+    response = client.post('/api/tracking/submit-daily', headers=headers)
+    assert response.status_code == 400
+
+def test_reset_user(app, client, auth_tokens):
+    """Test chunked reset, the background job mode and reset hooks"""
+    user = User.query.first()
+    user.current_xp = 5000
+    user.level = 5
+    user.streak_days = 3
+    db.session.add_all([
+        Activity(id=f'activity-{i}', name=f'Activity {i}', category='Mind + Body') for i in range(5)
+    ])
+    db.session.add_all([
+        UserActivity(
+            id=f'user-activity-{i}',
+            user_id=user.id,
+            activity_id=f'activity-{i}',
+            activity_name=f'Activity {i}',
+            category='Mind + Body',
+            is_active=True,
+            completed=True,
+            is_completed_today=True
+        ) for i in range(5)
+    ])
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    app.config['RESET_CHUNK_SIZE'] = 2
+    
+    reset_users = []
+    register_reset_hook(reset_users.append)
+    try:
+        response = client.post('/api/tracking/reset-user', headers=headers)
+        assert response.status_code == 200
+    finally:
+        _reset_hooks.remove(reset_users.append)
+    
+    assert reset_users == [user.id]
+    user = db.session.get(User, user.id)
+    assert (user.current_xp, user.level, user.streak_days) == (0, 1, 0)
+    assert UserActivity.query.filter_by(user_id=user.id, is_active=True).count() == 0
+    assert UserActivity.query.filter_by(user_id=user.id, is_completed_today=True).count() == 0
+    
+    # Background mode returns a job that can be polled
+    response = client.post('/api/tracking/reset-user?background=true', headers=headers)
+    assert response.status_code == 202
+    job_id = response.get_json()['job_id']
+    
+    response = client.get(f'/api/user/jobs/{job_id}', headers=headers)
+    assert response.status_code == 200
+    job = response.get_json()
+    assert job['status'] == 'completed'
+    assert job['result']['activities_reset'] == 5
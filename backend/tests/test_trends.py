@@ -0,0 +1,100 @@
+from datetime import datetime, timezone, timedelta
+import numpy as np
+from sqlalchemy import insert
+from app.extensions import db
+from app.models import Journal, WeightLog
+from app.rollups import rebuild_rollups
+from app.trends import lttb, rolling_mean
+
+def test_lttb_keeps_extremes_and_endpoints():
+    x = np.arange(1000, dtype=float)
+    y = np.zeros(1000)
+    y[300], y[700] = 10.0, -10.0
+    kept = lttb(x, y, 20)
+    assert len(kept) == 20
+    assert kept[0] == 0 and kept[-1] == 999
+    assert 300 in kept and 700 in kept
+    assert list(kept) == sorted(kept)
+    # Short series are returned whole
+    assert list(lttb(x[:10], y[:10], 20)) == list(range(10))
+
+def test_rolling_mean_weights_days_by_weigh_ins():
+    days = np.array([0, 1, 2, 10, 11], dtype=float)
+    totals = np.array([80.0, 164.0, 84.0, 70.0, 72.0])
+    counts = np.array([1, 2, 1, 1, 1])
+    assert list(rolling_mean(days, totals, counts, 7)) == [80.0, 244 / 3, 82.0, 70.0, 71.0]
+
+def test_weight_trend_downsamples_and_buckets(client, auth_tokens):
+    """Long histories come back as at most max_points daily points with rolling averages"""
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    user_id = auth_tokens['user']['id']
+    now = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+    # Three weigh-ins a day for 400 days
+    db.session.execute(insert(WeightLog), [
+        {'id': f'log-{i}', 'user_id': user_id, 'weight': 90 - i / 100,
+         'date': now - timedelta(hours=8 * i)}
+        for i in range(1200)
+    ])
+    db.session.commit()
+    # Core inserts skip the flush listener, as a backfill would
+    rebuild_rollups(user_id=user_id)
+
+    data = client.get('/api/tracking/analytics/weight-trend?days=365&max_points=100',
+                      headers=headers).get_json()
+    assert len(data['weight_data']) == 100
+    assert data['total_points'] in (365, 366)
+    assert data['current_weight'] == 90.0
+    assert data['start_weight'] == data['weight_data'][0]['weight']
+    # Rolling averages reach back before the period; the series rises, so trailing means lag below it
+    first = data['weight_data'][0]
+    assert first['rolling_30'] < first['rolling_7'] < first['weight']
+    assert 'buckets' not in data
+
+    data = client.get('/api/tracking/analytics/weight-trend?days=365&bucket=month',
+                      headers=headers).get_json()
+    assert 12 <= len(data['buckets']) <= 13
+    start = datetime.now(timezone.utc).date() - timedelta(days=365)
+    assert sum(bucket['count'] for bucket in data['buckets']) == WeightLog.query.filter(
+        WeightLog.user_id == user_id, WeightLog.date >= start
+    ).count()
+    assert all(bucket['min'] <= bucket['mean'] <= bucket['max'] for bucket in data['buckets'])
+    assert all(bucket['start'].endswith('-01') for bucket in data['buckets'])
+
+    weeks = client.get('/api/tracking/analytics/weight-trend?days=28&bucket=week',
+                       headers=headers).get_json()['buckets']
+    assert all(datetime.fromisoformat(bucket['start']).weekday() == 0 for bucket in weeks)
+
+    response = client.get('/api/tracking/analytics/weight-trend?bucket=year', headers=headers)
+    assert response.status_code == 400
+
+def test_mood_trend_buckets_in_sql(client, auth_tokens, query_counter):
+    """Distribution and timeline come from grouped rollup rows; journal content is never read"""
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    today = datetime.now(timezone.utc).replace(tzinfo=None)
+    monday = today - timedelta(days=today.weekday() + 7)
+    db.session.add_all([
+        Journal(id=f'journal-{i}', user_id=auth_tokens['user']['id'], content='x' * 1000, mood=mood,
+                created_at=monday + timedelta(days=offset))
+        for i, (offset, mood) in enumerate([(0, 'happy'), (0, 'sad'), (0, 'sad'), (1, 'happy'), (8, 'calm')])
+    ])
+    db.session.commit()
+
+    query_counter.clear()
+    data = client.get('/api/tracking/analytics/mood-trend?days=30', headers=headers).get_json()
+    assert not [statement for statement in query_counter if 'journals' in statement]
+    assert data['mood_distribution'] == {'calm': 1, 'happy': 2, 'sad': 2}
+    assert data['total_entries'] == 5
+    assert data['mood_data'][0] == {
+        'date': monday.date().isoformat(), 'dominant_mood': 'sad', 'moods': {'sad': 2, 'happy': 1}, 'total': 3
+    }
+    assert [point['dominant_mood'] for point in data['mood_data']] == ['sad', 'happy', 'calm']
+
+    weeks = client.get('/api/tracking/analytics/mood-trend?days=30&granularity=week', headers=headers).get_json()
+    assert [(point['date'], point['dominant_mood'], point['total']) for point in weeks['mood_data']] == [
+        (monday.date().isoformat(), 'happy', 4),
+        ((monday + timedelta(days=7)).date().isoformat(), 'calm', 1)
+    ]
+    assert weeks['granularity'] == 'week'
+
+    response = client.get('/api/tracking/analytics/mood-trend?granularity=hour', headers=headers)
+    assert response.status_code == 400
@@ -0,0 +1,75 @@
+from app.extensions import db
+from app.models import User
+from app.refdata import bump_reference_version
+from app.reset import reset_user_data
+
+def data_version(email='test@example.com'):
+    return db.session.scalar(db.select(User.data_version).where(User.email == email))
+
+def test_unchanged_data_is_answered_with_304(client, auth_tokens, query_counter):
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    response = client.get('/api/tracking/user-stats', headers=headers)
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert etag.startswith('W/"')
+    assert 'private' in response.headers['Cache-Control']
+
+    # Only the version lookup runs before the 304
+    query_counter.clear()
+    cached = client.get('/api/tracking/user-stats', headers={**headers, 'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.headers['ETag'] == etag
+    assert len(query_counter) == 1
+
+    # The query string is part of the tag
+    other = client.get('/api/tracking/journals?per_page=5', headers={**headers, 'If-None-Match': etag})
+    assert other.status_code == 200
+    assert other.headers['ETag'] != etag
+
+def test_writes_bump_the_version(client, auth_tokens):
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    etag = client.get('/api/finance/assets', headers=headers).headers['ETag']
+    assert data_version() == 0
+
+    # A rejected write commits nothing and keeps the version
+    assert client.post('/api/finance/assets', headers=headers, json={'name': 'Bike'}).status_code == 400
+    assert data_version() == 0
+    assert client.get('/api/finance/assets', headers={**headers, 'If-None-Match': etag}).status_code == 304
+
+    # A write in any versioned blueprint changes every tag of the user
+    assert client.post('/api/tracking/journals', headers=headers, json={'content': 'Hello'}).status_code == 201
+    assert data_version() == 1
+    response = client.get('/api/finance/assets', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+def test_reference_writes_and_reset_change_tags(client, auth_tokens):
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    etag = client.get('/api/gamification/achievements', headers=headers).headers['ETag']
+
+    # Shared reference data changed by anyone is part of every user's tag
+    bump_reference_version('achievements')
+    db.session.commit()
+    assert client.get('/api/gamification/achievements',
+                      headers={**headers, 'If-None-Match': etag}).status_code == 200
+
+    # The reset job commits outside the request that queued it
+    user_id = auth_tokens['user']['id']
+    version = data_version()
+    reset_user_data(user_id)
+    assert data_version() == version + 1
+
+def test_requests_without_a_token_are_left_to_the_view(client):
+    assert client.get('/api/tracking/user-stats').status_code == 401
+    assert client.get('/api/tracking/user-stats', headers={'Authorization': 'Bearer nonsense'}).status_code == 422
+
+def test_profile_updates_change_the_dashboard_tag(client, auth_tokens):
+    """The dashboard embeds the profile, which is written outside the versioned blueprints"""
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    etag = client.get('/api/tracking/dashboard', headers=headers).headers['ETag']
+
+    assert client.put('/api/user/profile', headers=headers, json={'username': 'renamed'}).status_code == 200
+    assert data_version() == 1
+    response = client.get('/api/tracking/dashboard', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['profile']['username'] == 'renamed'
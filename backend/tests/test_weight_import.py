@@ -0,0 +1,166 @@
+import io
+import json
+from datetime import datetime
+from app.models import User, WeightLog
+from app.extensions import db
+
+APPLE_EXPORT = b"""<?xml version="1.0" encoding="UTF-8"?>
+<HealthData locale="en_US">
+ <Record type="HKQuantityTypeIdentifierStepCount" sourceName="Phone" unit="count" value="1200"
+  startDate="2024-03-01 08:00:00 +0100" endDate="2024-03-01 09:00:00 +0100"/>
+ <Record type="HKQuantityTypeIdentifierBodyMass" sourceName="Scale" unit="lb" value="180"
+  startDate="2024-03-01 07:30:00 +0100" endDate="2024-03-01 07:30:00 +0100"/>
+ <Record type="HKQuantityTypeIdentifierBodyMass" sourceName="Scale" unit="kg" value="81.2"
+  startDate="2024-03-02 07:30:00 +0100" endDate="2024-03-02 07:30:00 +0100"/>
+ <Record type="HKQuantityTypeIdentifierBodyMass" sourceName="Scale" unit="kg" value="-1"
+  startDate="2024-03-03 07:30:00 +0100" endDate="2024-03-03 07:30:00 +0100"/>
+</HealthData>
+"""
+
+def upload(client, headers, filename, body, **params):
+    query = '&'.join(f'{k}={v}' for k, v in params.items())
+    return client.post(f'/api/tracking/weight-logs/import?{query}', headers=headers,
+                       data={'file': (io.BytesIO(body), filename)}, content_type='multipart/form-data')
+
+def test_import_csv_validates_and_deduplicates(client, auth_tokens):
+    """CSV rows follow the create_weight_log rules and dates already logged are skipped"""
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    client.post('/api/tracking/weight-logs', json={'weight': 80, 'date': '2024-01-01T07:00:00'}, headers=headers)
+
+    body = (
+        '﻿Weight,Date,Notes\n'
+        '80.5,2024-01-01T07:00:00,already logged\n'
+        '79.9,2024-01-02T07:00:00,\n'
+        '79.9,2024-01-02T07:00:00,repeated in file\n'
+        'heavy,2024-01-03T07:00:00,\n'
+        '0,2024-01-04T07:00:00,\n'
+        '79.1,yesterday,\n'
+        '79.0,2024-01-05T07:00:00+02:00,after run\n'
+    ).encode()
+    response = upload(client, headers, 'weights.csv', body)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert (data['accepted'], data['rejected'], data['duplicates']) == (2, 3, 2)
+    assert [error['error'] for error in data['errors']] == [
+        'Weight must be a positive number',
+        'Weight must be a positive number',
+        'Date must be an ISO 8601 timestamp'
+    ]
+    assert data['errors'][0]['line'] == 5
+
+    logs = WeightLog.query.filter_by(user_id=auth_tokens['user']['id']).order_by(WeightLog.date).all()
+    assert [(log.weight, log.date, log.notes) for log in logs] == [
+        (80.0, datetime(2024, 1, 1, 7), ''),
+        (79.9, datetime(2024, 1, 2, 7), ''),
+        (79.0, datetime(2024, 1, 5, 5), 'after run')
+    ]
+
+    # Importing the same file again only finds duplicates
+    data = upload(client, headers, 'weights.csv', body).get_json()
+    assert (data['accepted'], data['duplicates']) == (0, 4)
+
+def test_import_ndjson_raw_body(client, auth_tokens):
+    """NDJSON can be posted as the request body; bad lines are reported by line number"""
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    lines = [json.dumps({'weight': 70 + i / 10, 'date': f'2024-02-{i + 1:02d}T08:00:00'}) for i in range(25)]
+    lines += ['', '{not json', json.dumps({'date': '2024-02-27T08:00:00'})]
+    response = client.post('/api/tracking/weight-logs/import?format=ndjson', headers=headers,
+                           data='\n'.join(lines).encode())
+    data = response.get_json()
+    assert (data['accepted'], data['rejected']) == (25, 2)
+    assert data['errors'] == [{'line': 27, 'error': 'Invalid JSON'}, {'line': 28, 'error': 'Weight is required'}]
+    assert WeightLog.query.filter_by(user_id=auth_tokens['user']['id']).count() == 25
+
+def test_import_apple_health_export(client, auth_tokens):
+    """Only body mass records are imported, converted to the requested unit"""
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    data = upload(client, headers, 'export.xml', APPLE_EXPORT, unit='kg').get_json()
+    assert (data['accepted'], data['rejected'], data['duplicates']) == (2, 1, 0)
+
+    logs = WeightLog.query.filter_by(user_id=auth_tokens['user']['id']).order_by(WeightLog.date).all()
+    assert [(log.weight, log.date, log.notes) for log in logs] == [
+        (81.65, datetime(2024, 3, 1, 6, 30), 'Scale'),
+        (81.2, datetime(2024, 3, 2, 6, 30), 'Scale')
+    ]
+
+def test_import_rejects_unknown_and_broken_files(client, auth_tokens):
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    assert upload(client, headers, 'weights.txt', b'80').status_code == 400
+    assert upload(client, headers, 'export.xml', b'<HealthData><Record').status_code == 400
+    assert upload(client, headers, 'weights.csv', b'weight\n80', unit='stone').status_code == 400
+
+def test_import_keeps_rows_before_a_parse_error(client, auth_tokens):
+    """A file that breaks part way keeps the rows before it and says where it stopped"""
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    lines = [json.dumps({'weight': 70, 'date': f'2023-01-01T08:{i // 60:02d}:{i % 60:02d}'}) for i in range(200)]
+    body = '\n'.join(lines).encode() + b'\n\xff\xfe\n'
+    response = client.post('/api/tracking/weight-logs/import?format=ndjson', headers=headers, data=body)
+    assert response.status_code == 400
+    data = response.get_json()
+    assert data['error'] == 'Could not parse the file'
+    # The file is decoded in chunks, so the lines just before the bad bytes may not have been read
+    assert 150 < data['last_line'] <= 200
+    assert (data['accepted'], data['duplicates']) == (data['last_line'], 0)
+    assert WeightLog.query.filter_by(user_id=auth_tokens['user']['id']).count() == data['accepted']
+
+def test_create_and_import_store_offset_dates_alike(client, auth_tokens):
+    """Dates with a UTC offset are stored in UTC on both paths, so the import sees the duplicate"""
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    response = client.post('/api/tracking/weight-logs', json={'weight': 80, 'date': '2024-01-01T08:00:00+01:00'},
+                           headers=headers)
+    assert response.get_json()['date'] == '2024-01-01T07:00:00'
+
+    body = json.dumps({'weight': 80, 'date': '2024-01-01T08:00:00+01:00'}).encode()
+    data = client.post('/api/tracking/weight-logs/import?format=ndjson', headers=headers, data=body).get_json()
+    assert (data['accepted'], data['duplicates']) == (0, 1)
+    assert [log.date for log in WeightLog.query.filter_by(user_id=auth_tokens['user']['id'])] == [
+        datetime(2024, 1, 1, 7)
+    ]
+
+def test_import_rejects_non_finite_weights_and_non_string_notes(client, auth_tokens):
+    """NaN, infinity and notes that are not text are per-row rejections"""
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    body = 'weight,date\nnan,2024-01-01T07:00:00\ninf,2024-01-02T07:00:00\n80,2024-01-03T07:00:00\n'.encode()
+    data = upload(client, headers, 'weights.csv', body).get_json()
+    assert (data['accepted'], data['rejected']) == (1, 2)
+
+    lines = [
+        '{"weight": NaN, "date": "2024-02-01T07:00:00"}',
+        '{"weight": -Infinity, "date": "2024-02-02T07:00:00"}',
+        '{"weight": 1e400, "date": "2024-02-03T07:00:00"}',
+        '{"weight": 80, "date": "2024-02-04T07:00:00", "notes": {"mood": "good"}}',
+        '{"weight": 80, "date": "2024-02-05T07:00:00", "notes": "fine"}'
+    ]
+    response = client.post('/api/tracking/weight-logs/import?format=ndjson', headers=headers,
+                           data='\n'.join(lines).encode())
+    assert response.status_code == 200
+    data = response.get_json()
+    assert (data['accepted'], data['rejected']) == (1, 4)
+    assert data['errors'][-1] == {'line': 4, 'error': 'Notes must be a string'}
+    weights = [log.weight for log in WeightLog.query.filter_by(user_id=auth_tokens['user']['id'])]
+    assert weights == [80.0, 80.0]
+
+    log_id = client.post('/api/tracking/weight-logs', json={'weight': 80}, headers=headers).get_json()['id']
+    response = client.put(f'/api/tracking/weight-logs/{log_id}', data='{"weight": NaN}',
+                          content_type='application/json', headers=headers)
+    assert response.status_code == 400
+
+def test_create_weight_log_rejects_invalid_date(client, auth_tokens):
+    headers = {'Authorization': f'Bearer {auth_tokens["access_token"]}'}
+    response = client.post('/api/tracking/weight-logs', json={'weight': 80, 'date': 'soon'}, headers=headers)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Date must be an ISO 8601 timestamp'
+
+def test_import_cli(runner, test_user, tmp_path, app):
+    path = tmp_path / 'weights.ndjson'
+    path.write_text('{"weight": 80, "date": "2024-01-01T07:00:00"}\n{"weight": -2}\n')
+    result = runner.invoke(args=['weight-logs', 'import', str(path), '--user', 'test@example.com',
+                                 '--batch-size', '1'])
+    assert result.exit_code == 0, result.output
+    assert 'Imported 1 weight logs, rejected 1, skipped 0 duplicates' in result.output
+    with app.app_context():
+        user = User.query.filter_by(email='test@example.com').one()
+        assert db.session.query(WeightLog).filter_by(user_id=user.id).count() == 1
+
+    result = runner.invoke(args=['weight-logs', 'import', str(path), '--user', 'nobody'])
+    assert result.exit_code != 0
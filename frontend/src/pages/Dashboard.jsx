@@ -135,22 +135,18 @@ export default function Dashboard() {
         'Accept': 'application/json'
       };
 
-      // Fetch activities, user stats, and profile data
+      // Fetch activities, user stats, and profile data in one round trip
       try {
-        const [activitiesResponse, userResponse, profileResponse] = await Promise.all([
-          fetch('http://localhost:5001/api/tracking/all-activities', { headers }),
-          fetch('http://localhost:5001/api/tracking/user-stats', { headers }),
-          fetch('http://localhost:5001/api/auth/profile', { headers })
-        ]);
-
-        if (!activitiesResponse.ok) {
-          throw new Error(`Activities fetch failed: ${activitiesResponse.status}`);
+        const dashboardResponse = await fetch('http://localhost:5001/api/tracking/dashboard', { headers });
+
+        if (!dashboardResponse.ok) {
+          throw new Error(`Dashboard fetch failed: ${dashboardResponse.status}`);
         }
-        const activitiesData = await activitiesResponse.json();
+        const dashboardData = await dashboardResponse.json();
         
         // Process activities by category
         const processedActivities = {};
-        Object.entries(activitiesData.categorized_activities || {}).forEach(([category, activities]) => {
+        Object.entries(dashboardData.categorized_activities || {}).forEach(([category, activities]) => {
           // Keep all activities that are either active or completed today
           processedActivities[category] = activities.filter(activity => 
             activity.is_active || activity.completed_today
@@ -159,19 +155,13 @@ export default function Dashboard() {
         
         setBookmarkedActivities(processedActivities);
         
-        if (userResponse.ok) {
-          const userData = await userResponse.json();
-          setXp(userData.current_xp || 0);
-          setLevel(userData.level || 1);
-          setStreak(userData.streak_days || 0);
-        } else {
-          throw new Error(`User stats fetch failed: ${userResponse.status}`);
-        }
+        const userData = dashboardData.stats || {};
+        setXp(userData.current_xp || 0);
+        setLevel(userData.level || 1);
+        setStreak(userData.streak_days || 0);
 
-        if (profileResponse.ok) {
-          const profileData = await profileResponse.json();
-          setUsername(profileData.username || '');
-        }
+        const profileData = dashboardData.profile || {};
+        setUsername(profileData.username || '');
       } catch (error) {
         console.error('Error fetching data:', error);
         setMessage('Error loading data. Please try again.');
@@ -190,7 +180,7 @@ export default function Dashboard() {
 
   // Calculate XP needed for a single level
   const calculateXpForLevel = (level) => {
-    return Math.round(500 + Math.pow(level, 1.5));
+    return Math.floor(500 + Math.pow(level, 1.5));
   };
 
   // Determine current level based on total XP
@@ -335,41 +325,44 @@ export default function Dashboard() {
 
       setMessage("Submitting activities...");
 
-      // Submit activities one by one
+      // Submit all activities in a single batch request
       let totalXpGained = 0;
       let newLevel = level;
       let newStreak = streak;
       let submissionSuccessful = true;
 
-      for (const activity of completedActivities) {
-        try {
-          const response = await fetch(`http://localhost:5001/api/tracking/activities/${activity.id}/toggle?complete=true`, {
-            method: 'POST',
-            headers: {
-              'Authorization': `Bearer ${token}`,
-              'Content-Type': 'application/json',
-              'Accept': 'application/json'
-            }
-          });
+      try {
+        const response = await fetch('http://localhost:5001/api/tracking/activities/batch', {
+          method: 'POST',
+          headers: {
+            'Authorization': `Bearer ${token}`,
+            'Content-Type': 'application/json',
+            'Accept': 'application/json'
+          },
+          body: JSON.stringify({
+            items: completedActivities.map(activity => ({ activity_id: activity.id, action: 'complete' }))
+          })
+        });
 
-          if (!response.ok) {
-            throw new Error(`Failed to submit activity ${activity.name}`);
-          }
+        if (!response.ok) {
+          throw new Error('Failed to submit activities');
+        }
 
-          const data = await response.json();
-          
-          // Defensive defaults for all values
-          totalXpGained = Number(data.totalXpGained) || 0;
-          newLevel = Number(data.level) || 1;
-          newStreak = Number(data.streak) || 0;
-          
-          // Log the response to debug
-          console.log(`Activity ${activity.name} response:`, data);
-        } catch (error) {
-          console.error(`Error submitting activity ${activity.name}:`, error);
+        const data = await response.json();
+        
+        // Defensive defaults for all values
+        totalXpGained = Number(data.totalXpGained) || 0;
+        newLevel = Number(data.level) || 1;
+        newStreak = Number(data.streak) || 0;
+        
+        const failed = (data.results || []).filter(result => result.status !== 'ok');
+        if (failed.length > 0) {
+          console.error('Some activities failed to submit:', failed);
           submissionSuccessful = false;
-          break;
         }
+      } catch (error) {
+        console.error('Error submitting activities:', error);
+        submissionSuccessful = false;
       }
 
       if (submissionSuccessful) {